@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DATA = Path(__file__).parents[1] / "tests" / "data"
+
+
+def write_log(logfile, nrows, prefix="bench"):
+    """Write a synthetic BioCARS log in the "acquisition 6.2.8" format"""
+    phi = np.arange(nrows) * 0.5 % 360
+    delay = np.where(np.arange(nrows) % 2, 1e-7, np.nan)
+    time = pd.date_range("2022-06-22 19:02:23", periods=nrows, freq="2s")
+    df = pd.DataFrame(
+        {
+            "#date time": time.strftime("%Y-%m-%d %H:%M:%S.%f-0500"),
+            "started": "",
+            "finished": "",
+            "file": [f"{prefix}_{i:07d}.mccd" for i in range(nrows)],
+            "Delay": delay,
+            "HuberPhi": phi,
+            "ring_current": 101.7,
+            "bunch_current": 3.88,
+        }
+    )
+    with open(logfile, "w") as f:
+        f.write("# Data collection log file generated by acquisition 6.2.8\n")
+        f.write("# Description: synthetic benchmark log\n")
+        df.to_csv(f, sep="\t", index=False, float_format="%.4f")
+    return logfile
+
+
+@pytest.fixture(scope="session")
+def inpfile():
+    """Example Precognition geometry file"""
+    return str(DATA / "example.mccd.inp")
+
+
+@pytest.fixture(scope="session")
+def logwriter():
+    """Writer for synthetic logs at a given path (see write_log)"""
+    return write_log
+
+
+@pytest.fixture(scope="session")
+def logfactory(tmp_path_factory):
+    """Factory for synthetic logs that are cached per number of rows"""
+    cache = {}
+
+    def factory(nrows):
+        if nrows not in cache:
+            logdir = tmp_path_factory.mktemp(f"log{nrows}")
+            cache[nrows] = str(write_log(logdir / "bench.log", nrows))
+        return cache[nrows]
+
+    return factory
+
+
+@pytest.fixture
+def fake_precognition(monkeypatch):
+    """Point cog.core.precognition.run at the fake Precognition binary"""
+    script = Path(__file__).parent / "fake_precognition.py"
+    monkeypatch.setenv("COG_PRECOGNITION", f"{sys.executable} {script}")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""
+Minimal stand-in for the Precognition binary used to benchmark cog's
+batch orchestration. It echoes the input geometry as the refined geometry
+and writes a fixed RMSD line to stdout.
+"""
+
+import shutil
+import sys
+
+
+def main():
+    with open(sys.argv[1], "r") as inp:
+        lines = [l.split() for l in inp.readlines()]
+
+    geometry = [l[0][1:] for l in lines if l and l[0].startswith("@")][0]
+    images = [l[4] for l in lines if len(l) == 5 and l[0] == "Goniometer"]
+    image = images[0] if images else geometry[: -len(".inp")]
+
+    if geometry != f"{image}.inp":
+        shutil.copyfile(geometry, f"{image}.inp")
+    print("R.M.S.D. in pixel & matched spots:     0.52 508")
+
+
+if __name__ == "__main__":
+    main()
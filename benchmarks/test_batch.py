@@ -0,0 +1,72 @@
+from contextlib import nullcontext
+
+import pytest
+
+from cog import Experiment, FrameGeometry
+
+
+@pytest.mark.parametrize("batched", [False, True])
+@pytest.mark.parametrize("nframes", [10, 50])
+def test_refine_batch(
+    benchmark,
+    fake_precognition,
+    inpfile,
+    logwriter,
+    tmp_path,
+    monkeypatch,
+    nframes,
+    batched,
+):
+    """Benchmark orchestrating refinements against a fake Precognition"""
+    images = tmp_path / "images"
+    images.mkdir()
+    log = logwriter(images / "sweep.log", nframes)
+    exp = Experiment.fromLogs([str(log)])
+    for image in exp.images.index:
+        (images / image).touch()
+
+    first = exp.images.index[0]
+    exp.images["geometry"] = None
+    exp.images.loc[first, "geometry"] = FrameGeometry(inpfile)
+
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    def refine():
+        with exp.batch() if batched else nullcontext():
+            for image in exp.images.index:
+                exp.refine(image, initial_geometry=first)
+
+    benchmark.pedantic(refine, rounds=3)
+    assert (exp.images["rmsd"] == 0.52).all()
+
+
+@pytest.mark.parametrize("placement", ["compact", "spread", None])
+@pytest.mark.parametrize("nworkers", [1, 4])
+def test_refine_pool(
+    benchmark, fake_precognition, inpfile, logwriter, tmp_path, nworkers, placement
+):
+    """Benchmark refinements in a persistent pool of Precognition workers"""
+    from cog.core.pool import PrecognitionPool
+
+    images = tmp_path / "images"
+    images.mkdir()
+    log = logwriter(images / "sweep.log", 50)
+    exp = Experiment.fromLogs([str(log)])
+    for image in exp.images.index:
+        (images / image).touch()
+
+    first = exp.images.index[0]
+    exp.images["geometry"] = None
+    exp.images.loc[first, "geometry"] = FrameGeometry(inpfile)
+
+    scratch = str(tmp_path / "scratch")
+    with PrecognitionPool(nworkers, scratch=scratch, placement=placement) as pool:
+        benchmark.pedantic(
+            exp.refineImages,
+            kwargs={"initial_geometry": first, "pool": pool},
+            rounds=3,
+        )
+    benchmark.extra_info.update(pool.report())
+    assert (exp.images["rmsd"] == 0.52).all()
@@ -0,0 +1,25 @@
+import pytest
+
+from cog import Experiment
+
+
+@pytest.mark.parametrize("nrows", [1_000, 10_000, 100_000, 1_000_000])
+def test_fromLogs(benchmark, logfactory, nrows):
+    """Benchmark Experiment.fromLogs on synthetic logs"""
+    log = logfactory(nrows)
+    exp = benchmark.pedantic(Experiment.fromLogs, args=([log],), rounds=3)
+    assert exp.numImages == nrows
+
+
+@pytest.mark.parametrize("nrows", [1_000, 100_000])
+def test_pickle_roundtrip(benchmark, logfactory, tmp_path, nrows):
+    """Benchmark Experiment.toPickle/fromPickle round-trip"""
+    exp = Experiment.fromLogs([logfactory(nrows)])
+    pklfile = str(tmp_path / "experiment.pkl")
+
+    def roundtrip():
+        exp.toPickle(pklfile)
+        return Experiment.fromPickle(pklfile)
+
+    result = benchmark(roundtrip)
+    assert result.numImages == nrows
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+from cog import facet
+
+
+def test_facet(benchmark, inpfile, monkeypatch, capsys):
+    """Benchmark cog.facet over 500 geometry files"""
+    monkeypatch.setattr(sys, "argv", ["cog.facet", "--hmax", "2"] + [inpfile] * 500)
+    benchmark.pedantic(facet.main, rounds=3)
+
+
+@pytest.mark.parametrize("nproc", [1, 4])
+def test_analyze(benchmark, inpfile, nproc):
+    """Benchmark facet analysis of 5000 geometry files across processes"""
+    benchmark.pedantic(
+        facet.analyze,
+        args=([inpfile] * 5000,),
+        kwargs={"hmax": 2, "nproc": nproc, "chunksize": 500},
+        rounds=3,
+    )
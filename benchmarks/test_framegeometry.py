@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from cog import FrameGeometry
+
+
+@pytest.fixture(scope="module")
+def geometries(inpfile):
+    """Geometries spanning a full goniometer rotation"""
+    geoms = []
+    for phi in np.linspace(0, 360, 1000, endpoint=False):
+        g = FrameGeometry(inpfile)
+        g.goniometer = ["0.000", "0.000", f"{phi:.3f}"]
+        geoms.append(g)
+    return geoms
+
+
+@pytest.mark.parametrize("nframes", [100, 1000])
+def test_readINPFile(benchmark, inpfile, nframes):
+    """Benchmark parsing many .inp files"""
+    geoms = benchmark(lambda: [FrameGeometry(inpfile) for _ in range(nframes)])
+    assert len(geoms) == nframes
+
+
+@pytest.mark.parametrize("nframes", [100, 1000])
+def test_writeINPFile(benchmark, geometries, tmp_path, nframes):
+    """Benchmark writing many .inp files"""
+    paths = [str(tmp_path / f"frame_{i:05d}.mccd.inp") for i in range(nframes)]
+
+    def write():
+        for g, path in zip(geometries, paths):
+            g.writeINPFile(path)
+
+    benchmark(write)
+
+
+@pytest.mark.parametrize("nframes", [100, 1000])
+def test_export_geometries(benchmark, geometries, tmp_path, nframes):
+    """Benchmark bulk export of many .inp files (first export, no reuse)"""
+    import pandas as pd
+
+    from cog.io import export_geometries
+
+    index = [f"frame_{i:05d}.mccd" for i in range(nframes)]
+    geoms = pd.Series(geometries[:nframes], index=index, dtype=object)
+    stats = benchmark(export_geometries, geoms, str(tmp_path), force=True)
+    assert stats["written"] == nframes
+
+
+def test_get_reciprocal_Amatrix(benchmark, geometries):
+    """Benchmark computing A* for many frames"""
+    A = benchmark(lambda: [g.get_reciprocal_Amatrix() for g in geometries])
+    assert len(A) == len(geometries)
+
+
+def test_predict_spots(benchmark, geometries):
+    """Benchmark vectorized spot prediction for many frames"""
+    from cog.core.prediction import predict_spots
+
+    spots = benchmark.pedantic(predict_spots, args=(geometries[:100],), rounds=3)
+    assert spots["frame"].nunique() == 100
+
+
+def test_compare_orientations(benchmark, geometries):
+    """Benchmark misorientation analysis across many frames"""
+    import pandas as pd
+
+    from cog.core.orientation import compare_orientations
+
+    geoms = pd.Series(geometries)
+    phi = pd.Series([float(g.goniometer[2]) for g in geometries])
+    results = benchmark(compare_orientations, geoms, phi, geometries[0])
+    assert len(results) == len(geometries)
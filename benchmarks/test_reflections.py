@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog.io import read_reflections
+
+
+@pytest.fixture(scope="module")
+def iifiles(tmp_path_factory):
+    """Synthetic .ii files of 2000 frames with 200 reflections each"""
+    directory = tmp_path_factory.mktemp("integrated")
+    rng = np.random.default_rng(0)
+    iifiles = {}
+    for i in range(2000):
+        hkl = rng.integers(-30, 30, size=(200, 3))
+        values = rng.uniform(0, 1000, size=(200, 6))
+        lines = [
+            f"{h:4d}{k:4d}{l:4d}  1 {x:8.2f} {y:8.2f} {r:6.3f} {w:6.4f} {i:10.2f} {s:8.2f}"
+            for (h, k, l), (x, y, r, w, i, s) in zip(hkl, values)
+        ]
+        path = directory / f"frame_{i:05d}.mccd.ii"
+        path.write_text("\n".join(lines) + "\n")
+        iifiles[f"frame_{i:05d}.mccd"] = str(path)
+    return iifiles
+
+
+def test_read_reflections(benchmark, iifiles):
+    """Benchmark reading integrated reflections of a sweep"""
+    images = pd.DataFrame(
+        {"phi": np.arange(len(iifiles)) * 0.5, "delay": "off"}, index=list(iifiles)
+    )
+    table = benchmark(read_reflections, iifiles, images)
+    assert len(table) == 200 * len(iifiles)
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import cog",
+        "import cog.up",
+        "import cog.facet",
+        "import cog.load",
+        "from cog import FrameGeometry",
+        "from cog import Experiment",
+    ],
+)
+def test_startup(benchmark, statement):
+    """Benchmark interpreter startup with cog imports"""
+    benchmark.pedantic(
+        subprocess.check_call, args=([sys.executable, "-c", statement],), rounds=5
+    )
+
+
+def test_startup_baseline(benchmark):
+    """Benchmark bare interpreter startup for reference"""
+    benchmark.pedantic(
+        subprocess.check_call, args=([sys.executable, "-c", ""],), rounds=5
+    )
@@ -0,0 +1,6 @@
+from cog import up
+
+
+def test_orientation_table(benchmark, inpfile):
+    """Benchmark headless cog.up over 2000 geometry files"""
+    benchmark.pedantic(up.orientation_table, args=([inpfile] * 2000,), rounds=3)
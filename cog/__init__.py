@@ -1 +1,21 @@
-from cog.core import Experiment, FrameGeometry
+"""
+Processing of BioCARS Laue data with Precognition. Experiment,
+ExperimentCollection, and FrameGeometry are imported lazily on first
+access (PEP 562).
+"""
+
+__all__ = ["Experiment", "ExperimentCollection", "FrameGeometry"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from cog import core
+
+        value = getattr(core, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,3 +3,4 @@ from cog.commands.index import index
 from cog.commands.refine import refine
 from cog.commands.calibrate import calibrate
 from cog.commands.import_from_logs import import_from_logs
+from cog.commands.integrate import integrate
@@ -1,6 +1,7 @@
 import os
 from cog import FrameGeometry
 from cog.core.precognition import run
+from cog.core.timing import Timer
 
 
 def calibrate(
@@ -70,11 +71,12 @@ def calibrate(
         f"   Quit\n"
         f"Quit\n"
     )
-    with open(inpfile, "w") as inp:
+    with Timer("write_inp"), open(inpfile, "w") as inp:
         inp.write(inptext)
 
     run(inpfile, logfile)
-    return checkStatus(image, logfile)
+    with Timer("parse_log", image):
+        return checkStatus(image, logfile)
 
 
 def checkStatus(image, logfile):
@@ -1,6 +1,3 @@
-from cog.core import Experiment
-
-
 def import_from_logs(
     logs=None,
     distance=None,
@@ -31,6 +28,8 @@ def import_from_logs(
     output : str
         Output file to which Experiment object will be written (.pkl file)
     """
+    from cog.core import Experiment
+
     if not output.endswith(".pkl"):
         raise ValueError(f"Output suffix must be .pkl -- given: {output}")
 
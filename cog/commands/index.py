@@ -1,6 +1,7 @@
 import os
 from cog import FrameGeometry
 from cog.core.precognition import run
+from cog.core.timing import Timer
 
 
 def index(
@@ -91,25 +92,39 @@ def index(
         f"Pattern       10 pre.spt\n"
         f"Quit\n"
     )
-    with open(inpfile, "w") as inp:
+    with Timer("write_inp"), open(inpfile, "w") as inp:
         inp.write(inptext)
 
     run(inpfile, logfile)
 
-    if matrix:
-        return checkStatus(logfile, matrix=True)
+    with Timer("parse_log", image):
+        if matrix is not None:
+            return checkStatus(logfile, matrix=matrix)
 
-    return checkStatus(logfile, matrix=False)
+        return checkStatus(logfile, matrix=False)
 
 
-def checkStatus(logfile, matrix=False):
+def checkStatus(logfile, matrix=False, atol=1e-4):
     """
     Return whether indexing has succeeded or failed.
 
+    Candidate geometries written by Precognition (*pre.spt.inp) are
+    compared with the selected matrix in one vectorized step, first in the
+    identity setting and then over all symmetry-equivalent settings of the
+    lattice. Only the Crystal and Matrix lines of each candidate are
+    parsed, and a FrameGeometry is constructed only for the matching
+    candidate. Candidates are not parsed if the selection is rejected.
+
     Parameters
     ----------
     logfile : str
         Filename of logfile from Precognition indexing
+    matrix : bool or list or tuple (len==9)
+        Whether a missetting matrix was given as input. If the input
+        matrix itself is given, indexing is also accepted if the selected
+        matrix is within 5 degrees of a symmetry-equivalent setting of it
+    atol : float
+        Absolute tolerance for matching candidate matrices
 
     Returns
     -------
@@ -118,6 +133,8 @@ def checkStatus(logfile, matrix=False):
     """
     import glob
     import numpy as np
+    from cog.core.orientation import polar_rotation, rotation_angle
+    from cog.core.symmetry import equivalent_settings
 
     # Check if indexed geometry has been written
     if not os.path.exists(f"pre.spt.inp"):
@@ -129,15 +146,7 @@ def checkStatus(logfile, matrix=False):
     if [True for l in lines if "Index: Auto-indexing failed!" in l]:
         return None
 
-    # Check if selected matrix is close to target
-    if matrix:
-        degree_line = [l for l in lines if "degrees away from the input matrix." in l]
-        degree_line = degree_line[0].split()
-        degrees = float(degree_line[3])
-        if degrees > 5.0:
-            return None
-
-    # Replace Matrix in geometry file with selected one
+    # Parse selected matrix
     for i, l in enumerate(lines):
         if "Selected matrix:" in l:
             break
@@ -145,15 +154,69 @@ def checkStatus(logfile, matrix=False):
     row1 = lines[i + 1].rstrip("\n").split(",")
     row2 = lines[i + 2].rstrip("\n").split(",")
     row3 = lines[i + 3].rstrip("\n").split(",")
-    matrix = row1 + row2 + row3
-    m = np.array(matrix, dtype=float)
+    selected = row1 + row2 + row3
+    m = np.array(selected, dtype=float).reshape(3, 3)
+
+    # Check if selected matrix is close to target before parsing candidates
+    if matrix is not None and matrix is not False:
+        degree_line = [l for l in lines if "degrees away from the input matrix." in l]
+        degree_line = degree_line[0].split()
+        degrees = float(degree_line[3])
+        if (degrees > 5.0) and not isinstance(matrix, bool):
+            cell, spacegroup, _ = _readMatrices(["pre.spt.inp"])
+            settings = equivalent_settings(m, cell, spacegroup)
+            reference = np.array(matrix, dtype=float).reshape(3, 3)
+            rotations = polar_rotation(settings @ reference.T)
+            degrees = rotation_angle(rotations).min()
+        if degrees > 5.0:
+            return None
+
+    # Parse candidate matrices and lattice in bulk
     files = sorted(glob.glob("*pre.spt.inp"))
-    geoms = [FrameGeometry(f) for f in files]
-    for f, g in zip(files, geoms):
-        newmat = np.array(g.matrix, dtype=float)
-        if np.allclose(m, newmat, atol=1e-4):
-            return g
+    cell, spacegroup, candidates = _readMatrices(files)
+
+    # Find candidate that matches the selected matrix, preferring the
+    # identity setting over symmetry-equivalent settings
+    if len(candidates):
+        error = np.abs(candidates - m).max(axis=(1, 2))
+        best = np.argmin(error)
+        if error[best] <= atol:
+            return FrameGeometry(files[best])
+
+        settings = equivalent_settings(m, cell, spacegroup)
+        error = np.abs(candidates[:, None] - settings[None]).max(axis=(2, 3))
+        best = np.unravel_index(np.argmin(error), error.shape)
+        if error[best] <= atol:
+            return FrameGeometry(files[best[0]])
 
+    # Replace Matrix in geometry file with selected one
     g = FrameGeometry("pre.spt.inp")
-    g.matrix = matrix
+    g.matrix = selected
     return g
+
+
+def _readMatrices(inpfiles):
+    """
+    Read missetting matrices from Precognition geometry files, along with
+    the unit cell and space group of the first file.
+
+    Returns
+    -------
+    (cell, spacegroup, matrices) : (tuple, int, np.ndarray (n, 3, 3))
+    """
+    import numpy as np
+
+    cell, spacegroup, matrices = None, None, []
+    for inpfile in inpfiles:
+        with open(inpfile, "r") as inp:
+            for l in inp:
+                fields = l.split()
+                if fields and fields[0] == "Crystal" and cell is None:
+                    cell = tuple(map(float, fields[1:7]))
+                    spacegroup = int(fields[7])
+                elif fields and fields[0] == "Matrix":
+                    matrices.append(fields[1:10])
+                    break
+
+    matrices = np.array(matrices, dtype=float).reshape(-1, 3, 3)
+    return cell, spacegroup, matrices
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+from cog import FrameGeometry
+from cog.core.precognition import run
+from cog.core.timing import Timer
+
+
+def integrate(
+    images,
+    phis,
+    geometries,
+    pathToImages,
+    outdir,
+    resolution=2.0,
+    spot_profile=(6, 4, 4),
+    workdir=None,
+    inpfile="integrate.inp",
+    logfile="integrate.log",
+):
+    """
+    Integrate a shard of images with their geometries using Precognition.
+
+    All images of the shard are integrated in a single Precognition run in
+    an isolated working directory, and the integrated reflections of each
+    image ("{image}.ii") are moved to outdir.
+
+    Parameters
+    ----------
+    images : list of str
+        Filenames of images to be integrated. For now, it is assumed that
+        these are MCCD images from a RayonixMX340 detector
+    phis : list of float
+        Phi angle of goniometer for each image
+    geometries : list of cog.FrameGeometry
+        Experimental geometry of each image
+    pathToImages : str
+        Path to directory containing the MCCD images
+    outdir : str
+        Directory to which the .ii file of each image is moved
+    resolution : float
+        High-resolution limit in angstroms
+    spot_profile : tuple(length, width, sigma-cut)
+        Parameters to be used for spot integration
+    workdir : str
+        Working directory for Precognition. Defaults to a new directory
+        within the current directory, which is removed afterwards
+    inpfile : filename
+        File within workdir to which Precognition input will be written
+    logfile : filename
+        File within workdir to which Precognition log will be written
+
+    Returns
+    -------
+    dict
+        Mapping of image to path of its .ii file, or None if integration of
+        the image failed
+    """
+    # Check arguments
+    for image, geometry in zip(images, geometries):
+        if not os.path.exists(os.path.join(pathToImages, image)):
+            raise ValueError(f"Image {image} does not exist")
+        if not isinstance(geometry, FrameGeometry):
+            raise ValueError(f"{geometry} is not of type {type(FrameGeometry)}")
+
+    pathToImages = os.path.abspath(pathToImages)
+    outdir = os.path.abspath(outdir)
+    os.makedirs(outdir, exist_ok=True)
+    ownsWorkdir = workdir is None
+    if ownsWorkdir:
+        workdir = tempfile.mkdtemp(prefix="integrate-", dir=os.getcwd())
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Write geometry files and one input block per image
+        blocks = []
+        for image, phi, geometry in zip(images, phis, geometries):
+            geometry.writeINPFile(f"{image}.inp")
+            blocks.append(
+                f"@{image}.inp\n\n"
+                f"Input\n"
+                f"   Format     RayonixMX340\n"
+                f"   Goniometer 0 0 {phi}  {image}\n"
+                f"   Resolution {resolution} 100\n"
+                f"   Wavelength 1.02 1.18\n"
+                f"   Spot       {spot_profile[0]} {spot_profile[1]} {spot_profile[2]}\n"
+                f"   Quit\n"
+                f"Dataset       integration\n"
+                f"   In	      {pathToImages}\n"
+                f"   Out        {image}.ii\n"
+                f"   Quit\n"
+            )
+        inptext = (
+            f"diagnostic    off\n"
+            f"busy          off\n\n"
+            f"{''.join(blocks)}"
+            f"Quit\n"
+        )
+        with Timer("write_inp"), open(inpfile, "w") as inp:
+            inp.write(inptext)
+
+        run(inpfile, logfile)
+        with Timer("parse_log"):
+            iifiles = checkStatus(images, logfile)
+
+        results = {}
+        for image, iifile in iifiles.items():
+            if iifile is None:
+                results[image] = None
+            else:
+                results[image] = os.path.join(outdir, iifile)
+                shutil.move(iifile, results[image])
+    finally:
+        os.chdir(cwd)
+        if ownsWorkdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def checkStatus(images, logfile):
+    """
+    Return status of integration of each image. An image failed if the
+    logfile contains "Processing stops at {image}" or if no .ii file was
+    written for it.
+
+    Parameters
+    ----------
+    images : list of str
+        Names of integrated images
+    logfile : str
+        Filename of logfile from Precognition integration
+
+    Returns
+    -------
+    dict
+        Mapping of image to filename of its .ii file, or None if integration
+        of the image failed
+    """
+    with open(logfile, "r") as log:
+        text = log.read()
+
+    status = {}
+    for image in images:
+        failed = f"Processing stops at {image}" in text
+        if failed or not os.path.exists(f"{image}.ii"):
+            status[image] = None
+        else:
+            status[image] = f"{image}.ii"
+    return status
+
+
+def merge_reflections(iifiles, images=None):
+    """
+    Merge integrated reflections of several images into one table.
+
+    Parameters
+    ----------
+    iifiles : dict
+        Mapping of image to path of its .ii file (or None to skip)
+    images : pd.DataFrame
+        DataFrame of images from which phi and delay are joined
+
+    Returns
+    -------
+    pd.DataFrame
+        Reflections with the columns of .ii files and the image of each
+        reflection (see cog.io.reflections.read_reflections())
+    """
+    from cog.io.reflections import read_reflections
+
+    return read_reflections(iifiles, images)
@@ -2,6 +2,7 @@ import os
 import numpy as np
 from cog import FrameGeometry
 from cog.core.precognition import run
+from cog.core.timing import Timer
 
 
 def refine(
@@ -77,11 +78,12 @@ def refine(
         f"   Quit\n"
         f"Quit\n"
     )
-    with open(inpfile, "w") as inp:
+    with Timer("write_inp"), open(inpfile, "w") as inp:
         inp.write(inptext)
 
     run(inpfile, logfile)
-    return checkStatus(image, logfile)
+    with Timer("parse_log", image):
+        return checkStatus(image, logfile)
 
 
 def checkStatus(image, logfile):
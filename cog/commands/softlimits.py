@@ -1,5 +1,6 @@
 import os
 from cog.core.precognition import run
+from cog.core.timing import Timer
 
 
 def softlimits(
@@ -72,7 +73,7 @@ def softlimits(
         f"Limits\n"
         f"Quit\n"
     )
-    with open(inpfile, "w") as inp:
+    with Timer("write_inp"), open(inpfile, "w") as inp:
         inp.write(inptext)
 
     run(inpfile, logfile)
@@ -1,2 +1,26 @@
-from cog.core.experiment import Experiment
-from cog.core.framegeometry import FrameGeometry
+"""
+Core classes of cog. Attributes are imported lazily on first access
+(PEP 562), so that importing cog does not pull in pandas.
+"""
+
+import importlib
+
+_LAZY = {
+    "Experiment": "cog.core.experiment",
+    "FrameGeometry": "cog.core.framegeometry",
+    "ExperimentCollection": "cog.core.collection",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
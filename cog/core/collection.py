@@ -0,0 +1,302 @@
+from collections import OrderedDict
+from os.path import abspath, basename, splitext
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from cog.core.experiment import Experiment
+
+
+class ExperimentCollection:
+    """
+    Collection of Experiments, e.g. the sweeps and crystals of a campaign.
+
+    Experiments are stored as .pkl files and indexed in a catalog together
+    with shared metadata (e.g. crystal, temperature). Each Experiment is
+    loaded on first access, and at most maxLoaded Experiments are kept in
+    memory at a time. Batch operations run over all Experiments and can
+    share a single PrecognitionPool.
+
+    Parameters
+    ----------
+    catalog : pd.DataFrame
+        DataFrame indexed by name with a "path" column pointing at the
+        Experiment .pkl files, and any further metadata columns
+    maxLoaded : int
+        Maximal number of Experiments kept in memory. Modified Experiments
+        should be written back with save() before they are evicted
+
+    Examples
+    --------
+    >>> col = ExperimentCollection.fromPickles(glob.glob("*/experiment.pkl"))
+    >>> with PrecognitionPool() as pool:
+    ...     col.refineImages(pool=pool)
+    >>> col.statistics()
+    """
+
+    def __init__(self, catalog=None, maxLoaded=8):
+        if catalog is None:
+            catalog = pd.DataFrame(columns=["path"])
+        if not isinstance(catalog, pd.DataFrame) or "path" not in catalog.columns:
+            raise ValueError("Catalog should be a DataFrame with a 'path' column")
+        self.catalog = catalog
+        self.maxLoaded = maxLoaded
+        self._loaded = OrderedDict()
+
+    # -------------------------------------------------------------------#
+    # Catalog
+
+    @classmethod
+    def fromPickles(cls, pklfiles, names=None, maxLoaded=8, **metadata):
+        """
+        Initialize collection from Experiment .pkl files without loading them.
+
+        Parameters
+        ----------
+        pklfiles : list of str
+            Paths to Experiment .pkl files
+        names : list of str
+            Names of Experiments. Defaults to the filenames without suffix
+            (or the full paths if these are not unique)
+        maxLoaded : int
+            Maximal number of Experiments kept in memory
+        **metadata
+            Shared metadata columns, given as scalars or one value per file
+        """
+        paths = [abspath(p) for p in pklfiles]
+        if names is None:
+            names = [splitext(basename(p))[0] for p in paths]
+            if len(set(names)) < len(names):
+                names = paths
+        catalog = pd.DataFrame({"path": paths, **metadata}, index=names)
+        return cls(catalog, maxLoaded=maxLoaded)
+
+    def add(self, name, experiment, path=None, **metadata):
+        """
+        Add Experiment (or path to Experiment .pkl file) to collection.
+
+        Parameters
+        ----------
+        name : str
+            Name of Experiment in collection
+        experiment : cog.Experiment or str
+            Experiment, or path to an Experiment .pkl file
+        path : str
+            File to which the Experiment is written if an Experiment is
+            given. Defaults to "{name}.pkl"
+        **metadata
+            Metadata columns for Experiment
+        """
+        if name in self.catalog.index:
+            raise ValueError(f"{name} is already in collection")
+
+        if isinstance(experiment, Experiment):
+            path = abspath(path or f"{name}.pkl")
+            experiment.toPickle(path)
+            self._cache(name, experiment)
+        else:
+            path = abspath(experiment)
+
+        row = pd.DataFrame({"path": [path], **{k: [v] for k, v in metadata.items()}})
+        row.index = [name]
+        self.catalog = pd.concat([self.catalog, row])
+        return
+
+    def select(self, **metadata):
+        """
+        Get names of Experiments matching metadata.
+
+        Examples
+        --------
+        >>> col.select(crystal="xtal1")
+        """
+        mask = np.ones(len(self.catalog), dtype=bool)
+        for column, value in metadata.items():
+            mask &= (self.catalog[column] == value).to_numpy()
+        return self.catalog.index[mask]
+
+    # -------------------------------------------------------------------#
+    # Lazy loading
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def __iter__(self):
+        return iter(self.catalog.index)
+
+    def __contains__(self, name):
+        return name in self.catalog.index
+
+    def __getitem__(self, name):
+        """Get Experiment, loading it from its .pkl file if needed"""
+        if name in self._loaded:
+            self._loaded.move_to_end(name)
+            return self._loaded[name]
+        try:
+            path = self.catalog.loc[name, "path"]
+        except KeyError:
+            raise KeyError(f"{name} was not found in collection")
+        experiment = Experiment.fromPickle(path)
+        self._cache(name, experiment)
+        return experiment
+
+    def _cache(self, name, experiment):
+        """Keep experiment in memory, evicting least-recently-used ones"""
+        self._loaded[name] = experiment
+        self._loaded.move_to_end(name)
+        while len(self._loaded) > self.maxLoaded:
+            self._loaded.popitem(last=False)
+        return
+
+    @property
+    def loaded(self):
+        """Names of Experiments currently in memory"""
+        return list(self._loaded)
+
+    def save(self, name=None):
+        """Write loaded Experiment(s) back to their .pkl files"""
+        names = list(self._loaded) if name is None else [name]
+        for name in names:
+            self._loaded[name].toPickle(self.catalog.loc[name, "path"])
+        return
+
+    def unload(self, name=None):
+        """Drop loaded Experiment(s) from memory without saving"""
+        if name is None:
+            self._loaded.clear()
+        else:
+            self._loaded.pop(name, None)
+        return
+
+    def items(self, names=None):
+        """Iterate over (name, Experiment), loading Experiments lazily"""
+        names = self.catalog.index if names is None else names
+        for name in names:
+            yield name, self[name]
+
+    def toPickle(self, pklfile="collection.pkl"):
+        """Write catalog of collection (the Experiments are not included)"""
+        with open(pklfile, "wb") as pkl:
+            pickle.dump(self.catalog, pkl, protocol=pickle.HIGHEST_PROTOCOL)
+        return
+
+    @classmethod
+    def fromPickle(cls, pklfile, maxLoaded=8):
+        """Read collection from catalog written by toPickle()"""
+        with open(pklfile, "rb") as pkl:
+            catalog = pickle.load(pkl)
+        return cls(catalog, maxLoaded=maxLoaded)
+
+    # -------------------------------------------------------------------#
+    # Batch operations
+
+    def map(self, func, names=None, save=False):
+        """
+        Apply func to each Experiment.
+
+        Parameters
+        ----------
+        func : callable
+            Function of an Experiment
+        names : list of str
+            Experiments to process. Defaults to all
+        save : bool
+            Whether to write each Experiment back to its .pkl file after
+            func has been applied
+
+        Returns
+        -------
+        dict
+            Mapping of name to return value of func
+        """
+        results = {}
+        for name, experiment in self.items(names):
+            results[name] = func(experiment)
+            if save:
+                self.save(name)
+        return results
+
+    def refineImages(self, names=None, pool=None, save=True, **kwargs):
+        """
+        Refine all Experiments using a shared pool of Precognition workers.
+
+        Parameters
+        ----------
+        names : list of str
+            Experiments to refine. Defaults to all
+        pool : cog.core.pool.PrecognitionPool
+            Pool of workers shared by all Experiments. If not given, a pool
+            is created for this call
+        save : bool
+            Whether to write each Experiment back after refinement
+        **kwargs
+            Arguments to Experiment.refineImages()
+        """
+        from cog.core.pool import PrecognitionPool
+
+        ownsPool = pool is None
+        if ownsPool:
+            pool = PrecognitionPool()
+        try:
+            self.map(lambda e: e.refineImages(pool=pool, **kwargs), names, save)
+        finally:
+            if ownsPool:
+                pool.close()
+        return
+
+    def statistics(self, names=None):
+        """
+        Summarize processing of each Experiment.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame indexed by name with the catalog metadata and the
+            number of frames, the number of frames with a geometry, and the
+            median RMSD and matched spots of refined frames
+        """
+
+        def summarize(experiment):
+            images = experiment.images
+            stats = {"frames": len(images)}
+            if "geometry" in images.columns:
+                stats["geometries"] = int(images["geometry"].notna().sum())
+            for column in ("rmsd", "matched"):
+                if column in images.columns:
+                    values = images[column].replace(np.inf, np.nan)
+                    stats[f"median_{column}"] = values.median()
+            return stats
+
+        stats = pd.DataFrame.from_dict(self.map(summarize, names), orient="index")
+        return self.catalog.join(stats, how="inner")
+
+    def facetAnalysis(self, names=None, by="crystal", **kwargs):
+        """
+        Compare facet angles to the electric field across Experiments.
+        Experiments are read from their .pkl files, so changes to loaded
+        Experiments must be written back with save() first.
+
+        Parameters
+        ----------
+        names : list of str
+            Experiments to include. Defaults to all
+        by : str
+            Catalog column by which Experiments are grouped. If None,
+            Experiments are grouped by name
+        **kwargs
+            Arguments to cog.facet.analyze(). If groupby is given, frames
+            are grouped by it instead of the catalog
+
+        Returns
+        -------
+        pd.DataFrame
+            Mean, standard deviation, and count of angles per group and facet
+        """
+        from cog.facet import analyze
+
+        names = self.catalog.index if names is None else names
+        catalog = self.catalog.loc[names]
+        labels = catalog.index if by is None else catalog[by]
+        kwargs.setdefault("groupby", dict(zip(catalog["path"], labels.astype(str))))
+        return analyze(list(catalog["path"]), **kwargs)
@@ -1,6 +1,11 @@
+from contextlib import contextmanager
+import os
 from os.path import isdir, abspath, dirname, join
+import numpy as np
 import pandas as pd
 import pickle
+from cog.core.frameindex import FrameIndex, parse_delays, parse_times
+from cog.core.timing import Timer
 
 
 class Experiment:
@@ -34,6 +39,9 @@ class Experiment:
         self.cell = cell
         self.spacegroup = spacegroup
 
+        # Buffer for per-frame results (see Experiment.batch())
+        self._results = None
+
         return
 
     # -------------------------------------------------------------------#
@@ -49,6 +57,7 @@ class Experiment:
         if not isinstance(val, pd.DataFrame):
             raise ValueError(f"Experiment.images should be set with a DataFrame")
         self._images = val
+        self._frameIndex = None
 
     @property
     def pathToImages(self):
@@ -60,6 +69,22 @@ class Experiment:
         if not isdir(val):
             raise ValueError(f"Path to images does not exist: {val}")
         self._pathToImages = val
+        self._imageFiles = None
+
+    @property
+    def imageFiles(self):
+        """
+        Filenames in Experiment.pathToImages. The directory is listed once
+        and cached; call refreshImageFiles() if images are added later
+        """
+        if getattr(self, "_imageFiles", None) is None:
+            self._imageFiles = frozenset(os.listdir(self.pathToImages))
+        return self._imageFiles
+
+    def refreshImageFiles(self):
+        """Discard cached listing of Experiment.pathToImages"""
+        self._imageFiles = None
+        return
 
     @property
     def distance(self):
@@ -137,6 +162,17 @@ class Experiment:
         else:
             self._spacegroup = int(val)
 
+    @property
+    def frameIndex(self):
+        """
+        Index for fast lookup of frames by phi, delay, and time. It is
+        rebuilt when Experiment.images is replaced; call reindexFrames()
+        after editing the phi, delay, or time columns in place.
+        """
+        if getattr(self, "_frameIndex", None) is None:
+            self._frameIndex = FrameIndex(self.images)
+        return self._frameIndex
+
     @property
     def numImages(self):
         """
@@ -160,13 +196,180 @@ class Experiment:
         self.gamma = gamma
         return
 
+    def __getstate__(self):
+        """Exclude frame index and directory listing from pickled Experiment"""
+        state = self.__dict__.copy()
+        state["_frameIndex"] = None
+        state["_imageFiles"] = None
+        return state
+
     def invertGoniometerRotation(self):
         """
         Invert rotation of goniometer for images in Experiment
         """
         self.images["phi"] *= -1
+        self.reindexFrames()
+        return
+
+    def reindexFrames(self):
+        """
+        Rebuild the frame index after phi, delay, or time columns of
+        Experiment.images were modified in place
+        """
+        self._frameIndex = None
+        return
+
+    def nearestFrame(self, phi):
+        """
+        Get filename of frame with goniometer angle closest to phi.
+
+        Parameters
+        ----------
+        phi : float
+            Goniometer angle in degrees
+
+        Returns
+        -------
+        str
+            Filename of image in Experiment.images
+        """
+        return self.frameIndex.nearestPhi(phi)
+
+    def framesInPhiRange(self, start, stop):
+        """
+        Get filenames of frames with goniometer angles in [start, stop],
+        sorted by phi.
+        """
+        return self.frameIndex.phiRange(start, stop)
+
+    def framesAtDelay(self, delay):
+        """
+        Get filenames of frames collected at the given delay.
+
+        Parameters
+        ----------
+        delay : str or float
+            Delay label from Experiment.images (e.g. "off", "100ns"), any
+            equivalent time (e.g. "0.1us"), or delay in ns
+        """
+        return self.frameIndex.atDelay(delay)
+
+    def framesInTimeWindow(self, start, stop):
+        """
+        Get filenames of frames collected in the time window [start, stop],
+        sorted by time.
+
+        Parameters
+        ----------
+        start, stop : str or datetime-like
+            Bounds of time window. Timezone-naive values are interpreted in
+            the timezone of the logs
+        """
+        return self.frameIndex.timeWindow(start, stop)
+
+    @contextmanager
+    def batch(self):
+        """
+        Buffer per-frame results from index(), refine(), and calibrate()
+        and commit them to Experiment.images in a single vectorized update
+        when the block exits. Geometries recorded within the block are
+        visible to subsequent calls, so progressive refinement works as
+        usual.
+
+        Examples
+        --------
+        >>> with exp.batch():
+        ...     for image in exp.images.index[1:]:
+        ...         exp.refine(image, initial_geometry=image0)
+        """
+        # Nested blocks share the outermost buffer
+        if getattr(self, "_results", None) is not None:
+            yield self
+            return
+
+        self._results = {}
+        try:
+            yield self
+        finally:
+            results, self._results = self._results, None
+            self.commitResults(results)
+
+    def commitResults(self, results):
+        """
+        Commit per-frame results to Experiment.images. Each column is
+        written in one vectorized update, and new columns are added as
+        needed.
+
+        Parameters
+        ----------
+        results : dict
+            Mapping of image filename to a dict of {column: value}
+        """
+        if not results:
+            return
+
+        # Collect updates by column
+        columns = {}
+        for image, values in results.items():
+            for column, value in values.items():
+                columns.setdefault(column, {})[image] = value
+
+        with Timer("update_images"):
+            for column, values in columns.items():
+                self._updateColumn(column, pd.Series(values))
+
+        if {"phi", "delay", "time"}.intersection(columns):
+            self.reindexFrames()
+
+        return
+
+    def _recordResults(self, image, **values):
+        """Record results for image, buffering them within Experiment.batch()"""
+        if getattr(self, "_results", None) is None:
+            self.commitResults({image: values})
+        else:
+            self._results.setdefault(image, {}).update(values)
         return
 
+    def _updateColumn(self, column, update):
+        """Write Series of values into a column of Experiment.images"""
+        images = self.images
+        positions = images.index.get_indexer(update.index)
+        if (positions < 0).any():
+            missing = update.index[positions < 0][0]
+            raise KeyError(f"{missing} was not found in image DataFrame")
+
+        # Columns that are fully replaced can take the dtype of the update
+        if (column not in images.columns) and (len(update) == len(images)):
+            images[column] = update.reindex(images.index)
+            return
+
+        if column in images.columns:
+            current = images[column]
+        elif update.dtype.kind in "iuf":
+            current = pd.Series(np.nan, index=images.index)
+        else:
+            current = pd.Series(None, index=images.index, dtype=object)
+
+        try:
+            dtype = np.result_type(current.dtype, update.dtype)
+        except TypeError:
+            dtype = object
+        if current.dtype.kind == "f" and update.dtype.kind == "b":
+            dtype = object
+
+        values = current.to_numpy(dtype=dtype, copy=True)
+        values[positions] = update.to_numpy(dtype=dtype)
+        images[column] = values
+        return
+
+    def _getGeometry(self, image):
+        """Get geometry of image, including results pending in a batch"""
+        results = getattr(self, "_results", None)
+        if results and "geometry" in results.get(image, {}):
+            return results[image]["geometry"]
+        return self.images.loc[image, "geometry"]
+
     def toPickle(self, pklfile="experiment.pkl"):
         with open(pklfile, "wb") as pkl:
             pickle.dump(self, pkl, protocol=pickle.HIGHEST_PROTOCOL)
@@ -305,18 +508,37 @@ class Experiment:
                         "bunch-current[mA]":"bunch_current"},
                 inplace=True,
             )
-            df.loc[df["delay"] == "-", "delay"] = "off"
+            df["delay"] = df["delay"].astype(str).replace("-", "off")
+            delay_ns = parse_delays(df["delay"])
         else:
-            df = df[["#date time", "file", "Delay", "HuberPhi"]]
+            columns = ["#date time", "file", "Delay", "HuberPhi"]
+            if "bunch_current" in df.columns:
+                columns.append("bunch_current")
+            df = df[columns]
             df.rename(
                 columns={"#date time": "time", "Delay": "delay", "HuberPhi": "phi"},
                 inplace=True,
             )
-            df["delay"] *= 1e9  # convert to ns
-            df.loc[df["delay"].isna(), "delay"] = "off"
-            df["delay"] = df["delay"].apply(
-                lambda x: x if x == "off" else f"{int(x)}ns"
-            )
+            delay_ns = (df["delay"] * 1e9).round()  # convert to ns
+            labels = delay_ns.astype("Int64").astype(str) + "ns"
+            df["delay"] = labels.where(delay_ns.notna(), "off")
+
+        # Use compact dtypes: delay is categorical (ordered by delay, with
+        # "off" first) with a numeric companion column in ns
+        categories = (
+            pd.DataFrame({"delay": df["delay"], "ns": delay_ns.fillna(-np.inf)})
+            .drop_duplicates("delay")
+            .sort_values("ns", kind="stable")["delay"]
+            .tolist()
+        )
+        df["delay"] = pd.Categorical(df["delay"], categories=categories, ordered=True)
+        df["delay_ns"] = delay_ns.astype(float)
+        df["time"] = parse_times(df["time"])
+        df["phi"] = df["phi"].astype(float)
+        if "bunch_current" in df.columns:
+            df["bunch_current"] = pd.to_numeric(
+                df["bunch_current"], errors="coerce"
+            ).astype(np.float32)
 
         df.reset_index(inplace=True, drop=True)
         df.set_index("file", inplace=True)
@@ -331,6 +553,279 @@ class Experiment:
             spacegroup=spacegroup,
         )
 
+    def loadImage(self, image):
+        """
+        Load image from Experiment.pathToImages. Only the header is read;
+        the pixel array is memory-mapped on first access.
+
+        Parameters
+        ----------
+        image : str
+            Filename of image to select from Experiment.images DataFrame
+
+        Returns
+        -------
+        cog.io.MCCDImage
+            Image with header metadata and memory-mapped pixel array
+        """
+        from cog.io import MCCDImage
+
+        if image not in self.images.index:
+            raise KeyError(f"{image} was not found in image DataFrame")
+
+        return MCCDImage(join(self.pathToImages, image))
+
+    def screenImages(self, images=None, **kwargs):
+        """
+        Screen images for blank or overloaded frames before processing.
+        Per-frame statistics (total_counts, saturated_fraction, spots) and
+        a boolean skip column are written to Experiment.images.
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images to screen. Defaults to all images
+        **kwargs
+            Screening criteria passed to cog.core.screening.screen_frames()
+
+        Returns
+        -------
+        pd.Index
+            Filenames of frames that passed screening
+        """
+        from cog.core.screening import screen_frames
+
+        if images is None:
+            images = self.images.index
+        paths = [join(self.pathToImages, image) for image in images]
+
+        stats = screen_frames(paths, **kwargs)
+        self.commitResults(stats.to_dict(orient="index"))
+
+        return stats.index[~stats["skip"]]
+
+    def findOrientationOutliers(self, reference, **kwargs):
+        """
+        Flag frames whose refined orientation disagrees with the orientation
+        predicted from a reference geometry and the goniometer. The
+        misorientation (degrees), orientation_cluster, and
+        orientation_outlier columns are written to Experiment.images.
+
+        Parameters
+        ----------
+        reference : str
+            Filename of image whose geometry is used as reference
+        **kwargs
+            Options passed to cog.core.orientation.compare_orientations()
+
+        Returns
+        -------
+        pd.Index
+            Filenames of outlier frames
+        """
+        from cog.core.orientation import compare_orientations
+
+        geometries = self.images["geometry"].dropna()
+        kwargs.setdefault("spacegroup", self.spacegroup)
+        results = compare_orientations(
+            geometries, self.images["phi"], self._getGeometry(reference), **kwargs
+        )
+        self.commitResults(results.to_dict(orient="index"))
+
+        return results.index[results["orientation_outlier"]]
+
+    def pairFrames(self, **kwargs):
+        """
+        Pair each laser-on frame with its nearest laser-off reference frame
+        at the same phi. The paired off frame is written to the
+        off_reference column of Experiment.images.
+
+        Parameters
+        ----------
+        **kwargs
+            Options passed to cog.core.pairing.pair_frames()
+
+        Returns
+        -------
+        pd.DataFrame
+            Pair table indexed by laser-on frame (see pair_frames())
+        """
+        from cog.core.pairing import pair_frames
+
+        pairs = pair_frames(self.images, **kwargs)
+        self._updateColumn("off_reference", pairs["off"].astype(object))
+        return pairs
+
+    def propagateGeometry(self, pairs=None, overwrite=False, **kwargs):
+        """
+        Propagate geometries from laser-off frames to their paired laser-on
+        frames, so that on frames need not be refined separately. Each on
+        frame gets a copy of the geometry with its own phi and image, and
+        the source of each propagated geometry is written to the
+        geometry_source column of Experiment.images.
+
+        Parameters
+        ----------
+        pairs : pd.DataFrame
+            Pair table from pairFrames(). Computed if not given
+        overwrite : bool
+            Whether to replace existing geometries of on frames
+        **kwargs
+            Options passed to pairFrames() if pairs is not given
+
+        Returns
+        -------
+        pd.Index
+            Filenames of laser-on frames that received a geometry
+        """
+        import copy
+
+        if pairs is None:
+            pairs = self.pairFrames(**kwargs)
+        if "geometry" not in self.images.columns:
+            self.images["geometry"] = None
+
+        pairs = pairs[pairs["off"].notna()]
+        source = self.images["geometry"].reindex(pairs["off"]).to_numpy()
+        target = self.images["geometry"].reindex(pairs.index).to_numpy()
+        update = pd.notna(source)
+        if not overwrite:
+            update &= pd.isna(target)
+
+        # Each on frame gets its own copy, with its own phi and image
+        pairs = pairs[update]
+        results = {}
+        for image, phi, off, geometry in zip(
+            pairs.index, pairs["phi"], pairs["off"], source[update]
+        ):
+            geometry = copy.deepcopy(geometry)
+            if geometry.goniometer:
+                geometry.goniometer = [*geometry.goniometer[:2], f"{phi:.3f}"]
+            if geometry.image:
+                geometry.image = [geometry.image[0], image]
+            results[image] = {"geometry": geometry, "geometry_source": off}
+        self.commitResults(results)
+        return pairs.index
+
+    def smoothGeometry(self, by="phi", degree=2, replace=False, max_rmsd=None):
+        """
+        Fit smooth models of the refined geometry along the sweep and use
+        them to fill in geometries of frames that failed to refine.
+
+        Distance, center, swing, tilt, and missetting matrix of all refined
+        frames are fit with polynomials of phi (or collection time) in a
+        single least squares solve. Frames without a geometry (or all
+        frames, if replace=True) get a geometry evaluated from the fits,
+        with all other attributes copied from the nearest refined frame,
+        and "fit" is written to the geometry_source column of
+        Experiment.images.
+
+        Parameters
+        ----------
+        by : str
+            Coordinate along the sweep ("phi" or "time")
+        degree : int
+            Degree of the fitted polynomials
+        replace : bool
+            Whether to replace the geometries of refined frames with their
+            smoothed geometry
+        max_rmsd : float
+            Refined frames with a larger RMSD are excluded from the fits
+            (and replaced by fitted geometries). Defaults to including all
+            refined frames
+
+        Returns
+        -------
+        pd.DataFrame
+            Fitted parameters of the updated frames (see
+            cog.core.smoothing.geometry_table())
+        """
+        from cog.core.smoothing import (
+            COLUMNS,
+            apply_parameters,
+            fit_parameters,
+            geometry_table,
+        )
+
+        if by == "phi":
+            x = self.images["phi"].to_numpy(dtype=float)
+        elif by == "time":
+            times = parse_times(self.images["time"])
+            x = (times - times.min()).dt.total_seconds().to_numpy()
+        else:
+            raise ValueError(f"Cannot smooth geometries by {by}")
+
+        if "geometry" not in self.images.columns:
+            self.images["geometry"] = None
+        refined = self.images["geometry"].notna().to_numpy()
+        if max_rmsd is not None and "rmsd" in self.images.columns:
+            refined &= (self.images["rmsd"] <= max_rmsd).to_numpy()
+        targets = np.ones(len(self.images), dtype=bool) if replace else ~refined
+        if not targets.any():
+            return pd.DataFrame(columns=COLUMNS)
+
+        geometries = self.images["geometry"].to_numpy()[refined]
+        table = geometry_table(geometries)
+        fitted = fit_parameters(x[refined], table, degree, at=x[targets])
+
+        # Copy remaining attributes from the nearest refined frame
+        order = np.argsort(x[refined], kind="stable")
+        xs = x[refined][order]
+        right = np.clip(np.searchsorted(xs, x[targets]), 1, len(xs) - 1)
+        left = right - 1
+        nearest = np.where(
+            np.abs(x[targets] - xs[left]) <= np.abs(xs[right] - x[targets]),
+            left,
+            right,
+        )
+        nearest = order[np.minimum(nearest, len(xs) - 1)]
+
+        frames = self.images.index[targets]
+        phis = self.images["phi"].to_numpy(dtype=float)[targets]
+        smoothed = [
+            apply_parameters(geometries[n], values, phi=phi, image=image)
+            for n, values, phi, image in zip(nearest, fitted, phis, frames)
+        ]
+        self._updateColumn("geometry", pd.Series(smoothed, index=frames, dtype=object))
+        self._updateColumn(
+            "geometry_source", pd.Series("fit", index=frames, dtype=object)
+        )
+        return pd.DataFrame(fitted, index=frames, columns=COLUMNS)
+
+    def writeINPFiles(self, output, images=None, nthreads=8, force=False):
+        """
+        Write geometries of images to Precognition .inp files named
+        "{image}.inp", either into a directory or into a single tar archive.
+        Only files whose content changed are rewritten, and images without
+        a geometry are skipped. See cog.io.inp for details.
+
+        Parameters
+        ----------
+        output : str
+            Directory to which to write .inp files (created if necessary),
+            or tar archive if it ends with .tar or .tar.gz
+        images : list of str
+            Filenames of images to write. Defaults to all images
+        nthreads : int
+            Number of writer threads
+        force : bool
+            Whether to rewrite files whose content did not change
+
+        Returns
+        -------
+        list of str
+            Paths to .inp files (or their names within the archive)
+        """
+        from cog.io.inp import export_geometries
+
+        images = self.images.index if images is None else images
+        stats = export_geometries(
+            self.images.loc[images, "geometry"], output, nthreads, force
+        )
+        if output.endswith((".tar", ".tar.gz")):
+            return stats["files"]
+        return [join(output, name) for name in stats["files"]]
+
     def softlimits(self, image, resolution=2.0, spot_profile=(10, 5, 2.0)):
         """
         Determine the soft limits for data analysis in Precognition.
@@ -388,26 +883,29 @@ class Experiment:
             phi = entry["phi"]
             imagepath = join(self.pathToImages, image)
             if reference_geometry:
-                matrix = self.images.loc[reference_geometry, "geometry"].matrix
+                matrix = self._getGeometry(reference_geometry).matrix
             else:
                 matrix = None
         except KeyError:
             raise KeyError(f"{image} was not found in image DataFrame")
 
-        geom = index(
-            imagepath,
-            self.cell,
-            self.spacegroup,
-            self.distance,
-            self.center,
-            phi,
-            resolution,
-            spot_profile,
-            matrix=matrix,
-        )
+        with Timer("index", image) as t:
+            geom = index(
+                imagepath,
+                self.cell,
+                self.spacegroup,
+                self.distance,
+                self.center,
+                phi,
+                resolution,
+                spot_profile,
+                matrix=matrix,
+            )
 
         if geom:
-            self.images.loc[image, "geometry"] = geom
+            self._recordResults(image, geometry=geom, index_seconds=t.elapsed)
+        else:
+            self._recordResults(image, index_seconds=t.elapsed)
 
         return
 
@@ -435,21 +933,498 @@ class Experiment:
             entry = self.images.loc[image]
             phi = entry["phi"]
             if initial_geometry is None:
-                geometry = entry["geometry"]
+                geometry = self._getGeometry(image)
             else:
-                geometry = self.images.loc[initial_geometry, "geometry"]
+                geometry = self._getGeometry(initial_geometry)
         except KeyError:
             raise KeyError(f"{image} was not found in image DataFrame")
 
-        rmsd, numMatched, geom = refine(
-            image, phi, geometry, self.pathToImages, resolution, spot_profile
+        with Timer("refine", image) as t, self._imageView(image) as view:
+            rmsd, numMatched, geom = refine(
+                image, phi, geometry, view.directory, resolution, spot_profile
+            )
+
+        self._recordResults(
+            image,
+            geometry=geom,
+            rmsd=rmsd,
+            matched=numMatched,
+            refine_seconds=t.elapsed,
         )
-        self.images.loc[image, "geometry"] = geom
-        self.images.loc[image, "rmsd"] = rmsd
-        self.images.loc[image, "matched"] = numMatched
 
         return rmsd
 
+    def indexImages(
+        self,
+        images=None,
+        reference_geometry=None,
+        resolution=2.0,
+        spot_profile=(6, 4, 4.0),
+        pool=None,
+        stager=None,
+    ):
+        """
+        Index images in parallel using a pool of Precognition workers
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images to index. Defaults to all images
+        reference_geometry : str
+            Filename of image to use for missetting matrix
+        resolution : float
+            High-resolution limit in angstroms
+        spot_profile : tuple(length, width, sigma-cut)
+            Parameters to be used for spot recognition
+        pool : cog.core.pool.PrecognitionPool
+            Pool of workers to use. If not given, a pool is created for
+            this call
+        stager : cog.core.staging.ImageStager
+            If given, images are prefetched to node-local scratch in the
+            order given, and Precognition reads the staged copies
+        """
+        images = self.images.index if images is None else images
+        matrix = None
+        if reference_geometry:
+            matrix = self._getGeometry(reference_geometry).matrix
+
+        def submit(pool, image, directory):
+            phi = self.images.loc[image, "phi"]
+            return pool.submit(
+                "index",
+                join(directory, image),
+                self.cell,
+                self.spacegroup,
+                self.distance,
+                self.center,
+                phi,
+                resolution,
+                spot_profile,
+                matrix=matrix,
+            )
+
+        for image, (geom, seconds) in self._runPool(images, submit, pool, stager):
+            if geom:
+                self._recordResults(image, geometry=geom, index_seconds=seconds)
+            else:
+                self._recordResults(image, index_seconds=seconds)
+
+        return
+
+    def refineImages(
+        self,
+        images=None,
+        initial_geometry=None,
+        resolution=2.0,
+        spot_profile=(6, 4, 4.0),
+        pool=None,
+        stager=None,
+    ):
+        """
+        Refine experimental geometries of images in parallel using a pool
+        of Precognition workers
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images to refine. Defaults to all images
+        initial_geometry : str or dict
+            Filename of image to use for initial geometry from Experiment.images,
+            or mapping of images to such filenames. Defaults to using the
+            geometry of each image
+        resolution : float
+            High-resolution limit in angstroms
+        spot_profile : tuple(length, width, sigma-cut)
+            Parameters to be used for spot recognition
+        pool : cog.core.pool.PrecognitionPool
+            Pool of workers to use. If not given, a pool is created for
+            this call
+        stager : cog.core.staging.ImageStager
+            If given, images are prefetched to node-local scratch in the
+            order given, and Precognition reads the staged copies
+        """
+        images = self.images.index if images is None else images
+
+        def submit(pool, image, directory):
+            phi = self.images.loc[image, "phi"]
+            if initial_geometry is None:
+                geometry = self._getGeometry(image)
+            elif isinstance(initial_geometry, dict):
+                geometry = self._getGeometry(initial_geometry.get(image, image))
+            else:
+                geometry = self._getGeometry(initial_geometry)
+            return pool.submit(
+                "refine",
+                image,
+                phi,
+                geometry,
+                directory,
+                resolution,
+                spot_profile,
+            )
+
+        for image, (result, seconds) in self._runPool(images, submit, pool, stager):
+            rmsd, numMatched, geom = result
+            self._recordResults(
+                image,
+                geometry=geom,
+                rmsd=rmsd,
+                matched=numMatched,
+                refine_seconds=seconds,
+            )
+
+        return
+
+    def refinePhiGroups(
+        self,
+        images=None,
+        tolerance=0.01,
+        reuse=True,
+        initial_geometry=None,
+        resolution=2.0,
+        spot_profile=(6, 4, 4.0),
+        pool=None,
+        stager=None,
+    ):
+        """
+        Refine frames of repeat passes at the same phi (e.g. different
+        delays of a pump-probe sweep) from one representative per group.
+
+        Frames are grouped by phi within tolerance, and the first laser-off
+        frame of each group (or the first frame, if the group has none) is
+        refined. The remaining frames of the group then either reuse the
+        refined geometry of the representative or are refined starting
+        from it. Frames whose representative failed to refine are refined
+        from initial_geometry (if given) or from their own geometry, and
+        are skipped if they have neither. The group of each frame is written
+        to the phi_group column, and the representative of reused
+        geometries to the geometry_source column of Experiment.images.
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images to refine. Defaults to all images
+        tolerance : float
+            Maximal difference in phi (degrees) between frames of a group
+        reuse : bool
+            If True, the remaining frames of each group reuse the geometry
+            of the representative without running Precognition. Otherwise,
+            they are refined starting from it
+        initial_geometry : str
+            Filename of image to use for initial geometry of representatives.
+            Defaults to using the geometry of each representative
+        resolution : float
+            High-resolution limit in angstroms
+        spot_profile : tuple(length, width, sigma-cut)
+            Parameters to be used for spot recognition
+        pool : cog.core.pool.PrecognitionPool
+            Pool of workers to use. If not given, a pool is created for
+            this call
+        stager : cog.core.staging.ImageStager
+            If given, images are prefetched to node-local scratch
+
+        Returns
+        -------
+        dict
+            Number of frames, phi groups, Precognition runs, runs saved
+            compared to refining each frame independently, and frames that
+            were skipped because they had no geometry to start from
+        """
+        import copy
+        from cog.core.pairing import phi_groups
+        from cog.core.pool import PrecognitionPool
+
+        images = self.images.index if images is None else pd.Index(images)
+        missing = images.difference(self.images.index)
+        if len(missing):
+            raise KeyError(f"{missing[0]} was not found in image DataFrame")
+
+        frames = pd.DataFrame(
+            {"group": phi_groups(self.images.loc[images, "phi"], tolerance)},
+            index=images,
+        )
+        if "delay" in self.images.columns:
+            isOff = self.images.loc[images, "delay"].astype(str) == "off"
+            frames["order"] = (~isOff).to_numpy()
+        else:
+            frames["order"] = False
+        first = frames.sort_values("order", kind="stable").groupby("group").head(1)
+        representatives = frames.loc[frames.index.isin(first.index), "group"]
+        reference = pd.Series(
+            representatives.index, index=representatives.to_numpy()
+        ).reindex(frames["group"])
+        reference.index = frames.index
+        others = frames.index.difference(representatives.index, sort=False)
+        self.commitResults(
+            {image: {"phi_group": group} for image, group in frames["group"].items()}
+        )
+
+        ownsPool = pool is None
+        if ownsPool:
+            pool = PrecognitionPool()
+        try:
+            self.refineImages(
+                list(representatives.index),
+                initial_geometry,
+                resolution,
+                spot_profile,
+                pool,
+                stager,
+            )
+
+            refined = self.images["geometry"].reindex(reference.loc[others]).notna()
+            refined = refined.to_numpy()
+            if reuse:
+                self.commitResults(
+                    {
+                        image: {
+                            "geometry": copy.copy(self.images.at[rep, "geometry"]),
+                            "geometry_source": rep,
+                        }
+                        for image, rep in reference.loc[others[refined]].items()
+                    }
+                )
+                remaining = others[~refined]
+            else:
+                remaining = others
+
+            # Remaining frames start from their representative, if refined,
+            # and otherwise from initial_geometry or their own geometry
+            start = remaining.intersection(others[refined], sort=False)
+            initial = dict(zip(start, reference.loc[start]))
+            unseeded = remaining.difference(start, sort=False)
+            if initial_geometry is not None:
+                initial.update(dict.fromkeys(unseeded, initial_geometry))
+                skipped = unseeded[:0]
+            else:
+                skipped = unseeded[self.images.loc[unseeded, "geometry"].isna()]
+            remaining = remaining.difference(skipped, sort=False)
+            self.commitResults(
+                {image: {"rmsd": np.inf, "matched": 0} for image in skipped}
+            )
+
+            if len(remaining):
+                self.refineImages(
+                    list(remaining),
+                    initial,
+                    resolution,
+                    spot_profile,
+                    pool,
+                    stager,
+                )
+        finally:
+            if ownsPool:
+                pool.close()
+
+        runs = len(representatives) + len(remaining)
+        return {
+            "frames": len(frames),
+            "groups": len(representatives),
+            "runs": runs,
+            "runs_saved": len(frames) - runs - len(skipped),
+            "skipped": len(skipped),
+        }
+
+    def integrateImages(
+        self,
+        images=None,
+        output="integrated",
+        nshards=None,
+        resolution=2.0,
+        spot_profile=(6, 4, 4.0),
+        pool=None,
+    ):
+        """
+        Integrate images with their geometries in parallel using a pool of
+        Precognition workers.
+
+        Images are split into contiguous shards, and each shard is
+        integrated in a single Precognition run in its own working
+        directory. The integrated reflections of each image are written to
+        "{image}.ii" in output and merged into one table. Whether each image
+        was integrated is written to the integrated column of
+        Experiment.images.
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images to integrate. Defaults to all images with a
+            geometry
+        output : str
+            Directory to which .ii files are written
+        nshards : int
+            Number of shards. Defaults to four shards per worker, so that
+            shards of slow frames can be balanced between workers
+        resolution : float
+            High-resolution limit in angstroms
+        spot_profile : tuple(length, width, sigma-cut)
+            Parameters to be used for spot integration
+        pool : cog.core.pool.PrecognitionPool
+            Pool of workers to use. If not given, a pool is created for
+            this call
+
+        Returns
+        -------
+        pd.DataFrame
+            Integrated reflections of all images, with the image, phi, and
+            delay of each reflection (see readReflections())
+        """
+        from cog.commands.integrate import merge_reflections
+        from cog.core.pool import PrecognitionPool
+        from cog.core.views import ImageView
+
+        if images is None:
+            images = self.images.index[self.images["geometry"].notna().to_numpy()]
+        images = list(images)
+        missing = [image for image in images if image not in self.images.index]
+        if missing:
+            raise KeyError(f"{missing[0]} was not found in image DataFrame")
+        for image in images:
+            if image not in self.imageFiles:
+                raise ValueError(f"Image {image} does not exist")
+
+        ownsPool = pool is None
+        if ownsPool:
+            pool = PrecognitionPool()
+
+        try:
+            nshards = nshards or 4 * pool.nworkers
+            nshards = max(1, min(nshards, len(images)))
+            futures = []
+            for shard in np.array_split(np.array(images, dtype=object), nshards):
+                shard = list(shard)
+                view = ImageView(shard, self.pathToImages)
+                try:
+                    future = pool.submit(
+                        "integrate",
+                        shard,
+                        list(self.images.loc[shard, "phi"]),
+                        [self._getGeometry(image) for image in shard],
+                        view.directory,
+                        abspath(output),
+                        resolution,
+                        spot_profile,
+                    )
+                except BaseException:
+                    view.close()
+                    raise
+                future.add_done_callback(lambda f, view=view: view.close())
+                futures.append((shard, future))
+
+            iifiles = {}
+            with self.batch():
+                for shard, future in futures:
+                    results, seconds = future.result()
+                    iifiles.update(results)
+                    for image in shard:
+                        self._recordResults(
+                            image,
+                            integrated=results[image] is not None,
+                            integrate_seconds=seconds / len(shard),
+                        )
+        finally:
+            if ownsPool:
+                pool.close()
+
+        with Timer("merge_reflections"):
+            return merge_reflections(iifiles, self.images)
+
+    def readReflections(
+        self, directory="integrated", images=None, columns=("phi", "delay")
+    ):
+        """
+        Read integrated reflections of images from their "{image}.ii" files
+        into one table, joined with per-frame metadata from
+        Experiment.images. Images without a .ii file are skipped.
+
+        Parameters
+        ----------
+        directory : str
+            Directory containing .ii files (see integrateImages())
+        images : list of str
+            Filenames of images to read. Defaults to all images
+        columns : tuple of str
+            Columns of Experiment.images to join to each reflection
+
+        Returns
+        -------
+        pd.DataFrame
+            Reflections with columns H, K, L, Multiplicity, X, Y,
+            Resolution, Wavelength, I, SigI, image, and the joined columns
+        """
+        from cog.io.reflections import read_reflections
+
+        images = self.images.index if images is None else images
+        listing = {entry.name for entry in os.scandir(directory)}
+        iifiles = {
+            image: join(directory, f"{image}.ii")
+            for image in images
+            if f"{image}.ii" in listing
+        }
+        return read_reflections(iifiles, self.images, columns)
+
+    def _imageView(self, image):
+        """
+        Per-job view of Experiment.pathToImages containing only image. The
+        image is checked against the cached directory listing
+        """
+        from cog.core.views import ImageView
+
+        if image not in self.imageFiles:
+            raise ValueError(f"Image {image} does not exist")
+        return ImageView([image], self.pathToImages)
+
+    def _runPool(self, images, submit, pool=None, stager=None):
+        """
+        Submit jobs for images to a PrecognitionPool and yield
+        (image, result) in order within a batch of Experiment.images updates.
+        Each job reads its image from a per-job view or, if a stager is
+        given, from the staged copy once it has been staged. Views and
+        staged images are released when the job completes.
+        """
+        from cog.core.pool import PrecognitionPool
+
+        missing = [image for image in images if image not in self.images.index]
+        if missing:
+            raise KeyError(f"{missing[0]} was not found in image DataFrame")
+        if stager is None:
+            for image in images:
+                if image not in self.imageFiles:
+                    raise ValueError(f"Image {image} does not exist")
+
+        ownsPool = pool is None
+        if ownsPool:
+            pool = PrecognitionPool()
+
+        try:
+            if stager is not None:
+                stager.prefetch(images)
+
+            futures = {}
+            for image in images:
+                if stager is not None:
+                    stager.path(image)
+                    directory = stager.directory
+                    release = lambda f, image=image: stager.release(image)
+                else:
+                    view = self._imageView(image)
+                    directory = view.directory
+                    release = lambda f, view=view: view.close()
+
+                try:
+                    futures[image] = submit(pool, image, directory)
+                except BaseException:
+                    release(None)
+                    raise
+                futures[image].add_done_callback(release)
+
+            with self.batch():
+                for image, future in futures.items():
+                    yield image, future.result()
+        finally:
+            if ownsPool:
+                pool.close()
+
     def calibrate(self, image, resolution=2.0, spot_profile=(6, 4, 4.0)):
         """
         Calibrate experimental geometry for image using Precognition
@@ -468,15 +1443,21 @@ class Experiment:
         try:
             entry = self.images.loc[image]
             phi = entry["phi"]
-            geometry = entry["geometry"]
+            geometry = self._getGeometry(image)
         except KeyError:
             raise KeyError(f"{image} was not found in image DataFrame")
 
-        rmsd, numMatched, geom = calibrate(
-            image, phi, geometry, self.pathToImages, resolution, spot_profile
+        with Timer("calibrate", image) as t, self._imageView(image) as view:
+            rmsd, numMatched, geom = calibrate(
+                image, phi, geometry, view.directory, resolution, spot_profile
+            )
+
+        self._recordResults(
+            image,
+            geometry=geom,
+            rmsd=rmsd,
+            matched=numMatched,
+            calibrate_seconds=t.elapsed,
         )
-        self.images.loc[image, "geometry"] = geom
-        self.images.loc[image, "rmsd"] = rmsd
-        self.images.loc[image, "matched"] = numMatched
 
         return
@@ -1,5 +1,6 @@
 import os
 import numpy as np
+from cog.core.timing import Timer
 
 
 class FrameGeometry:
@@ -210,7 +211,7 @@ class FrameGeometry:
             raise ValueError(f"Cannot find file: {inpfile}")
 
         # Read inpfile
-        with open(inpfile, "r") as inp:
+        with Timer("read_inp"), open(inpfile, "r") as inp:
             lines = inp.readlines()
         if not ("Input" in lines[0] and "Quit" in lines[-1]):
             raise ValueError(f"{inpfile} does not meet formatting assumptions")
@@ -321,7 +322,7 @@ class FrameGeometry:
                 f"   Quit\n"
             )
 
-        with open(inpfile, "w") as outfile:
+        with Timer("write_inp"), open(inpfile, "w") as outfile:
             outfile.write(inp)
 
         return
@@ -333,70 +334,19 @@ class FrameGeometry:
         """
         Compute real-space orthogonalization matrix from unit cell parameters.
         """
-        a = float(self.a)
-        b = float(self.b)
-        c = float(self.c)
-        alpha = np.deg2rad(float(self.alpha))
-        beta = np.deg2rad(float(self.beta))
-        gamma = np.deg2rad(float(self.gamma))
-
-        # Compute unit cell volume
-        V = (
-            a
-            * b
-            * c
-            * np.sqrt(
-                1
-                - np.cos(alpha) ** 2
-                - np.cos(beta) ** 2
-                - np.cos(gamma) ** 2
-                + 2 * np.cos(alpha) * np.cos(beta) * np.cos(gamma)
-            )
-        )
-
-        # Compute Cartesian orthogonalization matrix (Rupp, Page 746)
-        O = np.zeros((3, 3))
-        O[0, 0] = a
-        O[0, 1] = b * np.cos(gamma)
-        O[1, 1] = b * np.sin(gamma)
-        O[0, 2] = c * np.cos(beta)
-        O[1, 2] = c * (np.cos(alpha) - (np.cos(beta) * np.cos(gamma))) / np.sin(gamma)
-        O[2, 2] = V / (a * b * np.sin(gamma))
-
-        return O.T
+        return orthogonalization_matrix(self.crystal)
 
     def get_missetting_matrix(self):
         """
         Get missetting matrix for FrameGeometry
         """
-        return np.array(self.matrix, dtype=np.float).reshape(3, 3)
+        return np.array(self.matrix, dtype=float).reshape(3, 3)
 
     def get_goniometer_rotation_matrix(self):
         """
         Get rotation matrix associated with goniometer settings of FrameGeometry
         """
-        o1 = np.deg2rad(float(self.omega[0]))
-        o2 = np.deg2rad(float(self.omega[1]))
-        gonio_phi = np.deg2rad(float(self.goniometer[2]))
-
-        def get_rotation_matrix(axis, angle):
-            u = axis
-            sin, cos = np.sin(angle), np.cos(angle)
-            return (
-                cos * np.eye(3)
-                + sin * np.cross(u, -np.eye(3))
-                + (1.0 - cos) * np.outer(u, u)
-            )
-
-        R = get_rotation_matrix(np.array([0.0, 0.0, -1.0]), o1)
-        R = get_rotation_matrix(np.array([0.0, 1.0, 0.0]), o2) @ R
-        R = (
-            get_rotation_matrix(
-                (R @ np.array([0.0, 1.0, 0.0])[:, None])[:, 0], gonio_phi
-            )
-            @ R
-        )
-        return R
+        return goniometer_rotation_matrix(self.omega, float(self.goniometer[2]))
 
     def get_reciprocal_Amatrix(self):
         """
@@ -415,9 +365,96 @@ class FrameGeometry:
         """
         return np.linalg.inv(self.get_reciprocal_Amatrix())
 
+    def predict_spots(self):
+        """
+        Predict Laue spots on the detector for this geometry. See
+        cog.core.prediction for the geometric conventions.
+
+        Returns
+        -------
+        pd.DataFrame
+            Predicted spots with columns H, K, L, wavelength, d, x, and y
+        """
+        from cog.core.prediction import predict_spots
+
+        return predict_spots(self).drop(columns="frame")
+
     def get_realspace_unitcell_vectors(self):
         """
         Get unit cell vectors in realspace lattice basis (a, b, c)
         """
         a, b, c = self.get_realspace_Amatrix()
         return a, b, c
+
+
+def orthogonalization_matrix(cell):
+    """
+    Compute real-space orthogonalization matrix from unit cell parameters.
+
+    Parameters
+    ----------
+    cell : tuple(a, b, c, alpha, beta, gamma)
+        Unit cell parameters in angstroms and degrees
+    """
+    a, b, c = map(float, cell[:3])
+    alpha, beta, gamma = np.deg2rad(np.array(cell[3:], dtype=float))
+
+    # Compute unit cell volume
+    V = (
+        a
+        * b
+        * c
+        * np.sqrt(
+            1
+            - np.cos(alpha) ** 2
+            - np.cos(beta) ** 2
+            - np.cos(gamma) ** 2
+            + 2 * np.cos(alpha) * np.cos(beta) * np.cos(gamma)
+        )
+    )
+
+    # Compute Cartesian orthogonalization matrix (Rupp, Page 746)
+    O = np.zeros((3, 3))
+    O[0, 0] = a
+    O[0, 1] = b * np.cos(gamma)
+    O[1, 1] = b * np.sin(gamma)
+    O[0, 2] = c * np.cos(beta)
+    O[1, 2] = c * (np.cos(alpha) - (np.cos(beta) * np.cos(gamma))) / np.sin(gamma)
+    O[2, 2] = V / (a * b * np.sin(gamma))
+
+    return O.T
+
+
+def goniometer_rotation_matrix(omega, phi):
+    """
+    Compute rotation matrices associated with goniometer settings.
+
+    Parameters
+    ----------
+    omega : tuple(omega1, omega2)
+        Omega angles in degrees
+    phi : float or np.ndarray (n,)
+        Goniometer phi angle(s) in degrees
+
+    Returns
+    -------
+    np.ndarray (3, 3) or (n, 3, 3)
+        Rotation matrix for each phi angle
+    """
+    o1 = np.deg2rad(float(omega[0]))
+    o2 = np.deg2rad(float(omega[1]))
+    gonio_phi = np.deg2rad(np.asarray(phi, dtype=float))[..., None, None]
+
+    def get_rotation_matrix(axis, angle):
+        u = axis
+        sin, cos = np.sin(angle), np.cos(angle)
+        return (
+            cos * np.eye(3)
+            + sin * np.cross(u, -np.eye(3))
+            + (1.0 - cos) * np.outer(u, u)
+        )
+
+    R = get_rotation_matrix(np.array([0.0, 0.0, -1.0]), o1)
+    R = get_rotation_matrix(np.array([0.0, 1.0, 0.0]), o2) @ R
+    R = get_rotation_matrix((R @ np.array([0.0, 1.0, 0.0])), gonio_phi) @ R
+    return R
@@ -0,0 +1,185 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+
+class FrameIndex:
+    """
+    Sorted and grouped indexes over the frames of an Experiment.
+
+    Provides O(log n) lookup of frames by goniometer angle or collection
+    time, and O(1) lookup of frames by delay. The indexes are built once
+    from Experiment.images and must be rebuilt if the phi, delay, or time
+    columns change.
+
+    Parameters
+    ----------
+    images : pd.DataFrame
+        DataFrame of images indexed by filename (Experiment.images)
+    """
+
+    def __init__(self, images):
+        files = images.index.to_numpy()
+
+        # Sorted goniometer angles
+        if "phi" in images.columns:
+            phi = images["phi"].to_numpy(dtype=float)
+            order = np.argsort(phi, kind="stable")
+            self._phi = phi[order]
+            self._phiFiles = files[order]
+
+            # Goniometer angles wrapped to [0, 360) for periodic lookup
+            wrapped = np.mod(phi, 360.0)
+            order = np.argsort(wrapped, kind="stable")
+            self._wrapped = wrapped[order]
+            self._wrappedFiles = files[order]
+        else:
+            self._phi = None
+
+        # Groups of frames per delay
+        if "delay" in images.columns:
+            groups = images.groupby("delay", observed=True, sort=False).indices
+            self._delays = {k: files[v] for k, v in groups.items()}
+        else:
+            self._delays = None
+
+        # Groups of frames per numeric delay, so that "1us" finds "1000ns"
+        if "delay_ns" in images.columns:
+            groups = images.groupby("delay_ns", sort=False).indices
+            self._delaysNs = {k: files[v] for k, v in groups.items()}
+        else:
+            self._delaysNs = {}
+
+        # Sorted collection times (ns since epoch)
+        if "time" in images.columns:
+            times = parse_times(images["time"])
+            self._tz = getattr(times.dtype, "tz", None)
+            times = times.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+            order = np.argsort(times, kind="stable")
+            self._times = times[order]
+            self._timeFiles = files[order]
+        else:
+            self._times = None
+
+    def _require(self, attr, column):
+        if getattr(self, attr) is None:
+            raise KeyError(f"Experiment.images has no '{column}' column")
+        return getattr(self, attr)
+
+    def nearestPhi(self, phi):
+        """
+        Get filename of frame with goniometer angle closest to phi. Angles
+        are compared modulo 360 degrees.
+
+        Parameters
+        ----------
+        phi : float
+            Goniometer angle in degrees
+
+        Returns
+        -------
+        str
+            Filename of nearest frame
+        """
+        self._require("_phi", "phi")
+        angles = self._wrapped
+        if len(angles) == 0:
+            raise KeyError("Experiment.images is empty")
+
+        # Compare neighbors on the circle, wrapping around at 0/360 degrees
+        phi = np.mod(phi, 360.0)
+        i = np.searchsorted(angles, phi)
+        candidates = np.array([i - 1, i]) % len(angles)
+        distance = np.abs(np.mod(angles[candidates] - phi + 180.0, 360.0) - 180.0)
+        return self._wrappedFiles[candidates[np.argmin(distance)]]
+
+    def phiRange(self, start, stop):
+        """
+        Get filenames of frames with start <= phi <= stop, sorted by phi.
+        """
+        angles = self._require("_phi", "phi")
+        i = np.searchsorted(angles, start, side="left")
+        j = np.searchsorted(angles, stop, side="right")
+        return self._phiFiles[i:j]
+
+    def atDelay(self, delay):
+        """
+        Get filenames of frames collected at the given delay. The delay can
+        be given as a label (e.g. "off", "100ns", "1us") or in ns.
+        """
+        delays = self._require("_delays", "delay")
+        if delay in delays:
+            return delays[delay]
+        if isinstance(delay, str):
+            delay = parse_delays(pd.Series([delay]))[0]
+        return self._delaysNs.get(delay, np.array([], dtype=object))
+
+    def timeWindow(self, start, stop):
+        """
+        Get filenames of frames collected with start <= time <= stop,
+        sorted by time. Timezone-naive bounds are interpreted in the
+        timezone of the logs.
+        """
+        times = self._require("_times", "time")
+        bounds = []
+        for t in (start, stop):
+            t = pd.Timestamp(t)
+            if self._tz is not None and t.tz is None:
+                t = t.tz_localize(self._tz)
+            bounds.append(t.value)
+        i = np.searchsorted(times, bounds[0], side="left")
+        j = np.searchsorted(times, bounds[1], side="right")
+        return self._timeFiles[i:j]
+
+
+def parse_times(times):
+    """
+    Convert collection times to datetime64, keeping the logged timezone.
+
+    Parameters
+    ----------
+    times : pd.Series
+        Collection times from BioCARS logs
+
+    Returns
+    -------
+    pd.Series
+        Collection times as datetime64. Logs spanning a change in UTC
+        offset are converted to UTC
+    """
+    if times.dtype.kind != "M":
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                times = pd.to_datetime(times)
+        except ValueError:
+            pass
+
+    if times.dtype.kind != "M":
+        times = pd.to_datetime(times, utc=True)
+    return times
+
+
+_DELAY_UNITS = {"fs": 1e-6, "ps": 1e-3, "ns": 1.0, "us": 1e3, "ms": 1e6, "s": 1e9}
+
+
+def parse_delays(delays):
+    """
+    Convert delay labels (e.g. "100ns", "1us", "off") to nanoseconds.
+
+    Parameters
+    ----------
+    delays : pd.Series
+        Delay labels from Experiment.images
+
+    Returns
+    -------
+    pd.Series
+        Delays in ns as float64. Labels that are not a time (e.g. "off")
+        are returned as NaN
+    """
+    fields = delays.astype(str).str.extract(
+        r"^\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*(fs|ps|ns|us|ms|s)\s*$"
+    )
+    values = pd.to_numeric(fields[0], errors="coerce")
+    return values * fields[1].map(_DELAY_UNITS).astype(float)
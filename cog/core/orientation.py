@@ -0,0 +1,169 @@
+"""
+Vectorized comparison of crystal orientations across frames.
+
+Each frame's A* matrix is corrected for the goniometer rotation at its
+logged phi, so that frames can be compared with each other and with a
+reference geometry. Frames whose orientation disagrees with the reference
+(e.g. due to misindexing or crystal slippage) are flagged as outliers.
+Misorientations are minimized over the rotational symmetry of the Laue
+class, so that equivalent indexing settings are not reported.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cog.core.framegeometry import goniometer_rotation_matrix
+from cog.core.symmetry import pointgroup_operators
+
+# Change of basis from Precognition to cog's lab frame (see FrameGeometry)
+PRECOG2MOSFLM = np.array([[0, 0, 1], [0, -1, 0], [1, 0, 0]])
+
+
+def polar_rotation(M):
+    """
+    Nearest rotation matrices to M (..., 3, 3) from the polar decomposition
+    """
+    U, _, Vt = np.linalg.svd(M)
+    flip = np.linalg.det(U @ Vt) < 0
+    U[flip, :, -1] *= -1
+    return U @ Vt
+
+
+def rotation_angle(R):
+    """Rotation angles in degrees of rotation matrices R (..., 3, 3)"""
+    cos = (np.trace(R, axis1=-2, axis2=-1) - 1.0) / 2.0
+    return np.rad2deg(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def misorientation(rotations, operators):
+    """
+    Smallest rotation angle of each rotation over symmetry operators.
+
+    Parameters
+    ----------
+    rotations : np.ndarray (n, 3, 3)
+        Relative rotations between pairs of orientations
+    operators : np.ndarray (k, 3, 3)
+        Symmetry operators as Cartesian rotations
+
+    Returns
+    -------
+    np.ndarray (n,)
+        Misorientation angles in degrees
+    """
+    # trace(R @ S) for all pairs in one step
+    traces = np.einsum("nij,kji->nk", rotations, operators)
+    cos = np.clip((traces.max(axis=1) - 1.0) / 2.0, -1.0, 1.0)
+    return np.rad2deg(np.arccos(cos))
+
+
+def cluster_orientations(rotations, operators, tolerance=1.0):
+    """
+    Greedily cluster orientations that are within tolerance of each other.
+
+    Parameters
+    ----------
+    rotations : np.ndarray (n, 3, 3)
+        Orientations relative to a common reference
+    operators : np.ndarray (k, 3, 3)
+        Symmetry operators as Cartesian rotations
+    tolerance : float
+        Maximal misorientation in degrees between a frame and the seed of
+        its cluster
+
+    Returns
+    -------
+    np.ndarray (n,)
+        Cluster labels, numbered by decreasing cluster size
+    """
+    labels = np.full(len(rotations), -1)
+    label = 0
+    while (labels < 0).any():
+        unassigned = np.flatnonzero(labels < 0)
+        seed = rotations[unassigned[0]]
+        relative = seed.T @ rotations[unassigned]
+        members = misorientation(relative, operators) <= tolerance
+        members[0] = True
+        labels[unassigned[members]] = label
+        label += 1
+
+    # Renumber clusters by size
+    sizes = np.bincount(labels)
+    order = np.argsort(-sizes, kind="stable")
+    return np.argsort(order)[labels]
+
+
+def compare_orientations(
+    geometries,
+    phi,
+    reference,
+    spacegroup=None,
+    max_angle=None,
+    nsigma=5.0,
+    min_angle=0.5,
+    tolerance=1.0,
+):
+    """
+    Compare refined orientations of frames with the orientation predicted
+    from a reference geometry and the goniometer.
+
+    Parameters
+    ----------
+    geometries : pd.Series of cog.FrameGeometry
+        Refined geometries indexed by frame
+    phi : pd.Series
+        Logged goniometer phi angles in degrees, indexed by frame
+    reference : cog.FrameGeometry
+        Reference geometry whose orientation is rotated to each phi
+    spacegroup : int
+        Space group number. Defaults to that of the reference geometry
+    max_angle : float
+        Misorientation in degrees above which frames are outliers. If not
+        given, a robust threshold of median + nsigma * MAD is used
+    nsigma : float
+        Number of robust standard deviations for the outlier threshold
+    min_angle : float
+        Lower bound in degrees for the robust outlier threshold
+    tolerance : float
+        Tolerance in degrees for clustering orientations
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by frame with misorientation (degrees),
+        orientation_cluster, and orientation_outlier columns
+    """
+    if spacegroup is None:
+        spacegroup = reference.spacegroup
+    phi = phi.loc[geometries.index].to_numpy(dtype=float)
+
+    # Goniometer-corrected reciprocal basis (U @ B) of each frame and of
+    # the reference
+    R = goniometer_rotation_matrix(reference.omega, phi)
+    Astar = np.stack([g.get_reciprocal_Amatrix() for g in geometries])
+    C = np.swapaxes(R, 1, 2) @ (PRECOG2MOSFLM.T @ Astar)
+    Cref = reference.get_missetting_matrix() @ np.linalg.inv(
+        reference.get_orthogonalization_matrix()
+    )
+
+    # Symmetry operators as Cartesian rotations in the reference basis
+    M = pointgroup_operators(spacegroup)
+    S = polar_rotation(Cref @ M @ np.linalg.inv(Cref))
+
+    # Relative rotations from the reference to each frame
+    D = polar_rotation(C @ np.linalg.inv(Cref))
+    angles = misorientation(D, S)
+
+    if max_angle is None:
+        median = np.median(angles)
+        mad = 1.4826 * np.median(np.abs(angles - median))
+        max_angle = max(min_angle, median + nsigma * mad)
+
+    return pd.DataFrame(
+        {
+            "misorientation": angles,
+            "orientation_cluster": cluster_orientations(D, S, tolerance),
+            "orientation_outlier": angles > max_angle,
+        },
+        index=geometries.index,
+    )
@@ -0,0 +1,148 @@
+"""
+Pairing of laser-on frames with laser-off reference frames.
+
+In time-resolved sweeps, each laser-on frame is collected at (nearly) the
+same goniometer angle as a laser-off reference frame, usually right before
+or after it. Frames are paired with pd.merge_asof: first by collection
+time among off frames at the same phi, and then, for frames without such
+a partner, by the nearest phi within tolerance. Frames of repeat passes at
+the same phi are grouped with phi_groups().
+"""
+
+import numpy as np
+import pandas as pd
+
+from cog.core.frameindex import parse_times
+
+PAIR_COLUMNS = ["delay", "off", "phi", "phi_off", "dphi", "dt"]
+
+
+def _phiKey(phi, tolerance):
+    """Integer key of goniometer angles binned by tolerance (mod 360)"""
+    nbins = int(round(360.0 / tolerance))
+    return np.round(np.mod(phi, 360.0) / tolerance).astype(np.int64) % nbins
+
+
+def phi_groups(phi, tolerance=0.01):
+    """
+    Group goniometer angles that agree within tolerance (mod 360).
+
+    Angles are sorted, and a new group starts wherever consecutive angles
+    differ by more than tolerance, so chains of close angles form a single
+    group. Groups on either side of 0/360 are merged.
+
+    Parameters
+    ----------
+    phi : array-like
+        Goniometer angles in degrees
+    tolerance : float
+        Maximal difference in phi (degrees) between neighbouring angles
+        of a group
+
+    Returns
+    -------
+    np.ndarray
+        Integer group label of each angle, numbered in order of phi
+    """
+    wrapped = np.mod(np.asarray(phi, dtype=float), 360.0)
+    if len(wrapped) == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = np.argsort(wrapped, kind="stable")
+    steps = np.diff(wrapped[order]) > tolerance
+    labels = np.empty(len(wrapped), dtype=np.int64)
+    labels[order] = np.concatenate([[0], np.cumsum(steps)])
+
+    # Merge last group into first across 0/360
+    last = labels[order[-1]]
+    if last > 0 and wrapped[order[0]] + 360.0 - wrapped[order[-1]] <= tolerance:
+        labels[labels == last] = 0
+    return labels
+
+
+def pair_frames(images, phi_tolerance=0.01, max_time=None, off_label="off"):
+    """
+    Pair each laser-on frame with its nearest laser-off reference.
+
+    Parameters
+    ----------
+    images : pd.DataFrame
+        DataFrame of images indexed by filename with phi and delay columns,
+        and optionally a time column (Experiment.images)
+    phi_tolerance : float
+        Maximal difference in phi (degrees) between paired frames
+    max_time : float
+        Maximal time difference in seconds between paired frames at the
+        same phi. If None, the nearest off frame in time is used
+    off_label : str
+        Delay label of laser-off frames
+
+    Returns
+    -------
+    pd.DataFrame
+        Pair table indexed by the filename of each laser-on frame with the
+        delay, the paired off frame (NaN if none was found), phi of both
+        frames, their difference in phi, and their difference in collection
+        time in seconds (on - off)
+    """
+    delay = images["delay"].astype(str)
+    isOff = (delay == off_label).to_numpy()
+    frames = pd.DataFrame(
+        {
+            "frame": images.index.to_numpy(),
+            "delay": delay.to_numpy(),
+            "phi": images["phi"].to_numpy(dtype=float),
+        }
+    )
+    frames["key"] = _phiKey(frames["phi"].to_numpy(), phi_tolerance)
+    hasTime = "time" in images.columns
+    if hasTime:
+        times = parse_times(images["time"]).to_numpy(dtype="datetime64[ns]")
+        frames["time"] = times.astype(np.int64)
+
+    on = frames[~isOff]
+    off = frames[isOff].rename(
+        columns={"frame": "off", "phi": "phi_off", "delay": "delay_off"}
+    )
+    if hasTime:
+        off = off.rename(columns={"time": "time_off"})
+    off = off.assign(wrapped=np.mod(off["phi_off"].to_numpy(), 360.0))
+
+    # Nearest off frame in time at the same phi
+    if hasTime and len(off):
+        tolerance = None if max_time is None else int(max_time * 1e9)
+        pairs = pd.merge_asof(
+            on.sort_values("time"),
+            off.sort_values("time_off"),
+            left_on="time",
+            right_on="time_off",
+            by="key",
+            direction="nearest",
+            tolerance=tolerance,
+        )
+    else:
+        pairs = on.assign(off=np.nan, phi_off=np.nan, time_off=np.nan)
+
+    # Nearest off frame in phi for frames without a partner at the same key
+    unpaired = pairs["off"].isna().to_numpy()
+    if unpaired.any() and len(off):
+        left = pairs.loc[unpaired, list(on.columns)]
+        left = left.assign(wrapped=np.mod(left["phi"].to_numpy(), 360.0))
+        right = off.drop(columns="key").sort_values("wrapped")
+        nearest = pd.merge_asof(
+            left.sort_values("wrapped"),
+            right,
+            on="wrapped",
+            direction="nearest",
+            tolerance=phi_tolerance,
+        )
+        pairs = pd.concat([pairs[~unpaired], nearest], ignore_index=True)
+
+    pairs = pairs.set_index("frame").reindex(on["frame"])
+    pairs.index.name = images.index.name
+    dphi = pairs["phi"] - pairs["phi_off"]
+    pairs["dphi"] = (dphi + 180.0) % 360.0 - 180.0
+    if hasTime:
+        pairs["dt"] = (pairs["time"] - pairs["time_off"]) / 1e9
+    else:
+        pairs["dt"] = np.nan
+    return pairs[PAIR_COLUMNS]
@@ -0,0 +1,227 @@
+"""
+Persistent pool of Precognition workers.
+
+Every call to a cog.commands function launches a new shell that sources
+the spack environment before running Precognition, and writes its input
+and output files to the current directory. For large sweeps, this startup
+overhead is comparable to the time spent in Precognition itself, and
+parallel calls from the same directory overwrite each other's files.
+
+PrecognitionPool keeps long-lived worker processes. Each worker:
+
+* runs in its own scratch directory, so concurrent jobs are isolated
+* runs Precognition directly in an environment that is resolved once
+* is pinned to CPUs, so that caches stay warm between frames (see
+  cog.core.scheduling for placement policies)
+* waits while the node is overloaded, if a maximal load is given
+
+Workers pull jobs from a shared queue, and results are returned as
+futures. The throughput of each pool configuration is reported by
+PrecognitionPool.report().
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from cog.core import precognition, timing
+from cog.core.scheduling import assign_cpus, available_cpus, numa_nodes, wait_for_load
+from cog.core.timing import Timer
+
+# Maximal load average at which workers start jobs (set per worker)
+_maxLoad = None
+
+
+def _initWorker(scratch, cpus, environment, max_load):
+    """Set up scratch directory, CPU affinity, and environment of worker"""
+    global _maxLoad
+
+    workdir = tempfile.mkdtemp(prefix=f"worker{os.getpid()}-", dir=scratch)
+    os.chdir(workdir)
+
+    cpuset = cpus.get()
+    if cpuset is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpuset)
+
+    precognition._environment = environment
+    _maxLoad = max_load
+    return
+
+
+def _runCommand(command, args, kwargs):
+    """
+    Run cog.commands function in worker and return (result, seconds,
+    records), where records are the timings recorded for this job
+    """
+    from cog import commands
+
+    if _maxLoad is not None:
+        wait_for_load(_maxLoad)
+
+    timing.reset()
+    with Timer(command) as t:
+        result = getattr(commands, command)(*args, **kwargs)
+    return result, t.elapsed, timing.records()
+
+
+class PrecognitionPool:
+    """
+    Pool of long-lived worker processes for running Precognition.
+
+    Parameters
+    ----------
+    nworkers : int
+        Number of worker processes. Defaults to the number of available
+        CPUs times oversubscribe
+    scratch : str
+        Directory in which worker scratch directories are created. Defaults
+        to a new temporary directory that is removed when the pool is closed
+    placement : str
+        Policy for pinning workers to CPUs ("compact", "spread", "node", or
+        None). See cog.core.scheduling
+    oversubscribe : float
+        Number of workers per CPU, if nworkers is not given
+    max_load : float
+        If given, workers wait before each job while the 1-minute load
+        average of the node exceeds max_load
+    cpus : list of int
+        CPUs to which workers are pinned. Defaults to the CPUs available to
+        this process, grouped by NUMA node
+
+    Examples
+    --------
+    >>> with PrecognitionPool(placement="spread", max_load=64) as pool:
+    ...     exp.refineImages(pool=pool)
+    >>> pool.report()
+    """
+
+    def __init__(
+        self,
+        nworkers=None,
+        scratch=None,
+        placement="compact",
+        oversubscribe=1.0,
+        max_load=None,
+        cpus=None,
+    ):
+        nodes = numa_nodes(cpus=cpus)
+        if nworkers is None:
+            ncpus = len(available_cpus() if cpus is None else cpus)
+            nworkers = max(1, round(oversubscribe * ncpus))
+
+        self._ownsScratch = scratch is None
+        if scratch is None:
+            scratch = tempfile.mkdtemp(prefix="cog-")
+        else:
+            os.makedirs(scratch, exist_ok=True)
+        self.scratch = os.path.abspath(scratch)
+        self.nworkers = nworkers
+        self.placement = placement
+        self.max_load = max_load
+
+        # Each worker takes its CPUs from the queue at startup
+        context = multiprocessing.get_context()
+        queue = context.Queue()
+        for cpuset in assign_cpus(nworkers, placement, nodes):
+            queue.put(cpuset)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=nworkers,
+            mp_context=context,
+            initializer=_initWorker,
+            initargs=(
+                self.scratch,
+                queue,
+                precognition.resolve_environment(),
+                max_load,
+            ),
+        )
+
+        # Throughput statistics
+        self._start = None
+        self._end = None
+        self._seconds = []
+
+    def submit(self, command, *args, **kwargs):
+        """
+        Submit a cog.commands function to the pool.
+
+        Parameters
+        ----------
+        command : str
+            Name of function in cog.commands (e.g. "refine", "index")
+        *args, **kwargs
+            Arguments to function. Paths must be absolute, because workers
+            run in their own scratch directories
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future for (result, seconds), where seconds is the wall-clock
+            time spent in the worker. Timings recorded in the worker are
+            merged into cog.core.timing once the job completes
+        """
+        if self._start is None:
+            self._start = time.perf_counter()
+
+        future = Future()
+        job = self._executor.submit(_runCommand, command, args, kwargs)
+        job.add_done_callback(lambda job: self._complete(job, future))
+        return future
+
+    def _complete(self, job, future):
+        """Merge worker timings and resolve future with (result, seconds)"""
+        self._end = time.perf_counter()
+        try:
+            result, seconds, records = job.result()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+
+        timing.merge(records)
+        self._seconds.append(seconds)
+        future.set_result((result, seconds))
+        return
+
+    def report(self):
+        """
+        Report throughput of jobs run by this pool.
+
+        Returns
+        -------
+        dict
+            Configuration of the pool (nworkers, placement, max_load), the
+            number of completed frames, the wall-clock seconds from the
+            first submission to the last completion, the throughput in
+            frames per second, and the mean seconds per frame in a worker
+        """
+        frames = len(self._seconds)
+        wall = (self._end - self._start) if frames else 0.0
+        return {
+            "nworkers": self.nworkers,
+            "placement": self.placement,
+            "max_load": self.max_load,
+            "frames": frames,
+            "seconds": wall,
+            "throughput": frames / wall if wall > 0 else float("nan"),
+            "seconds_per_frame": (
+                sum(self._seconds) / frames if frames else float("nan")
+            ),
+        }
+
+    def close(self):
+        """Shut down workers and remove scratch directory if owned"""
+        self._executor.shutdown(wait=True)
+        if self._ownsScratch:
+            shutil.rmtree(self.scratch, ignore_errors=True)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
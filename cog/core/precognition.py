@@ -1,4 +1,51 @@
+import os
+import shlex
 import subprocess
+from cog.core.timing import Timer
+
+# Paths
+spack_source = "/n/holylfs05/LABS/hekstra_lab/Lab/garden/lib/spack/share/spack/setup-env.sh"
+garden = "/n/holylfs05/LABS/hekstra_lab/Lab/garden"
+precognition = f"{garden}/precognition/Precognition_5.2_distrib"
+executable = "Precognition_T5.2.2_x86_64"
+
+# Environment resolved by resolve_environment()
+_environment = None
+
+
+def _setenv():
+    """Shell commands that set up the Precognition environment"""
+    return f"source {spack_source}; spack load gcc; source {precognition}/setup_precog_spack.sh"
+
+
+def resolve_environment():
+    """
+    Resolve the Precognition environment once and cache it for this process.
+
+    Sourcing the spack environment takes longer than many Precognition
+    runs. Once the environment has been resolved, run() launches
+    Precognition directly with it instead of through a new shell.
+
+    Returns
+    -------
+    dict
+        Environment variables with which to run Precognition
+    """
+    global _environment
+    if _environment is not None:
+        return _environment
+
+    if "COG_PRECOGNITION" in os.environ:
+        _environment = dict(os.environ)
+    else:
+        output = subprocess.run(
+            ["bash", "-c", f"{_setenv()} > /dev/null 2>&1; env -0"],
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        variables = [v.split("=", 1) for v in output.decode().split("\0") if "=" in v]
+        _environment = dict(variables)
+    return _environment
 
 
 def run(inpfile, logfile):
@@ -12,16 +59,30 @@ def run(inpfile, logfile):
         Input file with Precognition commands
     logfile : filename
         File to which Precognition log will be written
+
+    Notes
+    -----
+    If the COG_PRECOGNITION environment variable is set, it is used as the
+    Precognition command instead of the spack installation on the cluster.
+    This is useful for testing and benchmarking against a fake binary.
+
+    If resolve_environment() has been called in this process, Precognition
+    is run directly with the resolved environment.
     """
-    # Paths
-    spack_source = "/n/holylfs05/LABS/hekstra_lab/Lab/garden/lib/spack/share/spack/setup-env.sh"
-    garden = "/n/holylfs05/LABS/hekstra_lab/Lab/garden"
-    precognition = f"{garden}/precognition/Precognition_5.2_distrib"
+    # Run directly in a resolved environment
+    if _environment is not None:
+        cmd = shlex.split(os.environ.get("COG_PRECOGNITION", executable))
+        with Timer("precognition"), open(logfile, "w") as log:
+            subprocess.call(cmd + [inpfile], stdout=log, env=_environment)
+        return
 
     # Commands
-    setenv = f"source {spack_source}; spack load gcc; source {precognition}/setup_precog_spack.sh"
-    precog = f"Precognition_T5.2.2_x86_64 {inpfile} > {logfile}"
-    cmd = f"{setenv}; {precog}"
+    if "COG_PRECOGNITION" in os.environ:
+        cmd = f"{os.environ['COG_PRECOGNITION']} {inpfile} > {logfile}"
+    else:
+        precog = f"{executable} {inpfile} > {logfile}"
+        cmd = f"{_setenv()}; {precog}"
 
-    # Run command
-    subprocess.call(cmd, shell=True)
+    # Run command (timing includes the spack environment setup)
+    with Timer("precognition"):
+        subprocess.call(cmd, shell=True)
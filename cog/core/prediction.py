@@ -0,0 +1,196 @@
+"""
+Vectorized prediction of Laue spots from Precognition geometries.
+
+Spots are predicted in the lab frame of FrameGeometry.get_reciprocal_Amatrix(),
+in which the X-ray beam travels along -z (see cog.up). The detector is
+normal to the beam at the given distance, with its fast and slow axes
+along lab x and y, respectively. Swing rotates the detector about the
+sample and tilt rotates it about its center (both given as rotations about
+lab y and x, in degrees). The beam center is the pixel at which the beam
+axis, rotated by swing, meets the detector, i.e. the foot of the
+perpendicular from the sample onto the untilted detector. Bulge is not
+modeled.
+
+Harmonics (hkl and n*hkl) that are both in the wavelength band project
+onto the same detector position and are all reported.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cog.core.framegeometry import FrameGeometry, orthogonalization_matrix
+
+BEAM = np.array([0.0, 0.0, -1.0])
+
+
+def _rotation(axis, angles):
+    """Rotation matrices (n, 3, 3) about lab x (axis=0) or y (axis=1)"""
+    angles = np.deg2rad(np.asarray(angles, dtype=float))
+    cos, sin = np.cos(angles), np.sin(angles)
+    R = np.zeros(angles.shape + (3, 3))
+    i, j = [(1, 2), (2, 0)][axis]
+    R[..., axis, axis] = 1.0
+    R[..., i, i] = cos
+    R[..., j, j] = cos
+    R[..., i, j] = -sin
+    R[..., j, i] = sin
+    return R
+
+
+def enumerate_hkl(cell, dmin, dmax=np.inf):
+    """
+    Enumerate Miller indices within resolution limits.
+
+    Parameters
+    ----------
+    cell : tuple(a, b, c, alpha, beta, gamma)
+        Unit cell parameters in angstroms and degrees
+    dmin : float
+        High-resolution limit in angstroms
+    dmax : float
+        Low-resolution limit in angstroms
+
+    Returns
+    -------
+    np.ndarray (n, 3)
+        Miller indices with dmin <= d <= dmax
+    """
+    Binv = np.linalg.inv(orthogonalization_matrix(cell))
+    hmax = np.floor(np.array(cell[:3], dtype=float) / dmin).astype(int)
+    axes = [np.arange(-m, m + 1) for m in hmax]
+    hkl = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+    dstar = np.linalg.norm(hkl @ Binv.T, axis=1)
+    keep = (dstar <= 1.0 / dmin) & (dstar >= 1.0 / dmax) & (dstar > 0)
+    return hkl[keep]
+
+
+def detector_frames(distance, swing, tilt):
+    """
+    Compute detector origin and axes in the lab frame.
+
+    Parameters
+    ----------
+    distance : np.ndarray (n,)
+        Detector distances in mm
+    swing : np.ndarray (n, 2)
+        Swing angles in degrees
+    tilt : np.ndarray (n, 2)
+        Tilt angles in degrees
+
+    Returns
+    -------
+    (origin, fast, slow, normal) : tuple of np.ndarray (n, 3)
+        Position of the beam center on the detector (mm), which lies on the
+        beam axis rotated by swing, the fast and slow detector axes, and the
+        detector normal
+    """
+    swing, tilt = np.asarray(swing, dtype=float), np.asarray(tilt, dtype=float)
+    Rswing = _rotation(1, swing[:, 0]) @ _rotation(0, swing[:, 1])
+    Rdet = Rswing @ _rotation(1, tilt[:, 0]) @ _rotation(0, tilt[:, 1])
+
+    origin = np.asarray(distance, dtype=float)[:, None] * (Rswing @ BEAM)
+    fast = Rdet[..., :, 0]
+    slow = Rdet[..., :, 1]
+    normal = Rdet @ BEAM
+    return origin, fast, slow, normal
+
+
+def predict_spots(geometries, labels=None, chunksize=2_000_000):
+    """
+    Predict Laue spots on the detector for one or more geometries.
+
+    Parameters
+    ----------
+    geometries : cog.FrameGeometry, list of cog.FrameGeometry, or pd.Series
+        Geometries for which to predict spots. If a Series is given
+        (e.g. Experiment.images["geometry"]), its index labels the frames
+    labels : list
+        Labels of frames in the output. Defaults to the Series index, or to
+        the position of each geometry in the list
+    chunksize : int
+        Maximal number of (frame, hkl) pairs to evaluate at once
+
+    Returns
+    -------
+    pd.DataFrame
+        Predicted spots with columns frame, H, K, L, wavelength (angstroms),
+        d (angstroms), x and y (pixels)
+    """
+    if isinstance(geometries, FrameGeometry):
+        geometries = [geometries]
+    if isinstance(geometries, pd.Series):
+        labels = geometries.index if labels is None else labels
+        geometries = geometries.to_list()
+    labels = np.arange(len(geometries)) if labels is None else np.asarray(labels)
+
+    def params(attr, n):
+        return np.array([[float(v) for v in getattr(g, attr)[:n]] for g in geometries])
+
+    Astar = np.stack([g.get_reciprocal_Amatrix() for g in geometries])
+    resolution = params("resolution", 2)
+    wavelength = params("wavelength", 2)
+    center = params("center", 2)
+    pixel = params("pixel", 2)
+    origin, fast, slow, normal = detector_frames(
+        params("distance", 1)[:, 0], params("swing", 2), params("tilt", 2)
+    )
+
+    # Enumerate hkl once for the largest cell and highest resolution, with
+    # a margin for refined cells that differ slightly between frames
+    cells = np.array([g.crystal for g in geometries])
+    cell = (*cells[:, :3].max(axis=0), *cells[0, 3:])
+    dmin = 0.95 * resolution[:, 0].min()
+    hkl = enumerate_hkl(cell, dmin, resolution[:, 1].max())
+
+    results = []
+    step = max(1, chunksize // max(len(hkl), 1))
+    for start in range(0, len(geometries), step):
+        frames = np.arange(start, min(start + step, len(geometries)))
+
+        # Scattering vectors (frames, 3, hkl) and Laue wavelengths
+        q = (Astar[frames].reshape(-1, 3) @ hkl.T).reshape(len(frames), 3, -1)
+        qsq = np.einsum("nim,nim->nm", q, q)
+        lam = -2.0 * np.einsum("i,nim->nm", BEAM, q) / qsq
+
+        r = 1.0 / resolution[frames] ** 2
+        w = wavelength[frames]
+        valid = (qsq <= r[:, :1]) & (qsq >= r[:, 1:])
+        valid &= (lam >= w[:, :1]) & (lam <= w[:, 1:])
+        n, m = np.nonzero(valid)
+        f = frames[n]
+        lam = lam[n, m]
+        d = 1.0 / np.sqrt(qsq[n, m])
+
+        # Diffracted beam directions and intersection with detector plane
+        k = BEAM / lam[:, None] + q[n, :, m]
+        t = np.einsum("ni,ni->n", origin[f], normal[f]) / np.einsum(
+            "ni,ni->n", k, normal[f]
+        )
+        hit = t > 0
+        offset = t[hit, None] * k[hit] - origin[f[hit]]
+        f = f[hit]
+        x = center[f, 0] + np.einsum("ni,ni->n", offset, fast[f]) / pixel[f, 0]
+        y = center[f, 1] + np.einsum("ni,ni->n", offset, slow[f]) / pixel[f, 1]
+
+        h = hkl[m[hit]]
+        results.append(
+            pd.DataFrame(
+                {
+                    "frame": labels[f],
+                    "H": h[:, 0],
+                    "K": h[:, 1],
+                    "L": h[:, 2],
+                    "wavelength": lam[hit],
+                    "d": d[hit],
+                    "x": x,
+                    "y": y,
+                }
+            )
+        )
+
+    if not results:
+        return pd.DataFrame(
+            columns=["frame", "H", "K", "L", "wavelength", "d", "x", "y"]
+        )
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,154 @@
+"""
+CPU and NUMA-aware placement of concurrent Precognition runs.
+
+On large nodes, unpinned Precognition processes migrate between cores and
+NUMA nodes, which thrashes caches and contends for memory bandwidth. The
+functions here read the CPU topology from sysfs, assign CPUs to workers
+according to a placement policy, and throttle work while the node is
+loaded by other jobs. They are used by cog.core.pool.PrecognitionPool.
+
+Placement policies:
+
+* "compact": one CPU per worker, filling NUMA nodes in order
+* "spread": one CPU per worker, alternating between NUMA nodes
+* "node": all CPUs of a NUMA node per worker, alternating between nodes
+* None: no pinning
+"""
+
+import glob
+import os
+import re
+import time
+
+PLACEMENTS = ("compact", "spread", "node", None)
+
+
+def parse_cpulist(cpulist):
+    """
+    Parse a Linux cpulist (e.g. "0-3,8,10-11") into a list of CPUs.
+
+    Parameters
+    ----------
+    cpulist : str
+        Comma-separated CPUs and ranges of CPUs
+
+    Returns
+    -------
+    list of int
+        CPUs in the list, in ascending order
+    """
+    cpus = set()
+    for field in cpulist.strip().split(","):
+        if not field:
+            continue
+        start, _, stop = field.partition("-")
+        cpus.update(range(int(start), int(stop or start) + 1))
+    return sorted(cpus)
+
+
+def available_cpus():
+    """CPUs available to this process, in ascending order"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+
+def numa_nodes(sysfs="/sys/devices/system/node", cpus=None):
+    """
+    Get the CPUs of each NUMA node that are available to this process
+    (or among the given CPUs).
+
+    Parameters
+    ----------
+    sysfs : str
+        Path to NUMA node directory in sysfs
+    cpus : list of int
+        CPUs to consider. Defaults to the CPUs available to this process
+
+    Returns
+    -------
+    dict
+        Mapping of NUMA node number to list of CPUs. If the topology cannot
+        be read, all CPUs are assigned to node 0
+    """
+    available = set(available_cpus() if cpus is None else cpus)
+    nodes = {}
+    for path in glob.glob(os.path.join(sysfs, "node*", "cpulist")):
+        match = re.search(r"node(\d+)$", os.path.dirname(path))
+        if match is None:
+            continue
+        with open(path, "r") as f:
+            nodecpus = [c for c in parse_cpulist(f.read()) if c in available]
+        if nodecpus:
+            nodes[int(match.group(1))] = nodecpus
+
+    if not nodes:
+        return {0: sorted(available)}
+    return dict(sorted(nodes.items()))
+
+
+def assign_cpus(nworkers, placement="compact", nodes=None):
+    """
+    Assign CPUs to workers.
+
+    Parameters
+    ----------
+    nworkers : int
+        Number of workers. If there are more workers than CPUs, CPUs are
+        shared round-robin (oversubscription)
+    placement : str
+        Placement policy ("compact", "spread", "node", or None)
+    nodes : dict
+        Mapping of NUMA node to list of CPUs. Defaults to numa_nodes()
+
+    Returns
+    -------
+    list
+        Set of CPUs for each worker, or None for each worker if placement
+        is None
+    """
+    if placement not in PLACEMENTS:
+        raise ValueError(f"Invalid placement {placement}, expected one of {PLACEMENTS}")
+    if placement is None:
+        return [None] * nworkers
+
+    nodes = numa_nodes() if nodes is None else nodes
+    groups = list(nodes.values())
+
+    if placement == "node":
+        return [set(groups[i % len(groups)]) for i in range(nworkers)]
+
+    if placement == "compact":
+        order = [cpu for cpus in groups for cpu in cpus]
+    else:
+        # Interleave CPUs of NUMA nodes
+        depth = max(len(cpus) for cpus in groups)
+        order = [cpus[i] for i in range(depth) for cpus in groups if i < len(cpus)]
+    return [{order[i % len(order)]} for i in range(nworkers)]
+
+
+def wait_for_load(max_load, interval=1.0, timeout=None):
+    """
+    Block while the 1-minute load average of the node exceeds max_load.
+
+    Parameters
+    ----------
+    max_load : float
+        Maximal load average at which to proceed
+    interval : float
+        Seconds between checks of the load average
+    timeout : float
+        Maximal number of seconds to wait. If None, wait indefinitely
+
+    Returns
+    -------
+    float
+        Seconds spent waiting
+    """
+    start = time.monotonic()
+    while os.getloadavg()[0] > max_load:
+        waited = time.monotonic() - start
+        if timeout is not None and waited >= timeout:
+            break
+        time.sleep(interval)
+    return time.monotonic() - start
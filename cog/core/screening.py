@@ -0,0 +1,119 @@
+"""
+Fast in-Python screening of diffraction images.
+
+Frames from beam dumps, missed shots, or an overloaded detector cannot be
+indexed or refined, but each of them costs a full Precognition run. The
+statistics computed here are cheap enough to run over a whole sweep
+before processing, so that such frames can be skipped.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+
+from cog.io import MCCDImage
+
+
+def frame_statistics(image, binning=4, sigma=5.0):
+    """
+    Compute summary statistics for a single image.
+
+    Parameters
+    ----------
+    image : cog.io.MCCDImage or str
+        Image (or path to image) to be screened
+    binning : int
+        Number of pixels along each axis to sum before spot finding
+    sigma : float
+        Number of robust standard deviations above the background at which
+        binned pixels are considered part of a spot
+
+    Returns
+    -------
+    dict
+        Total counts, fraction of saturated pixels, and the number of
+        spots, estimated as local maxima above threshold in the binned image
+    """
+    if not isinstance(image, MCCDImage):
+        image = MCCDImage(image)
+    data = image.data
+
+    total = int(data.sum(dtype=np.int64))
+    saturated = np.count_nonzero(data >= image.saturation) / data.size
+
+    # Bin image to suppress noise and reduce the cost of spot finding
+    ny, nx = data.shape[0] // binning, data.shape[1] // binning
+    binned = data[: ny * binning, : nx * binning]
+    binned = binned.reshape(ny, binning, nx, binning).sum(axis=(1, 3), dtype=np.int64)
+
+    # Robust estimates of background and noise
+    background = np.median(binned)
+    noise = 1.4826 * np.median(np.abs(binned - background))
+    threshold = background + sigma * max(noise, np.sqrt(max(background, 1.0)))
+
+    # Count local maxima above threshold
+    center = binned[1:-1, 1:-1]
+    peaks = center > threshold
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if (dy, dx) != (1, 1):
+                peaks &= center >= binned[dy : ny - 2 + dy, dx : nx - 2 + dx]
+
+    return {
+        "total_counts": total,
+        "saturated_fraction": saturated,
+        "spots": int(np.count_nonzero(peaks)),
+    }
+
+
+def screen_frames(
+    paths,
+    min_spots=20,
+    max_saturated=0.001,
+    binning=4,
+    sigma=5.0,
+    nthreads=None,
+):
+    """
+    Screen images and flag those which should be skipped in processing.
+
+    Parameters
+    ----------
+    paths : list of str
+        Paths to images to be screened
+    min_spots : int
+        Frames with fewer spots are flagged as blank
+    max_saturated : float
+        Frames with a larger fraction of saturated pixels are flagged as
+        overloaded
+    binning : int
+        Number of pixels along each axis to sum before spot finding
+    sigma : float
+        Threshold for spot finding in robust standard deviations
+    nthreads : int
+        Number of threads used to screen images. Defaults to the number of
+        CPUs
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by filename with total_counts,
+        saturated_fraction, spots, and a boolean skip column
+    """
+    paths = list(paths)
+
+    def screen(path):
+        return frame_statistics(path, binning=binning, sigma=sigma)
+
+    # NumPy releases the GIL for reductions over large arrays
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        stats = list(executor.map(screen, paths))
+
+    columns = ["total_counts", "saturated_fraction", "spots"]
+    df = pd.DataFrame(
+        stats, index=[os.path.basename(p) for p in paths], columns=columns
+    )
+    df["skip"] = (df["spots"] < min_spots) | (df["saturated_fraction"] > max_saturated)
+    return df
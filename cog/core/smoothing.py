@@ -0,0 +1,148 @@
+"""
+Smoothing and interpolation of per-frame geometries along a sweep.
+
+Refining each frame independently gives noisy detector and orientation
+parameters, and frames that fail to refine get no geometry at all. The
+functions here tabulate the geometries of all frames, fit low-order
+polynomials of each parameter against phi (or time) in a single least
+squares solve, and evaluate the fits at any frame. Fitted missetting
+matrices are projected back onto rotations.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from cog.core.orientation import polar_rotation
+
+# Refined parameters of FrameGeometry and the number of values of each
+PARAMETERS = {"distance": 1, "center": 2, "swing": 2, "tilt": 2, "matrix": 9}
+
+# Number of decimals used when writing each parameter
+DECIMALS = {"distance": 3, "center": 2, "swing": 3, "tilt": 3, "matrix": 6}
+
+
+def _columns():
+    """Column names of geometry tables"""
+    columns = []
+    for parameter, n in PARAMETERS.items():
+        if n == 1:
+            columns.append(parameter)
+        elif n == 2:
+            columns.extend([f"{parameter}_x", f"{parameter}_y"])
+        else:
+            columns.extend([f"{parameter}_{i}{j}" for i in range(3) for j in range(3)])
+    return columns
+
+
+COLUMNS = _columns()
+
+
+def geometry_table(geometries, index=None):
+    """
+    Tabulate refined parameters of geometries.
+
+    Parameters
+    ----------
+    geometries : list of cog.FrameGeometry
+        Geometries to tabulate
+    index : list
+        Index of table (e.g. image filenames)
+
+    Returns
+    -------
+    pd.DataFrame
+        Table with one row per geometry and one column per parameter value
+        (distance, center_x/y, swing_x/y, tilt_x/y, and matrix_00...matrix_22)
+    """
+    values = [
+        [
+            g.distance[:1],
+            g.center[:2],
+            g.swing[:2],
+            g.tilt[:2],
+            g.matrix[:9],
+        ]
+        for g in geometries
+    ]
+    rows = [[v for field in row for v in field] for row in values]
+    table = np.array(rows, dtype=float).reshape(len(rows), len(COLUMNS))
+    return pd.DataFrame(table, index=index, columns=COLUMNS)
+
+
+def fit_parameters(x, table, degree=2, at=None):
+    """
+    Fit polynomials of all parameters against x and evaluate them.
+
+    Parameters
+    ----------
+    x : array-like (n,)
+        Coordinate of each row of table (e.g. phi or time in seconds)
+    table : pd.DataFrame (n, k)
+        Geometry table from geometry_table()
+    degree : int
+        Degree of the polynomials. Lowered if there are too few rows
+    at : array-like (m,)
+        Coordinates at which to evaluate the fits. Defaults to x
+
+    Returns
+    -------
+    np.ndarray (m, k)
+        Fitted parameters. Missetting matrices are projected onto the
+        nearest rotations
+    """
+    x = np.asarray(x, dtype=float)
+    at = x if at is None else np.asarray(at, dtype=float)
+    if len(x) == 0:
+        raise ValueError("Cannot fit geometries without any refined frames")
+    degree = max(0, min(degree, len(np.unique(x)) - 1))
+
+    # Scale coordinate to [-1, 1] for a well-conditioned fit
+    center = (x.max() + x.min()) / 2.0
+    scale = max((x.max() - x.min()) / 2.0, np.finfo(float).eps)
+    coefs = np.polynomial.polynomial.polyfit(
+        (x - center) / scale, table.to_numpy(dtype=float), degree
+    )
+    fitted = np.polynomial.polynomial.polyval((at - center) / scale, coefs).T
+    fitted = np.atleast_2d(fitted).reshape(len(at), table.shape[1])
+
+    matrix = [COLUMNS.index(c) for c in COLUMNS if c.startswith("matrix")]
+    rotations = fitted[:, matrix].reshape(-1, 3, 3)
+    fitted[:, matrix] = polar_rotation(rotations).reshape(-1, 9)
+    return fitted
+
+
+def apply_parameters(template, values, phi=None, image=None):
+    """
+    Geometry with parameters from a row of a geometry table.
+
+    Parameters
+    ----------
+    template : cog.FrameGeometry
+        Geometry from which all other attributes are copied
+    values : array-like (k,)
+        Parameter values in the order of geometry table columns
+    phi : float
+        Goniometer angle of geometry. Defaults to that of template
+    image : str
+        Image filename of geometry. Defaults to that of template
+
+    Returns
+    -------
+    cog.FrameGeometry
+        New geometry
+    """
+    geometry = copy.copy(template)
+    start = 0
+    for parameter, n in PARAMETERS.items():
+        fields = [f"{v:.{DECIMALS[parameter]}f}" for v in values[start : start + n]]
+        start += n
+        fields += list(getattr(template, parameter))[n:]
+        setattr(geometry, parameter, fields)
+
+    if phi is not None and template.goniometer:
+        geometry.goniometer = [*template.goniometer[:2], f"{phi:.3f}"]
+    if image is not None and template.image:
+        geometry.image = [template.image[0], image]
+    return geometry
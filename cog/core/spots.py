@@ -0,0 +1,108 @@
+"""
+Matching of observed and predicted spots.
+
+Observed spots can be read from Precognition spot lists with
+cog.io.read_spt() and predicted spots computed with
+cog.core.prediction.predict_spots(), so that geometries can be checked
+without another Precognition run.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def match_spots(observed, predicted, max_distance=5.0):
+    """
+    Match each observed spot to the nearest predicted spot using a KD-tree.
+
+    Parameters
+    ----------
+    observed : np.ndarray (n, >=2)
+        Observed spot positions in pixels (x, y in the first two columns)
+    predicted : np.ndarray (m, >=2)
+        Predicted spot positions in pixels (x, y in the first two columns)
+    max_distance : float
+        Maximal distance in pixels between matched spots
+
+    Returns
+    -------
+    (iobs, ipred, distance) : tuple of np.ndarray
+        Indices of matched observed and predicted spots, and the distances
+        between them in pixels
+    """
+    from scipy.spatial import cKDTree
+
+    observed = np.asarray(observed, dtype=float)[:, :2]
+    predicted = np.asarray(predicted, dtype=float)[:, :2]
+    if len(observed) == 0 or len(predicted) == 0:
+        empty = np.array([], dtype=int)
+        return empty, empty, np.array([], dtype=float)
+
+    tree = cKDTree(predicted)
+    distance, ipred = tree.query(observed, distance_upper_bound=max_distance)
+    matched = np.isfinite(distance)
+    return np.flatnonzero(matched), ipred[matched], distance[matched]
+
+
+def match_statistics(observed, predicted, max_distance=5.0):
+    """
+    Compute RMSD and number of matched spots between observed and
+    predicted spots.
+
+    Parameters
+    ----------
+    observed : np.ndarray (n, >=2)
+        Observed spot positions in pixels
+    predicted : np.ndarray (m, >=2)
+        Predicted spot positions in pixels
+    max_distance : float
+        Maximal distance in pixels between matched spots
+
+    Returns
+    -------
+    dict
+        RMSD in pixels between matched spots, number of matched spots, and
+        the numbers of observed and predicted spots
+    """
+    _, _, distance = match_spots(observed, predicted, max_distance)
+    rmsd = np.sqrt(np.mean(distance**2)) if len(distance) else np.nan
+    return {
+        "rmsd": rmsd,
+        "matched": len(distance),
+        "observed": len(observed),
+        "predicted": len(predicted),
+    }
+
+
+def compare_spots(observed, predicted, max_distance=5.0):
+    """
+    Compute spot-matching statistics for many frames.
+
+    Parameters
+    ----------
+    observed : dict
+        Mapping of frame to observed spot positions (np.ndarray)
+    predicted : pd.DataFrame
+        Predicted spots with frame, x, and y columns, as returned by
+        cog.core.prediction.predict_spots()
+    max_distance : float
+        Maximal distance in pixels between matched spots
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by frame with rmsd, matched, observed, and
+        predicted columns
+    """
+    groups = predicted.groupby("frame", sort=False).indices
+    xy = predicted[["x", "y"]].to_numpy(dtype=float)
+    empty = np.empty((0, 2))
+
+    stats = {}
+    for frame, spots in observed.items():
+        pred = xy[groups[frame]] if frame in groups else empty
+        stats[frame] = match_statistics(spots, pred, max_distance)
+
+    return pd.DataFrame.from_dict(
+        stats, orient="index", columns=["rmsd", "matched", "observed", "predicted"]
+    )
@@ -0,0 +1,224 @@
+"""
+Staging of images to node-local scratch.
+
+Experiment.pathToImages usually points at shared lab storage, and
+Precognition reads each image from there on demand. For batch jobs, the
+network filesystem becomes the bottleneck. ImageStager copies upcoming
+images to node-local scratch in processing order, using background copy
+threads, and keeps the staged copies in a cache of bounded size.
+"""
+
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import tempfile
+import threading
+
+from cog.core.timing import Timer
+
+
+class ImageStager:
+    """
+    Prefetch images to node-local scratch with a bounded-size cache.
+
+    Images are copied in the order in which they are prefetched, and space
+    in the cache is reserved strictly in that order. Staged images are
+    acquired with path() and returned with release(). Released images are
+    evicted in least-recently-used order when space is needed; images that
+    have not yet been acquired are never evicted, so copies wait for
+    releases once the cache is full. Images should therefore be acquired
+    in the order in which they were prefetched.
+
+    Parameters
+    ----------
+    source : str
+        Directory containing the images (e.g. Experiment.pathToImages)
+    scratch : str
+        Node-local directory for staged images. Defaults to a new temporary
+        directory that is removed when the stager is closed
+    max_bytes : int
+        Maximal size of staged images in bytes
+    nthreads : int
+        Number of copy threads
+
+    Examples
+    --------
+    >>> with ImageStager(exp.pathToImages, "/scratch/cog") as stager:
+    ...     exp.refineImages(pool=pool, stager=stager)
+    """
+
+    def __init__(self, source, scratch=None, max_bytes=16 * 2**30, nthreads=4):
+        self.source = os.path.abspath(source)
+        self.max_bytes = max_bytes
+
+        self._ownsScratch = scratch is None
+        if scratch is None:
+            scratch = tempfile.mkdtemp(prefix="cog-images-")
+        else:
+            os.makedirs(scratch, exist_ok=True)
+        self.directory = os.path.abspath(scratch)
+
+        self._executor = ThreadPoolExecutor(max_workers=nthreads)
+        self._condition = threading.Condition()
+        self._staged = OrderedDict()  # image -> bytes, in LRU order
+        self._pending = {}  # image -> Future of copy
+        self._inUse = Counter()
+        self._released = set()
+        self._bytes = 0
+        self._tickets = 0  # next ticket to hand out
+        self._granted = 0  # next ticket to reserve space for
+        self._closed = False
+
+    @property
+    def stagedBytes(self):
+        """Bytes used by staged images (including copies in progress)"""
+        return self._bytes
+
+    def prefetch(self, images):
+        """
+        Schedule asynchronous copies of images to scratch, in order.
+
+        Parameters
+        ----------
+        images : list of str
+            Filenames of images relative to source directory
+        """
+        with self._condition:
+            for image in images:
+                if image not in self._staged and image not in self._pending:
+                    self._submit(image)
+        return
+
+    def path(self, image):
+        """
+        Acquire staged copy of image, waiting for its copy if necessary.
+        The image must be returned with release() once it has been read.
+
+        Parameters
+        ----------
+        image : str
+            Filename of image relative to source directory
+
+        Returns
+        -------
+        str
+            Path to staged copy of image
+        """
+        with self._condition:
+            if image not in self._staged and image not in self._pending:
+                self._submit(image)
+            future = self._pending.get(image)
+            if future is None:
+                return self._acquire(image)
+
+        with Timer("stage_wait", image):
+            future.result()
+
+        with self._condition:
+            return self._acquire(image)
+
+    def _acquire(self, image):
+        """Mark staged image as in use (call with lock held)"""
+        self._inUse[image] += 1
+        self._released.discard(image)
+        self._staged.move_to_end(image)
+        return os.path.join(self.directory, image)
+
+    def release(self, image):
+        """Return acquired image, allowing it to be evicted"""
+        with self._condition:
+            self._inUse[image] -= 1
+            if self._inUse[image] <= 0:
+                del self._inUse[image]
+                self._released.add(image)
+                self._condition.notify_all()
+        return
+
+    def _evict(self):
+        """Remove least-recently-used released image. Returns success"""
+        for image in self._staged:
+            if image in self._released:
+                size = self._staged.pop(image)
+                self._released.discard(image)
+                os.remove(os.path.join(self.directory, image))
+                self._bytes -= size
+                return True
+        return False
+
+    def _submit(self, image):
+        """Schedule copy of image with the next ticket (call with lock held)"""
+        self._pending[image] = self._executor.submit(self._copy, image, self._tickets)
+        self._tickets += 1
+        return
+
+    def _reserve(self, image, ticket):
+        """
+        Reserve space for image in the cache. Reservations are granted in
+        ticket (prefetch) order, so that later images cannot take the space
+        needed by an earlier image that has not yet been acquired
+        """
+        try:
+            size = os.path.getsize(os.path.join(self.source, image))
+        except OSError as e:
+            size = e
+
+        with self._condition:
+            while self._granted != ticket:
+                if self._closed:
+                    raise RuntimeError("ImageStager has been closed")
+                self._condition.wait()
+
+            try:
+                if isinstance(size, OSError):
+                    raise size
+                while self._bytes > 0 and self._bytes + size > self.max_bytes:
+                    if self._closed:
+                        raise RuntimeError("ImageStager has been closed")
+                    if not self._evict():
+                        self._condition.wait()
+                self._bytes += size
+            finally:
+                self._granted += 1
+                self._condition.notify_all()
+        return size
+
+    def _copy(self, image, ticket):
+        """Copy image to scratch once there is space in the cache"""
+        dst = os.path.join(self.directory, image)
+        size = 0
+        try:
+            size = self._reserve(image, ticket)
+            with Timer("stage_copy", image):
+                shutil.copyfile(os.path.join(self.source, image), f"{dst}.part")
+                os.replace(f"{dst}.part", dst)
+        except BaseException:
+            with self._condition:
+                self._bytes -= size
+                del self._pending[image]
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._staged[image] = size
+            del self._pending[image]
+        return dst
+
+    def close(self):
+        """Stop copy threads and remove scratch directory if owned"""
+        with self._condition:
+            self._closed = True
+            for future in self._pending.values():
+                future.cancel()
+            self._condition.notify_all()
+        self._executor.shutdown(wait=True)
+        if self._ownsScratch:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
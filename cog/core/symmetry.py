@@ -0,0 +1,145 @@
+"""
+Rotational point-group operators for comparing crystal orientations.
+
+Orientations related by a proper rotation of the Laue class produce the
+same diffraction pattern, so comparisons of A matrices (e.g. between
+frames or against a reference) should be made over all symmetry
+equivalent settings.
+"""
+
+import numpy as np
+
+# Generators of rotational subgroups of the Laue classes, acting on
+# fractional coordinates (hexagonal axes for trigonal/hexagonal groups)
+_TWOFOLD_A = [[1, 0, 0], [0, -1, 0], [0, 0, -1]]
+_TWOFOLD_B = [[-1, 0, 0], [0, 1, 0], [0, 0, -1]]
+_TWOFOLD_C = [[-1, 0, 0], [0, -1, 0], [0, 0, 1]]
+_TWOFOLD_AB = [[0, 1, 0], [1, 0, 0], [0, 0, -1]]
+_TWOFOLD_ANTI_AB = [[0, -1, 0], [-1, 0, 0], [0, 0, -1]]
+_THREEFOLD_C = [[0, -1, 0], [1, -1, 0], [0, 0, 1]]
+_THREEFOLD_DIAG = [[0, 0, 1], [1, 0, 0], [0, 1, 0]]
+_FOURFOLD_C = [[0, -1, 0], [1, 0, 0], [0, 0, 1]]
+_SIXFOLD_C = [[1, -1, 0], [1, 0, 0], [0, 0, 1]]
+
+_GENERATORS = {
+    "1": [],
+    "2": [_TWOFOLD_B],
+    "222": [_TWOFOLD_C, _TWOFOLD_B],
+    "4": [_FOURFOLD_C],
+    "422": [_FOURFOLD_C, _TWOFOLD_A],
+    "3": [_THREEFOLD_C],
+    "312": [_THREEFOLD_C, _TWOFOLD_ANTI_AB],
+    "321": [_THREEFOLD_C, _TWOFOLD_AB],
+    "6": [_SIXFOLD_C],
+    "622": [_SIXFOLD_C, _TWOFOLD_AB],
+    "23": [_TWOFOLD_C, _TWOFOLD_B, _THREEFOLD_DIAG],
+    "432": [_TWOFOLD_C, _TWOFOLD_B, _THREEFOLD_DIAG, _FOURFOLD_C],
+}
+
+# Trigonal space groups in Laue class -31m
+_SPACEGROUPS_312 = {149, 151, 153, 157, 159, 162, 163}
+
+
+def rotational_pointgroup(spacegroup):
+    """
+    Get the rotational subgroup of the Laue class of a space group.
+
+    Parameters
+    ----------
+    spacegroup : int
+        Space group number (1-230)
+
+    Returns
+    -------
+    str
+        Point group symbol (e.g. "422", "321")
+    """
+    spacegroup = int(spacegroup)
+    if not 1 <= spacegroup <= 230:
+        raise ValueError(f"Invalid space group number: {spacegroup}")
+
+    if spacegroup in _SPACEGROUPS_312:
+        return "312"
+    bounds = [
+        (2, "1"),
+        (15, "2"),
+        (74, "222"),
+        (88, "4"),
+        (142, "422"),
+        (148, "3"),
+        (167, "321"),
+        (176, "6"),
+        (194, "622"),
+        (206, "23"),
+        (230, "432"),
+    ]
+    for upper, pointgroup in bounds:
+        if spacegroup <= upper:
+            return pointgroup
+
+
+def pointgroup_operators(spacegroup=None):
+    """
+    Get the rotational symmetry operators of a space group acting on
+    Miller indices.
+
+    Parameters
+    ----------
+    spacegroup : int
+        Space group number. If None, only the identity is returned
+
+    Returns
+    -------
+    np.ndarray (k, 3, 3)
+        Integer matrices M, such that the settings A* @ M are equivalent
+        to A*. The identity is always the first operator
+    """
+    if spacegroup is None:
+        generators = []
+    else:
+        generators = _GENERATORS[rotational_pointgroup(spacegroup)]
+
+    # Close group under multiplication
+    operators = [np.eye(3, dtype=int)]
+    queue = [np.array(g, dtype=int) for g in generators]
+    while queue:
+        op = queue.pop()
+        if any(np.array_equal(op, o) for o in operators):
+            continue
+        operators.append(op)
+        queue.extend(op @ o for o in list(operators))
+        queue.extend(o @ op for o in list(operators))
+
+    # Operators act on fractional coordinates; Miller indices transform
+    # with the transpose
+    return np.stack([o.T for o in operators])
+
+
+def equivalent_settings(matrix, cell, spacegroup=None):
+    """
+    Get all symmetry-equivalent settings of a missetting matrix.
+
+    Parameters
+    ----------
+    matrix : np.ndarray (3, 3)
+        Missetting rotation matrix (U)
+    cell : tuple(a, b, c, alpha, beta, gamma)
+        Unit cell parameters in angstroms and degrees
+    spacegroup : int
+        Space group number. If None, only the matrix itself is returned
+
+    Returns
+    -------
+    np.ndarray (k, 3, 3)
+        Missetting matrices U' with U' @ B = U @ B @ M for each symmetry
+        operator M. The first setting is the input matrix
+    """
+    from cog.core.framegeometry import orthogonalization_matrix
+
+    if cell is None:
+        spacegroup = None
+        cell = (1.0, 1.0, 1.0, 90.0, 90.0, 90.0)
+
+    B = np.linalg.inv(orthogonalization_matrix(cell))
+    M = pointgroup_operators(spacegroup)
+    return np.asarray(matrix, dtype=float) @ B @ M @ np.linalg.inv(B)
@@ -0,0 +1,164 @@
+"""
+Timing and profiling instrumentation for cog.
+
+Stages of the Precognition pipeline (writing .inp files, running
+Precognition, parsing logs, constructing FrameGeometry objects, and
+updating Experiment.images) are timed with the Timer context manager.
+Every timed block is appended to a module-level record that can be
+inspected with timings() or summarized with summary(). The record keeps
+only the most recent blocks (see set_max_records()), and should be
+cleared with reset() before timing a new batch run. Timings recorded in
+worker processes of cog.core.pool.PrecognitionPool are merged into the
+record of the parent process.
+"""
+
+from collections import deque
+import cProfile
+import pstats
+import time
+
+_records = deque(maxlen=1_000_000)
+
+
+class Timer:
+    """
+    Context manager that records the wall-clock time spent in a block.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the pipeline stage being timed
+    frame : str
+        Filename of image associated with the timed block (optional)
+
+    Examples
+    --------
+    >>> with Timer("precognition", "image_001.mccd") as t:
+    ...     run(inpfile, logfile)
+    >>> t.elapsed
+    """
+
+    def __init__(self, stage, frame=None):
+        self.stage = stage
+        self.frame = frame
+        self.elapsed = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._start
+        _records.append((self.stage, self.frame, self.elapsed))
+        return False
+
+
+def reset():
+    """Discard all recorded timings"""
+    _records.clear()
+    return
+
+
+def set_max_records(maxlen):
+    """
+    Set the maximal number of timed blocks to keep. Older records are
+    discarded first.
+
+    Parameters
+    ----------
+    maxlen : int
+        Maximal number of records (None for no limit)
+    """
+    global _records
+    _records = deque(_records, maxlen=maxlen)
+    return
+
+
+def records():
+    """Return a list of (stage, frame, seconds) for all recorded timings"""
+    return list(_records)
+
+
+def merge(records):
+    """
+    Append timings recorded elsewhere (e.g. in a worker process).
+
+    Parameters
+    ----------
+    records : list of tuple(stage, frame, seconds)
+        Timings as returned by records()
+    """
+    _records.extend(records)
+    return
+
+
+def timings():
+    """
+    Return all recorded timings.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with one row per timed block and columns for the stage,
+        the associated frame (None if not applicable), and elapsed seconds
+    """
+    import pandas as pd
+
+    return pd.DataFrame(list(_records), columns=["stage", "frame", "seconds"])
+
+
+def summary():
+    """
+    Summarize recorded timings per stage.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by stage with the number of calls, total, mean,
+        median, 95th percentile, and maximum time in seconds, as well as
+        the throughput in calls per second. Stages are sorted by total
+        time, so the bottleneck is listed first.
+    """
+    df = timings()
+    grouped = df.groupby("stage")["seconds"]
+    results = grouped.agg(["count", "sum", "mean", "median", "max"])
+    results.insert(4, "p95", grouped.quantile(0.95))
+    results.rename(columns={"sum": "total"}, inplace=True)
+    results["throughput"] = results["count"] / results["total"]
+    results.sort_values("total", ascending=False, inplace=True)
+    return results
+
+
+class profile:
+    """
+    Context manager that runs cProfile over the enclosed block.
+
+    Parameters
+    ----------
+    outfile : str
+        File to which profiling statistics will be written. If not given,
+        the top entries are printed to stdout
+    sort : str
+        Key by which to sort printed statistics
+    nlines : int
+        Number of entries to print if outfile is not given
+    """
+
+    def __init__(self, outfile=None, sort="cumulative", nlines=25):
+        self.outfile = outfile
+        self.sort = sort
+        self.nlines = nlines
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.profiler.enable()
+        return self.profiler
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        if self.outfile:
+            self.profiler.dump_stats(self.outfile)
+        else:
+            stats = pstats.Stats(self.profiler).sort_stats(self.sort)
+            stats.print_stats(self.nlines)
+        return False
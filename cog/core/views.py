@@ -0,0 +1,52 @@
+"""
+Minimal per-job views of image directories.
+
+Precognition's Dataset block reads the directory given with "In", which
+for a sweep on shared storage can hold tens of thousands of images. An
+ImageView is a small directory on local disk containing symlinks to just
+the images needed by one job, so that each job lists a handful of entries
+instead of rescanning the full image directory.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+class ImageView:
+    """
+    Directory of symlinks to selected images.
+
+    Parameters
+    ----------
+    images : list of str
+        Filenames of images relative to source
+    source : str
+        Directory containing the images
+    root : str
+        Directory in which the view is created. Defaults to the system
+        temporary directory, which is usually node-local
+
+    Examples
+    --------
+    >>> with ImageView([image], exp.pathToImages) as view:
+    ...     refine(image, phi, geometry, view.directory)
+    """
+
+    def __init__(self, images, source, root=None):
+        source = os.path.abspath(source)
+        self.directory = tempfile.mkdtemp(prefix="cog-view-", dir=root)
+        for image in images:
+            os.symlink(os.path.join(source, image), os.path.join(self.directory, image))
+
+    def close(self):
+        """Remove view (the images themselves are not affected)"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
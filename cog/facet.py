@@ -1,15 +1,23 @@
 #!/usr/bin/env python
 """
-Determine the angles between the crystal facets and the electric field 
+Determine the angles between the crystal facets and the electric field
 vector.
+
+Accepts Precognition geometry files (.inp) and Experiment files (.pkl).
+Angles are computed in chunks with a batched kernel, optionally in
+parallel, and can be grouped by delay, crystal (input file), or time
+window. Per-frame angles can be streamed to a CSV file.
 """
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import itertools
-import pandas as pd
 import numpy as np
 from cog import FrameGeometry
 
+# Electric field axis in the lab frame
+EF = np.array([0, -1, 0])
+
 
 def angle(v1, v2):
     """Compute angle between two vectors"""
@@ -31,6 +39,246 @@ def get_normal_vector(hkl, Astar):
     return hkl @ Astar.T
 
 
+def facet_angles(Astar, facets):
+    """
+    Compute angles between facet normals and the electric field for many
+    geometries at once.
+
+    Parameters
+    ----------
+    Astar : np.ndarray (n, 3, 3)
+        Reciprocal A matrices of n geometries
+    facets : np.ndarray (k, 3)
+        Miller indices of facets
+
+    Returns
+    -------
+    np.ndarray (n, k)
+        Angles in degrees
+    """
+    normals = np.einsum("nij,kj->nki", Astar, facets)
+    cos = (normals @ EF) / np.linalg.norm(normals, axis=2)
+    return np.rad2deg(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def load_frames(inputs):
+    """
+    Collect geometries and grouping metadata from input files.
+
+    Parameters
+    ----------
+    inputs : list of str
+        Precognition geometry files (.inp) and Experiment files (.pkl)
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with one row per frame and columns Image, crystal, delay,
+        time, and geometry (a FrameGeometry, or the path to a .inp file to
+        be read when angles are computed)
+    """
+    import pandas as pd
+    from cog import Experiment
+
+    inpfiles = [i for i in inputs if not i.endswith(".pkl")]
+    frames = [
+        pd.DataFrame(
+            {
+                "Image": inpfiles,
+                "crystal": inpfiles,
+                "delay": None,
+                "time": pd.NaT,
+                "geometry": inpfiles,
+            }
+        )
+    ]
+
+    for pkl in [i for i in inputs if i.endswith(".pkl")]:
+        images = Experiment.fromPickle(pkl).images
+        if "geometry" not in images.columns:
+            continue
+        images = images[images["geometry"].notna()]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Image": images.index,
+                    "crystal": pkl,
+                    "delay": images["delay"].astype(str) if "delay" in images else None,
+                    "time": images["time"].to_numpy() if "time" in images else pd.NaT,
+                    "geometry": images["geometry"].to_numpy(),
+                }
+            )
+        )
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def group_labels(frames, groupby=None, window="1h"):
+    """
+    Get group label of each frame.
+
+    Parameters
+    ----------
+    frames : pd.DataFrame
+        Frames as returned by load_frames()
+    groupby : str or dict
+        "delay", "crystal", "time", or None for a single group. A dict maps
+        each input file to a group label (e.g. metadata of the crystal)
+    window : str
+        Width of time windows if grouping by time (e.g. "10min")
+
+    Returns
+    -------
+    pd.Series
+        Group label of each frame ("-" for frames without the metadata,
+        e.g. .inp files when grouping by delay)
+    """
+    import pandas as pd
+
+    if groupby is None:
+        return pd.Series("all", index=frames.index)
+    if isinstance(groupby, dict):
+        labels = frames["crystal"].map(groupby)
+    elif groupby == "time":
+        labels = pd.to_datetime(frames["time"], utc=True).dt.floor(window)
+    elif groupby in ("delay", "crystal"):
+        labels = frames[groupby]
+    else:
+        raise ValueError(f"Cannot group by {groupby}")
+    return labels.astype(str).where(labels.notna(), "-")
+
+
+def _chunkAngles(geometries, facets):
+    """Compute facet angles for a chunk of geometries or .inp files"""
+    Astar = np.stack(
+        [
+            (FrameGeometry(g) if isinstance(g, str) else g).get_reciprocal_Amatrix()
+            for g in geometries
+        ]
+    )
+    return facet_angles(Astar, facets)
+
+
+def analyze(
+    inputs, hmax=1, groupby=None, window="1h", nproc=1, chunksize=1000, output=None
+):
+    """
+    Compute statistics of facet angles to the electric field.
+
+    Parameters
+    ----------
+    inputs : list of str
+        Precognition geometry files (.inp) and Experiment files (.pkl)
+    hmax : int
+        Maximal number to include in a Miller plane
+    groupby : str or dict
+        Group frames by "delay", "crystal", or "time" (or None), or by the
+        label of their input file given in a dict
+    window : str
+        Width of time windows if grouping by time
+    nproc : int
+        Number of processes used to compute angles
+    chunksize : int
+        Number of frames per chunk
+    output : str
+        If given, per-frame angles are streamed to this CSV file
+
+    Returns
+    -------
+    pd.DataFrame
+        Mean, standard deviation, and count of angles per group and facet
+    """
+    import pandas as pd
+
+    facets = list(itertools.product(np.arange(-hmax, hmax + 1), repeat=3))
+    facets.remove((0, 0, 0))
+    facets = np.array(facets)
+    labels = [tuple(int(i) for i in f) for f in facets]
+
+    frames = load_frames(inputs)
+    groups = group_labels(frames, groupby, window).to_numpy()
+    chunks = [
+        frames["geometry"].iloc[i : i + chunksize].to_list()
+        for i in range(0, len(frames), chunksize)
+    ]
+
+    # Running (count, mean, M2) per (group, facet), merged chunk by chunk
+    # with Chan's update, so that angles need not be kept
+    stats = {}
+    executor = ProcessPoolExecutor(nproc) if nproc > 1 else None
+    try:
+        if executor is None:
+            results = (_chunkAngles(chunk, facets) for chunk in chunks)
+        else:
+            results = executor.map(_chunkAngles, chunks, itertools.repeat(facets))
+
+        for i, angles in enumerate(results):
+            rows = slice(i * chunksize, i * chunksize + len(angles))
+            chunkGroups = groups[rows]
+            for group in np.unique(chunkGroups):
+                values = angles[chunkGroups == group]
+                nb = len(values)
+                meanb = values.mean(axis=0)
+                m2b = ((values - meanb) ** 2).sum(axis=0)
+                if group not in stats:
+                    stats[group] = (nb, meanb, m2b)
+                    continue
+                na, meana, m2a = stats[group]
+                n = na + nb
+                delta = meanb - meana
+                stats[group] = (
+                    n,
+                    meana + delta * nb / n,
+                    m2a + m2b + delta**2 * na * nb / n,
+                )
+
+            if output:
+                df = pd.DataFrame(
+                    {
+                        "Group": np.repeat(chunkGroups, len(facets)),
+                        "Image": np.repeat(
+                            frames["Image"].to_numpy()[rows], len(facets)
+                        ),
+                        "Facet": labels * len(angles),
+                        "Angle": angles.ravel(),
+                    }
+                )
+                df.to_csv(
+                    output, mode="w" if i == 0 else "a", header=i == 0, index=False
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Summarize
+    results = []
+    for group, (n, mean, m2) in stats.items():
+        std = np.sqrt(m2 / (n - 1)) if n > 1 else np.full(len(facets), np.nan)
+        results.append(
+            pd.DataFrame(
+                {
+                    "Group": group,
+                    "Facet": labels,
+                    ("Angle", "mean"): mean,
+                    ("Angle", "std"): std,
+                    ("Angle", "count"): n,
+                }
+            )
+        )
+
+    columns = [("Angle", "mean"), ("Angle", "std"), ("Angle", "count")]
+    if not results:
+        return pd.DataFrame(columns=pd.MultiIndex.from_tuples(columns))
+    results = pd.concat(results, ignore_index=True)
+    results.sort_values(["Group", ("Angle", "mean")], inplace=True)
+    if groupby is None:
+        results = results.drop(columns="Group").set_index("Facet")
+    else:
+        results = results.set_index(["Group", "Facet"])
+    results.columns = pd.MultiIndex.from_tuples(columns)
+    return results
+
+
 def main():
 
     # CLI
@@ -38,7 +286,9 @@ def main():
         formatter_class=argparse.RawTextHelpFormatter, description=__doc__
     )
     parser.add_argument(
-        "inp", nargs="+", help="Precognition geometry file (suffixed with .mccd.inp)"
+        "inp",
+        nargs="+",
+        help="Precognition geometry files (suffixed with .mccd.inp) or Experiment .pkl files",
     )
     parser.add_argument(
         "--hmax",
@@ -46,33 +296,34 @@ def main():
         help="Maximal number to include in a Miller plane",
         type=int,
     )
+    parser.add_argument(
+        "--groupby",
+        choices=["delay", "crystal", "time"],
+        help="Report statistics per delay, crystal (input file), or time window",
+    )
+    parser.add_argument(
+        "--window", default="1h", help="Width of time windows (e.g. 10min, 1h)"
+    )
+    parser.add_argument(
+        "--nproc", default=1, type=int, help="Number of processes to use"
+    )
+    parser.add_argument(
+        "--chunksize", default=1000, type=int, help="Number of frames per chunk"
+    )
+    parser.add_argument(
+        "-o", "--output", help="Stream per-frame angles to this CSV file"
+    )
     args = parser.parse_args()
 
-    # Relevant Miller planes
-    facets = list(itertools.product(np.arange(-args.hmax, args.hmax + 1), repeat=3))
-    facets.remove((0, 0, 0))
-
-    # Initialize results lists
-    l_facets = []
-    l_images = []
-    l_angles = []
-
-    # Load geometry
-    for inp in args.inp:
-        geometry = FrameGeometry(inp)
-        Astar = geometry.get_reciprocal_Amatrix()
-        for facet in facets:
-            hkl = np.array(facet)
-            normal = get_normal_vector(hkl, Astar)
-            theta = np.rad2deg(angle(normal, np.array([0, -1, 0])))
-            l_facets.append(facet)
-            l_images.append(inp)
-            l_angles.append(theta)
-
-    # Format output
-    df = pd.DataFrame({"Facet": l_facets, "Image": l_images, "Angle": l_angles})
-    results = df.groupby("Facet").agg({"Angle": ["mean", "std", "count"]})
-    results.sort_values(("Angle", "mean"), inplace=True)
+    results = analyze(
+        args.inp,
+        hmax=args.hmax,
+        groupby=args.groupby,
+        window=args.window,
+        nproc=args.nproc,
+        chunksize=args.chunksize,
+        output=args.output,
+    )
     print(results)
 
 
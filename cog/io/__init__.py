@@ -0,0 +1,4 @@
+from cog.io.mccd import MCCDImage
+from cog.io.spt import read_spt
+from cog.io.inp import export_geometries
+from cog.io.reflections import read_ii, read_reflections
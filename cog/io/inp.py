@@ -0,0 +1,263 @@
+"""
+Bulk export of Precognition .inp geometry files.
+
+FrameGeometry.writeINPFile() formats and writes one file at a time, which
+is slow for exporting the geometries of a full sweep to network storage.
+Here, geometries are tabulated once, formatted column by column, and
+written by a pool of threads. A manifest of content hashes is kept next to
+the files, so that only files whose content changed are rewritten.
+Alternatively, all files can be written into a single tar archive.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+import numpy as np
+import pandas as pd
+
+from cog.core.timing import Timer
+
+MANIFEST = ".inp-manifest.json"
+
+# Attributes of FrameGeometry that are written to .inp files
+FIELDS = [
+    "crystal",
+    "spacegroup",
+    "matrix",
+    "omega",
+    "goniometer",
+    "imageformat",
+    "distance",
+    "center",
+    "pixel",
+    "swing",
+    "tilt",
+    "bulge",
+    "image",
+    "resolution",
+    "wavelength",
+]
+
+
+def inp_table(geometries, index=None):
+    """
+    Tabulate geometries as formatted fields of .inp files.
+
+    Parameters
+    ----------
+    geometries : list of cog.FrameGeometry
+        Geometries to tabulate
+    index : list
+        Index of table (e.g. image filenames)
+
+    Returns
+    -------
+    pd.DataFrame
+        Table with one row per geometry and one string column per field.
+        Geometries without goniometer settings have empty goniometer and
+        image fields
+    """
+    rows = []
+    for g in geometries:
+        rows.append(
+            (
+                " ".join(map(str, g.crystal)),
+                g.spacegroup,
+                " ".join(g.matrix),
+                " ".join(g.omega),
+                " ".join(g.goniometer) if g.goniometer else "",
+                g.imageformat,
+                " ".join(g.distance),
+                " ".join(g.center),
+                " ".join(g.pixel),
+                " ".join(g.swing),
+                " ".join(g.tilt),
+                " ".join(g.bulge),
+                f"{g.image[0]}    {g.image[1]}" if g.goniometer else "",
+                " ".join(g.resolution),
+                " ".join(g.wavelength),
+            )
+        )
+    return pd.DataFrame(rows, index=index, columns=FIELDS, dtype=object)
+
+
+def format_inp(table):
+    """
+    Format .inp files from a table of fields, one column at a time. The
+    output is identical to FrameGeometry.writeINPFile().
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        Table of formatted fields from inp_table()
+
+    Returns
+    -------
+    pd.Series
+        Content of the .inp file of each row
+    """
+    t = table.astype(str)
+    hasGoniometer = t["goniometer"] != ""
+    goniometer = ("   Goniometer " + t["goniometer"] + "\n\n").where(hasGoniometer, "")
+    image = ("   Image " + t["image"] + "\n").where(hasGoniometer, "")
+    return (
+        "Input\n"
+        + ("   Crystal    " + t["crystal"] + " " + t["spacegroup"] + "\n")
+        + ("   Matrix     " + t["matrix"] + "\n")
+        + ("   Omega      " + t["omega"] + "\n")
+        + goniometer
+        + ("   Format     " + t["imageformat"] + "\n")
+        + ("   Distance   " + t["distance"] + "\n")
+        + ("   Center     " + t["center"] + "\n")
+        + ("   Pixel      " + t["pixel"] + "\n")
+        + ("   Swing      " + t["swing"] + "\n")
+        + ("   Tilt       " + t["tilt"] + "\n")
+        + ("   Bulge      " + t["bulge"] + "\n\n")
+        + image
+        + ("   Resolution " + t["resolution"] + "\n")
+        + ("   Wavelength " + t["wavelength"] + "\n")
+        + "   Quit\n"
+    )
+
+
+def _digest(text):
+    """Content hash of text"""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _writeFile(path, text):
+    """Write text to path atomically"""
+    with open(f"{path}.part", "w") as f:
+        f.write(text)
+    os.replace(f"{path}.part", path)
+    return
+
+
+def write_inp_files(texts, directory, nthreads=8, force=False):
+    """
+    Write .inp files concurrently, skipping files whose content is unchanged.
+
+    Content hashes of written files are kept in a manifest in directory.
+    A file is rewritten if it is missing or if its content hash differs
+    from the manifest.
+
+    Parameters
+    ----------
+    texts : pd.Series
+        Content of each .inp file, indexed by filename within directory
+    directory : str
+        Directory to which to write. Created if necessary
+    nthreads : int
+        Number of writer threads
+    force : bool
+        Whether to rewrite all files regardless of the manifest
+
+    Returns
+    -------
+    dict
+        Number of files written and unchanged
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifestfile = os.path.join(directory, MANIFEST)
+    manifest = {}
+    if not force and os.path.exists(manifestfile):
+        with open(manifestfile, "r") as f:
+            manifest = json.load(f)
+
+    with Timer("hash_inp"):
+        digests = {name: _digest(text) for name, text in texts.items()}
+        existing = {entry.name for entry in os.scandir(directory)}
+        changed = [
+            name
+            for name, digest in digests.items()
+            if name not in existing or manifest.get(name) != digest
+        ]
+
+    with Timer("write_inp_files"), ThreadPoolExecutor(nthreads) as executor:
+        paths = [os.path.join(directory, name) for name in changed]
+        list(executor.map(_writeFile, paths, texts[changed]))
+
+    manifest.update(digests)
+    _writeFile(manifestfile, json.dumps(manifest, sort_keys=True))
+    return {"written": len(changed), "unchanged": len(texts) - len(changed)}
+
+
+def write_inp_archive(texts, archive, force=False):
+    """
+    Write .inp files into a single tar archive. The archive is only
+    rewritten if the content of any file changed.
+
+    Parameters
+    ----------
+    texts : pd.Series
+        Content of each .inp file, indexed by filename within the archive
+    archive : str
+        Path to tar archive (compressed if it ends with .gz)
+    force : bool
+        Whether to rewrite the archive regardless of its content hash
+
+    Returns
+    -------
+    dict
+        Number of files written and unchanged
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name, text in texts.items():
+        digest.update(name.encode() + b"\0" + text.encode() + b"\0")
+    digest = digest.hexdigest()
+
+    hashfile = f"{archive}.b2"
+    if not force and os.path.exists(archive) and os.path.exists(hashfile):
+        with open(hashfile, "r") as f:
+            if f.read().strip() == digest:
+                return {"written": 0, "unchanged": len(texts)}
+
+    mode = "w:gz" if archive.endswith(".gz") else "w"
+    with Timer("write_inp_files"), tarfile.open(f"{archive}.part", mode) as tar:
+        for name, text in texts.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+    os.replace(f"{archive}.part", archive)
+    _writeFile(hashfile, digest)
+    return {"written": len(texts), "unchanged": 0}
+
+
+def export_geometries(geometries, output, nthreads=8, force=False):
+    """
+    Export geometries to .inp files in a directory or a tar archive.
+
+    Parameters
+    ----------
+    geometries : pd.Series
+        Geometries indexed by image filename. Each geometry is written to
+        "{image}.inp", and missing geometries are skipped
+    output : str
+        Directory, or tar archive if it ends with .tar or .tar.gz
+    nthreads : int
+        Number of writer threads (for directories)
+    force : bool
+        Whether to rewrite unchanged files
+
+    Returns
+    -------
+    dict
+        Number of files written and unchanged, and the written filenames
+    """
+    geometries = geometries[geometries.notna().to_numpy()]
+    names = np.char.add(geometries.index.to_numpy(dtype=str), ".inp")
+    with Timer("format_inp"):
+        texts = format_inp(inp_table(geometries.to_numpy(), index=names))
+
+    if output.endswith((".tar", ".tar.gz")):
+        stats = write_inp_archive(texts, output, force=force)
+    else:
+        stats = write_inp_files(texts, output, nthreads=nthreads, force=force)
+    stats["files"] = list(texts.index)
+    return stats
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+
+# Size of TIFF header and MarCCD frame header preceding the pixel data
+TIFF_HEADER_BYTES = 1024
+FRAME_HEADER_BYTES = 3072
+HEADER_BYTES = TIFF_HEADER_BYTES + FRAME_HEADER_BYTES
+
+# Fields of the MarCCD frame header: name -> (offset, type, scale). Offsets
+# are relative to the start of the frame header, and values are divided by
+# scale to convert to mm, pixels, seconds, degrees, and angstroms.
+_FIELDS = {
+    "header_byte_order": (28, "u4", None),
+    "data_byte_order": (32, "u4", None),
+    "nfast": (80, "u4", None),
+    "nslow": (84, "u4", None),
+    "depth": (88, "u4", None),
+    "saturated_value": (104, "u4", None),
+    "distance": (640, "i4", 1e3),
+    "beam_x": (644, "i4", 1e3),
+    "beam_y": (648, "i4", 1e3),
+    "integration_time": (652, "i4", 1e3),
+    "exposure_time": (656, "i4", 1e3),
+    "readout_time": (660, "i4", 1e3),
+    "phi": (684, "i4", 1e3),
+    "pixelsize_x": (772, "i4", 1e6),
+    "pixelsize_y": (776, "i4", 1e6),
+    "wavelength": (908, "i4", 1e5),
+}
+_STRINGS = {
+    "filename": (1280, 64),
+    "acquire_timestamp": (1344, 32),
+}
+_LITTLE_ENDIAN = 1234
+_BIG_ENDIAN = 4321
+
+
+class MCCDImage:
+    """
+    Image from a Rayonix MX340 detector in MarCCD (TIFF-based) format.
+
+    The header is read when the image is constructed, and the pixel array
+    is memory-mapped from disk on first access, so that frames can be
+    inspected without copying them into memory.
+
+    Parameters
+    ----------
+    path : str
+        Path to .mccd file
+    """
+
+    # -------------------------------------------------------------------#
+    # Constructor
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._readHeader()
+
+    # -------------------------------------------------------------------#
+    # Attributes
+
+    @property
+    def header(self):
+        """Dict of header metadata in mm, pixels, seconds, degrees, and angstroms"""
+        return self._header
+
+    @property
+    def shape(self):
+        """Shape of pixel array (nslow, nfast)"""
+        return (self.header["nslow"], self.header["nfast"])
+
+    @property
+    def dtype(self):
+        """Data type of pixels"""
+        return self._dtype
+
+    @property
+    def saturation(self):
+        """Pixel value at which detector saturates"""
+        return self.header["saturated_value"]
+
+    @property
+    def data(self):
+        """Read-only, memory-mapped pixel array of shape (nslow, nfast)"""
+        if self._data is None:
+            self._data = np.memmap(
+                self.path,
+                dtype=self.dtype,
+                mode="r",
+                offset=HEADER_BYTES,
+                shape=self.shape,
+            )
+        return self._data
+
+    # -------------------------------------------------------------------#
+    # Methods
+
+    def __repr__(self):
+        return f"<cog.io.MCCDImage {os.path.basename(self.path)} {self.shape}>"
+
+    def _readHeader(self):
+        """Read TIFF and MarCCD frame headers"""
+        if not os.path.exists(self.path):
+            raise ValueError(f"Cannot find file: {self.path}")
+
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+        if len(header) < HEADER_BYTES or header[:2] not in (b"II", b"MM"):
+            raise ValueError(f"{self.path} is not a MarCCD image")
+
+        byteorder = "<" if header[:2] == b"II" else ">"
+        frame = header[TIFF_HEADER_BYTES:]
+
+        self._header = {}
+        for key, (offset, fmt, scale) in _FIELDS.items():
+            value = np.frombuffer(frame, f"{byteorder}{fmt}", 1, offset)[0]
+            self._header[key] = int(value) if scale is None else value / scale
+        for key, (offset, length) in _STRINGS.items():
+            value = frame[offset : offset + length].split(b"\x00")[0]
+            self._header[key] = value.decode("ascii", errors="replace").strip()
+
+        # Data byte order falls back to that of the header if unset
+        if self._header["data_byte_order"] == _LITTLE_ENDIAN:
+            byteorder = "<"
+        elif self._header["data_byte_order"] == _BIG_ENDIAN:
+            byteorder = ">"
+
+        depth = self._header["depth"]
+        if depth not in (1, 2, 4):
+            raise ValueError(f"Unsupported pixel depth ({depth}) in {self.path}")
+        self._dtype = np.dtype(f"{byteorder}u{depth}")
+
+        expected = HEADER_BYTES + np.prod(self.shape) * depth
+        if os.path.getsize(self.path) < expected:
+            raise ValueError(f"{self.path} is truncated")
+
+        return
@@ -0,0 +1,164 @@
+"""
+Reading of integrated reflections from Precognition .ii files.
+
+Each integrated frame has its own .ii file, so a sweep produces thousands
+of small files. Rather than parsing each file separately, files are read
+in chunks whose raw contents are concatenated and parsed in a single pass,
+and the columns of all chunks are stored with compact dtypes. Per-frame
+metadata (e.g. phi and delay from Experiment.images) is joined in one
+vectorized step using the frame of each reflection.
+"""
+
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from cog.core.timing import Timer
+
+# Columns of .ii files and their dtypes
+II_DTYPES = {
+    "H": np.int16,
+    "K": np.int16,
+    "L": np.int16,
+    "Multiplicity": np.int16,
+    "X": np.float32,
+    "Y": np.float32,
+    "Resolution": np.float32,
+    "Wavelength": np.float32,
+    "I": np.float32,
+    "SigI": np.float32,
+}
+
+# Data lines have a first non-blank character that does not start a comment
+_DATA = re.compile(rb"^[ \t]*[^#\s]", re.MULTILINE)
+
+# Comment-only lines, which read_csv parses as empty rows if indented
+_COMMENT = re.compile(rb"^[ \t]*#.*\n?", re.MULTILINE)
+
+
+def _parse(data):
+    """Parse whitespace-delimited .ii rows into a DataFrame"""
+    if not _DATA.search(data):
+        return pd.DataFrame(
+            {column: np.zeros(0, dtype) for column, dtype in II_DTYPES.items()}
+        )
+    return pd.read_csv(
+        io.BytesIO(_COMMENT.sub(b"", data) if b"#" in data else data),
+        sep=r"\s+",
+        header=None,
+        names=list(II_DTYPES),
+        usecols=range(len(II_DTYPES)),
+        dtype=II_DTYPES,
+        comment="#",
+    )
+
+
+def _countData(text):
+    """Number of data lines in text"""
+    text = text.strip()
+    if b"#" in text or b"\n\n" in text:
+        return len(_DATA.findall(text))
+    return text.count(b"\n") + 1 if text else 0
+
+
+def read_ii(iifile):
+    """
+    Read integrated reflections of one frame from a Precognition .ii file.
+
+    Parameters
+    ----------
+    iifile : str
+        Path to .ii file from which to read
+
+    Returns
+    -------
+    pd.DataFrame
+        Reflections with columns H, K, L, Multiplicity, X, Y, Resolution,
+        Wavelength, I, and SigI
+    """
+    if not os.path.exists(iifile):
+        raise ValueError(f"Cannot find file: {iifile}")
+    with open(iifile, "rb") as f:
+        return _parse(f.read())
+
+
+def read_reflections(iifiles, images=None, columns=("phi", "delay"), chunksize=200_000):
+    """
+    Read integrated reflections of many frames into one table.
+
+    Parameters
+    ----------
+    iifiles : dict
+        Mapping of image filename to path of its .ii file. Images mapped to
+        None are skipped
+    images : pd.DataFrame
+        DataFrame of images indexed by filename (e.g. Experiment.images)
+        from which per-frame metadata is joined
+    columns : tuple of str
+        Columns of images to join. Missing columns are skipped
+    chunksize : int
+        Number of reflections (data lines) parsed together. Files are
+        never split between chunks
+
+    Returns
+    -------
+    pd.DataFrame
+        Reflections with the columns of .ii files, the image of each
+        reflection (categorical), and the joined metadata columns
+    """
+    iifiles = {image: path for image, path in iifiles.items() if path is not None}
+    frames = list(iifiles)
+    chunks = []
+    codes = []
+
+    def parse(data, counts, start):
+        chunk = _parse(b"".join(data))
+        if len(chunk) != sum(counts):
+            # Malformed lines; fall back to parsing each file
+            parsed = [_parse(d) for d in data]
+            counts = [len(p) for p in parsed]
+            chunk = pd.concat(parsed, ignore_index=True)
+        chunks.append(chunk)
+        codes.append(np.repeat(np.arange(start, start + len(data)), counts))
+        return
+
+    with Timer("read_reflections"):
+        data, counts, start, nlines = [], [], 0, 0
+        for n, image in enumerate(frames):
+            with open(iifiles[image], "rb") as f:
+                text = f.read()
+            data.append(text if text.endswith(b"\n") else text + b"\n")
+            counts.append(_countData(text))
+            nlines += counts[-1]
+            if nlines >= chunksize:
+                parse(data, counts, start)
+                data, counts, start, nlines = [], [], n + 1, 0
+        if data:
+            parse(data, counts, start)
+
+    if chunks:
+        table = pd.concat(chunks, ignore_index=True)
+        codes = np.concatenate(codes).astype(np.int32)
+    else:
+        table = _parse(b"")
+        codes = np.zeros(0, dtype=np.int32)
+    table["image"] = pd.Categorical.from_codes(codes, categories=frames)
+
+    if images is not None:
+        columns = [c for c in columns if c in images.columns]
+        metadata = images[columns].reindex(frames)
+        for column in columns:
+            values = metadata[column]
+            if values.dtype == object:
+                values = values.astype("category")
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                table[column] = pd.Categorical.from_codes(
+                    values.cat.codes.to_numpy()[codes], dtype=values.dtype
+                )
+            else:
+                dtype = np.float32 if values.dtype == np.float64 else values.dtype
+                table[column] = values.to_numpy(dtype=dtype)[codes]
+    return table
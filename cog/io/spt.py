@@ -0,0 +1,38 @@
+import os
+import re
+import numpy as np
+
+# Rows of spot files start with a number; all other lines are headers
+_ROW = re.compile(rb"^\s*[-+]?(\d|\.\d)")
+
+
+def read_spt(sptfile):
+    """
+    Read a Precognition spot list (e.g. spots.spt, ellipses.spt, pre.spt).
+
+    Parameters
+    ----------
+    sptfile : str
+        Path to .spt file from which to read
+
+    Returns
+    -------
+    np.ndarray (n, ncols)
+        Numeric rows of the spot list. The first two columns are the spot
+        positions along the fast and slow axes of the detector in pixels
+
+    Notes
+    -----
+    Header and comment lines (any line that does not start with a number)
+    are skipped, so that the different spot lists written by Precognition
+    can be read with the same function.
+    """
+    if not os.path.exists(sptfile):
+        raise ValueError(f"Cannot find file: {sptfile}")
+
+    with open(sptfile, "rb") as spt:
+        rows = [l for l in spt.read().splitlines() if _ROW.match(l)]
+
+    if not rows:
+        return np.empty((0, 2))
+    return np.loadtxt(rows, ndmin=2)
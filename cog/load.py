@@ -4,8 +4,6 @@ Load Experiment from logs or .pkl file and embed in IPython shell.
 """
 
 import argparse
-from cog import Experiment
-from IPython import embed
 
 
 def main():
@@ -17,6 +15,8 @@ def main():
     parser.add_argument("input", nargs="+", help="Input files to load (.pkl or .log)")
     args = parser.parse_args()
 
+    from cog import Experiment
+
     # Load .pkl
     if len(args.input) == 1 and args.input[0].endswith(".pkl"):
         exp = Experiment.fromPickle(args.input[0])
@@ -29,6 +29,8 @@ def main():
         raise ValueError("Can only accept one .pkl or one or more .log files")
 
     # Spin up IPython shell
+    from IPython import embed
+
     bold = "\033[1m"
     end = "\033[0m"
     header = f"cog.Experiment loaded as {bold}exp{end}"
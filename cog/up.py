@@ -1,20 +1,90 @@
 #!/usr/bin/env python
 """
-Plot the orientation of the crystal in the lab coordinate frame from a 
+Plot the orientation of the crystal in the lab coordinate frame from a
 Precognition geometry file.
+
+With --output or --summary, runs headless: the angles between the cell
+axes and the electric field are computed for all geometry files at once
+and written to a CSV/Parquet table and/or a summary image.
 """
 
 import argparse
 from cog import FrameGeometry
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+
+# Electric field axis in the lab frame
+EF = np.array([0, -1, 0])
 
 
 def angle(v1, v2):
     return np.arccos(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)))
 
 
+def orientation_table(inpfiles):
+    """
+    Compute real-space cell vectors and their angles to the electric field
+    for many geometry files in one vectorized pass.
+
+    Parameters
+    ----------
+    inpfiles : list of str
+        Precognition geometry files
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by file with the lab-frame components of the
+        a, b, and c axes (a_x, a_y, ..., c_z) and the angles in degrees
+        between each axis and the electric field (theta_a, theta_b, theta_c)
+    """
+    import pandas as pd
+
+    Astar = np.stack([FrameGeometry(inp).get_reciprocal_Amatrix() for inp in inpfiles])
+    A = np.linalg.inv(Astar)
+    cos = (A @ EF) / np.linalg.norm(A, axis=2)
+    theta = np.rad2deg(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+    columns = [f"{axis}_{x}" for axis in "abc" for x in "xyz"]
+    df = pd.DataFrame(
+        A.reshape(-1, 9), index=pd.Index(inpfiles, name="file"), columns=columns
+    )
+    for i, axis in enumerate("abc"):
+        df[f"theta_{axis}"] = theta[:, i]
+    return df
+
+
+def writeTable(df, outfile):
+    """Write orientation table to .csv or .parquet file"""
+    if outfile.endswith(".parquet"):
+        df.to_parquet(outfile)
+    elif outfile.endswith(".csv"):
+        df.to_csv(outfile)
+    else:
+        raise ValueError(f"Output suffix must be .csv or .parquet -- given: {outfile}")
+    return
+
+
+def plotSummary(df, outfile):
+    """Render histograms of angles to the electric field with Agg"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    bins = np.linspace(0, 180, 73)
+    for axis, color in zip("abc", "rgb"):
+        ax.hist(df[f"theta_{axis}"], bins=bins, color=color, alpha=0.5, label=axis)
+    ax.set_xlabel("Angle to EF (deg)")
+    ax.set_ylabel("Frames")
+    ax.set_title(f"{len(df)} geometries")
+    ax.legend(title="Axis")
+    fig.tight_layout()
+    fig.savefig(outfile, dpi=150)
+    plt.close(fig)
+    return
+
+
 def plotUnitCell(a, b, c, ax):
 
     origin = np.array([0, 0, 0])
@@ -46,9 +116,30 @@ def main():
     parser.add_argument(
         "inp", nargs="+", help="Precognition geometry file (suffixed with .mccd.inp)"
     )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Write angles to table (.csv or .parquet) instead of plotting",
+    )
+    parser.add_argument(
+        "--summary",
+        help="Write summary image of angles (e.g. .png) instead of plotting",
+    )
     args = parser.parse_args()
 
+    # Headless mode
+    if args.output or args.summary:
+        df = orientation_table(args.inp)
+        if args.output:
+            writeTable(df, args.output)
+        if args.summary:
+            plotSummary(df, args.summary)
+        return
+
     # Plot
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
     fig = plt.figure()
     ax = fig.add_subplot(111, projection="3d")
     plt.title("Lab Coordinate System")
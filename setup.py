@@ -2,6 +2,7 @@ from setuptools import setup, find_packages
 
 # Testing requirements
 tests_require = ["pytest", "pytest-xdist"]
+benchmark_require = ["pytest", "pytest-xdist", "pytest-benchmark"]
 
 setup(
     name="cog",
@@ -14,10 +15,12 @@ setup(
         "ipython",
         "numpy",
         "pandas",
+        "scipy",
         "matplotlib",
     ],
     setup_requires=["pytest-runner"],
     tests_require=tests_require,
+    extras_require={"benchmark": benchmark_require},
     entry_points={
         "console_scripts": [
             "cog.up=cog.up:main",
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def write_mccd():
+    """Factory for synthetic MarCCD images with a minimal frame header"""
+
+    def writer(path, data, distance=200.0, beam=(1985.4, 1974.2), phi=36.0):
+        data = np.asarray(data, dtype="<u2")
+        frame = np.zeros(3072 // 4, dtype="<i4")
+        frame[[7, 8]] = 1234  # byte orders
+        frame[[20, 21, 22]] = [data.shape[1], data.shape[0], 2]
+        frame[26] = 65535  # saturated value
+        frame[[160, 161, 162]] = np.round(np.array([distance, *beam]) * 1e3)
+        frame[171] = round(phi * 1e3)
+        frame[[193, 194]] = 88540  # pixel size in nm
+        frame[227] = 103000  # wavelength in fm
+        with open(path, "wb") as f:
+            f.write(b"II*\x00" + bytes(1020))
+            f.write(frame.tobytes())
+            f.write(data.tobytes())
+        return path
+
+    return writer
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from cog import Experiment, ExperimentCollection, FrameGeometry
+
+EXAMPLE = "tests/data/example.mccd.inp"
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Collection of three Experiments from two crystals"""
+    paths = []
+    for i in range(3):
+        exp = Experiment.fromLogs(["tests/data/acq628.log"])
+        exp.images["geometry"] = None
+        exp.images.at[exp.images.index[i], "geometry"] = FrameGeometry(EXAMPLE)
+        exp.images["rmsd"] = float(i)
+        paths.append(str(tmp_path / f"sweep{i}.pkl"))
+        exp.toPickle(paths[-1])
+    return ExperimentCollection.fromPickles(
+        paths, crystal=["xtal1", "xtal1", "xtal2"], maxLoaded=2
+    )
+
+
+def test_lazy_loading(collection):
+    """Experiments are loaded on access and evicted beyond maxLoaded"""
+    assert len(collection) == 3
+    assert collection.loaded == []
+    assert isinstance(collection["sweep0"], Experiment)
+    collection["sweep1"]
+    collection["sweep2"]
+    assert collection.loaded == ["sweep1", "sweep2"]
+    with pytest.raises(KeyError):
+        collection["missing"]
+
+
+def test_select(collection):
+    assert list(collection.select(crystal="xtal1")) == ["sweep0", "sweep1"]
+
+
+def test_save(collection):
+    """Changes are written back with save()"""
+    collection["sweep0"].images["rmsd"] = 5.0
+    collection.save("sweep0")
+    collection.unload()
+    assert (collection["sweep0"].images["rmsd"] == 5.0).all()
+
+
+def test_statistics(collection):
+    stats = collection.statistics()
+    assert list(stats.index) == ["sweep0", "sweep1", "sweep2"]
+    assert (stats["geometries"] == 1).all()
+    assert list(stats["median_rmsd"]) == [0.0, 1.0, 2.0]
+    assert list(stats["crystal"]) == ["xtal1", "xtal1", "xtal2"]
+
+
+def test_facetAnalysis(collection):
+    """Experiments are grouped by catalog metadata"""
+    results = collection.facetAnalysis(collection.select(crystal="xtal1"))
+    groups = results.index.get_level_values("Group").unique()
+    assert list(groups) == ["xtal1"]
+    assert (results[("Angle", "count")] == 2).all()
+
+    results = collection.facetAnalysis()
+    groups = results.index.get_level_values("Group").unique()
+    assert sorted(groups) == ["xtal1", "xtal2"]
+
+    results = collection.facetAnalysis(by=None)
+    groups = results.index.get_level_values("Group").unique()
+    assert sorted(groups) == ["sweep0", "sweep1", "sweep2"]
+
+
+def test_roundtrip(collection, tmp_path):
+    pkl = str(tmp_path / "collection.pkl")
+    collection.toPickle(pkl)
+    other = ExperimentCollection.fromPickle(pkl)
+    pd.testing.assert_frame_equal(other.catalog, collection.catalog)
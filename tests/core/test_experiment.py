@@ -69,3 +69,37 @@ def test_constructor(
         assert ds.spacegroup is None
     else:
         assert ds.spacegroup == int(spacegroup)
+
+
+def test_commitResults():
+    """Test committing per-frame results to Experiment.images"""
+    images = pd.DataFrame({"phi": [0.0, 1.0, 2.0]}, index=["a", "b", "c"])
+    ds = Experiment(images, "./")
+    geom = object()
+
+    ds.commitResults({"a": {"geometry": geom, "rmsd": 0.5}, "b": {"rmsd": 1.5}})
+    assert ds.images.loc["a", "geometry"] is geom
+    assert ds.images.loc[["a", "b"], "rmsd"].tolist() == [0.5, 1.5]
+    assert pd.isna(ds.images.loc["c", "rmsd"])
+    assert ds.images["phi"].dtype == float
+
+    # Existing values are only replaced for updated frames
+    ds.commitResults({"c": {"rmsd": 2}})
+    assert ds.images["rmsd"].tolist() == [0.5, 1.5, 2.0]
+
+    with pytest.raises(KeyError):
+        ds.commitResults({"d": {"rmsd": 1.0}})
+
+
+def test_batch():
+    """Test that results are buffered within Experiment.batch()"""
+    images = pd.DataFrame({"phi": [0.0, 1.0]}, index=["a", "b"])
+    ds = Experiment(images, "./")
+    geom = object()
+
+    with ds.batch():
+        ds._recordResults("a", geometry=geom, rmsd=0.5)
+        assert "geometry" not in ds.images.columns
+        assert ds._getGeometry("a") is geom
+    assert ds.images.loc["a", "geometry"] is geom
+    assert ds.images.loc["a", "rmsd"] == 0.5
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment
+from cog.core.frameindex import FrameIndex
+
+
+@pytest.fixture
+def experiment():
+    return Experiment.fromLogs(["tests/data/acq628.log"])
+
+
+def test_nearestFrame(experiment):
+    """Test lookup of nearest frame by phi"""
+    images = experiment.images
+    for phi in [-10.0, 0.0, 37.0, 38.5, 1000.0]:
+        expected = ((images["phi"] - phi + 180.0) % 360.0 - 180.0).abs().idxmin()
+        assert experiment.nearestFrame(phi) == expected
+
+
+def test_nearestFrame_periodic():
+    """Test that lookup by phi wraps around at 360 degrees"""
+    images = pd.DataFrame({"phi": [0.0, 180.0, 350.0]}, index=["a", "b", "c"])
+    index = FrameIndex(images)
+    assert index.nearestPhi(359.0) == "a"
+    assert index.nearestPhi(-2.0) == "a"
+    assert index.nearestPhi(-8.0) == "c"
+    assert index.nearestPhi(720.0 + 170.0) == "b"
+
+
+def test_framesInPhiRange(experiment):
+    """Test lookup of frames by range of phi"""
+    images = experiment.images
+    frames = experiment.framesInPhiRange(10.0, 40.0)
+    expected = images.index[(images["phi"] >= 10.0) & (images["phi"] <= 40.0)]
+    assert sorted(frames) == sorted(expected)
+
+
+def test_framesAtDelay(experiment):
+    """Test lookup of frames by delay"""
+    images = experiment.images
+    for delay in images["delay"].unique():
+        frames = experiment.framesAtDelay(delay)
+        assert sorted(frames) == sorted(images.index[images["delay"] == delay])
+    assert len(experiment.framesAtDelay("not-a-delay")) == 0
+
+
+def test_framesInTimeWindow(experiment):
+    """Test lookup of frames by collection time"""
+    frames = experiment.framesInTimeWindow(
+        "2022-06-22 19:02:30", "2022-06-22 19:02:40"
+    )
+    assert list(frames) == [
+        "SK_sweep_0005_off_16.0000.mccd",
+        "SK_sweep_0006_off_20.0000.mccd",
+        "SK_sweep_0007_off_24.0000.mccd",
+        "SK_sweep_0008_off_28.0000.mccd",
+        "SK_sweep_0009_off_32.0000.mccd",
+    ]
+
+
+def test_invertGoniometerRotation(experiment):
+    """Test that the frame index is rebuilt when phi is inverted"""
+    frame = experiment.nearestFrame(40.0)
+    experiment.invertGoniometerRotation()
+    assert experiment.nearestFrame(-40.0) == frame
+
+
+def test_framesAtDelay_equivalent():
+    """Test lookup of frames by equivalent delay labels"""
+    images = pd.DataFrame(
+        {"delay": ["off", "1000ns", "1000ns"], "delay_ns": [np.nan, 1e3, 1e3]},
+        index=["a", "b", "c"],
+    )
+    experiment = Experiment(images, "./")
+    assert list(experiment.framesAtDelay("1us")) == ["b", "c"]
+    assert list(experiment.framesAtDelay(1000.0)) == ["b", "c"]
+    assert list(experiment.framesAtDelay("off")) == ["a"]
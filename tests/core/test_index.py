@@ -0,0 +1,93 @@
+import sys
+from os.path import dirname, abspath, join
+import numpy as np
+import pytest
+
+from cog import FrameGeometry
+from cog.commands.index import checkStatus
+from cog.core.symmetry import equivalent_settings
+
+EXAMPLE = join(abspath(dirname(__file__)), "../data/example.mccd.inp")
+
+
+def write_candidates(tmp_path, settings):
+    """Write candidate geometries with the given matrices (first is pre.spt.inp)"""
+    g = FrameGeometry(EXAMPLE)
+    for i, m in enumerate(settings):
+        g.matrix = [f"{v:.6f}" for v in np.ravel(m)]
+        name = "pre.spt.inp" if i == 0 else f"{i:02d}pre.spt.inp"
+        g.writeINPFile(str(tmp_path / name))
+
+
+def write_log(tmp_path, selected, degrees=1.0):
+    rows = [",".join(f"{v:.6f}" for v in row) for row in np.reshape(selected, (3, 3))]
+    text = (
+        f"Input matrix is {degrees} degrees away from the input matrix.\n"
+        "Selected matrix:\n" + "\n".join(rows) + "\n"
+    )
+    (tmp_path / "index.log").write_text(text)
+
+
+@pytest.mark.parametrize("op", [0, 3, 7])
+def test_checkStatus_symmetry(tmp_path, monkeypatch, op):
+    """checkStatus() finds candidates in a symmetry-equivalent setting"""
+    U = FrameGeometry(EXAMPLE).get_missetting_matrix()
+    settings = equivalent_settings(U, (79.1, 79.1, 38.0, 90, 90, 90), 96)
+    c, s = np.cos(np.deg2rad(30.0)), np.sin(np.deg2rad(30.0))
+    other = U @ np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+    write_candidates(tmp_path, [other, settings[op]])
+    write_log(tmp_path, U)
+    monkeypatch.chdir(tmp_path)
+
+    g = checkStatus("index.log")
+    assert np.allclose(g.get_missetting_matrix(), settings[op], atol=1e-5)
+
+
+def test_checkStatus_reference(tmp_path, monkeypatch):
+    """checkStatus() accepts results equivalent to the reference matrix"""
+    U = FrameGeometry(EXAMPLE).get_missetting_matrix()
+    settings = equivalent_settings(U, (79.1, 79.1, 38.0, 90, 90, 90), 96)
+    write_candidates(tmp_path, [settings[0]])
+    write_log(tmp_path, settings[0], degrees=90.0)
+    monkeypatch.chdir(tmp_path)
+
+    assert checkStatus("index.log", matrix=True) is None
+    assert checkStatus("index.log", matrix=settings[2].ravel()) is not None
+
+
+def test_checkStatus_identity(tmp_path, monkeypatch):
+    """checkStatus() prefers a candidate in the identity setting"""
+    U = FrameGeometry(EXAMPLE).get_missetting_matrix()
+    settings = equivalent_settings(U, (79.1, 79.1, 38.0, 90, 90, 90), 96)
+    # The identity candidate is within tolerance, but further from the
+    # selected matrix than the symmetry-equivalent one
+    identity = U + 5e-5
+    write_candidates(tmp_path, [identity, settings[3]])
+    write_log(tmp_path, U)
+    monkeypatch.chdir(tmp_path)
+
+    g = checkStatus("index.log")
+    assert np.allclose(g.get_missetting_matrix(), identity, atol=1e-6)
+
+
+def test_checkStatus_rejected(tmp_path, monkeypatch):
+    """Candidates are not parsed if the selection is rejected"""
+    index = sys.modules["cog.commands.index"]
+
+    U = FrameGeometry(EXAMPLE).get_missetting_matrix()
+    write_candidates(tmp_path, [U, U, U])
+    write_log(tmp_path, U, degrees=90.0)
+    monkeypatch.chdir(tmp_path)
+
+    calls = []
+    readMatrices = index._readMatrices
+
+    def record(files):
+        calls.append(list(files))
+        return readMatrices(files)
+
+    monkeypatch.setattr(index, "_readMatrices", record)
+    assert checkStatus("index.log", matrix=np.eye(3).ravel()) is None
+    assert calls == [["pre.spt.inp"]]
+    assert checkStatus("index.log", matrix=True) is None
+    assert calls == [["pre.spt.inp"]]
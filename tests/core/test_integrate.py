@@ -0,0 +1,100 @@
+import os
+import sys
+from os.path import abspath, dirname, join
+
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog.commands.integrate import integrate, merge_reflections
+from cog.core import precognition
+from cog.core.pool import PrecognitionPool
+
+EXAMPLE = join(abspath(dirname(__file__)), "../data/example.mccd.inp")
+
+FAKE_PRECOGNITION = """
+import sys
+lines = [l.split() for l in open(sys.argv[1])]
+images = [l[4] for l in lines if len(l) == 5 and l[0] == "Goniometer"]
+for image in images:
+    if "bad" in image:
+        print(f"Processing stops at {image}")
+        continue
+    with open(f"{image}.ii", "w") as ii:
+        ii.write("  1  2  3  1  100.0  200.0  2.5  1.05  1000.0  30.0\\n")
+        ii.write(" -1  0  4  2  150.0  250.0  3.1  1.10   500.0  20.0\\n")
+"""
+
+
+@pytest.fixture
+def fake_precognition(tmp_path, monkeypatch):
+    """Fake Precognition binary that integrates two reflections per image"""
+    script = tmp_path / "fake_integrate.py"
+    script.write_text(FAKE_PRECOGNITION)
+    monkeypatch.setenv("COG_PRECOGNITION", f"{sys.executable} {script}")
+    monkeypatch.setattr(precognition, "_environment", None)
+    return script
+
+
+@pytest.fixture
+def experiment(tmp_path):
+    images = ["a_001.mccd", "a_002.mccd", "bad_003.mccd", "a_004.mccd", "a_005.mccd"]
+    imagedir = tmp_path / "images"
+    imagedir.mkdir()
+    for image in images:
+        (imagedir / image).touch()
+    exp = Experiment(pd.DataFrame({"phi": range(5)}, index=images), str(imagedir))
+    exp.images["geometry"] = [FrameGeometry(EXAMPLE)] * 5
+    return exp
+
+
+def test_integrate(fake_precognition, experiment, tmp_path, monkeypatch):
+    """Shards are integrated in an isolated working directory"""
+    monkeypatch.chdir(tmp_path)
+    images = list(experiment.images.index[:3])
+    results = integrate(
+        images,
+        [0.0, 1.0, 2.0],
+        list(experiment.images.loc[images, "geometry"]),
+        experiment.pathToImages,
+        "out",
+    )
+    assert results["bad_003.mccd"] is None
+    assert results["a_001.mccd"] == str(tmp_path / "out" / "a_001.mccd.ii")
+    assert sorted(os.listdir(tmp_path / "out")) == ["a_001.mccd.ii", "a_002.mccd.ii"]
+    assert not any(p.name.startswith("integrate-") for p in tmp_path.iterdir())
+
+    reflections = merge_reflections(results)
+    assert len(reflections) == 4
+    assert list(reflections["image"].unique()) == ["a_001.mccd", "a_002.mccd"]
+    assert reflections["I"].sum() == 3000.0
+
+
+def test_integrateImages(fake_precognition, experiment, tmp_path):
+    """integrateImages() shards frames across workers and merges outputs"""
+    output = tmp_path / "integrated"
+    with PrecognitionPool(2, scratch=str(tmp_path / "scratch")) as pool:
+        reflections = experiment.integrateImages(
+            output=str(output), nshards=3, pool=pool
+        )
+        assert pool.report()["frames"] == 3
+
+    assert len(reflections) == 8
+    assert sorted(reflections["phi"].unique()) == [0.0, 1.0, 3.0, 4.0]
+    assert list(experiment.images["integrated"]) == [True, True, False, True, True]
+    assert experiment.images["integrate_seconds"].notna().all()
+    assert len(os.listdir(output)) == 4
+
+
+def test_readReflections(fake_precognition, experiment, tmp_path):
+    """Reflections can be read back from the output directory"""
+    output = str(tmp_path / "integrated")
+    with PrecognitionPool(1, scratch=str(tmp_path / "scratch")) as pool:
+        merged = experiment.integrateImages(output=output, pool=pool)
+    reflections = experiment.readReflections(output)
+    pd.testing.assert_frame_equal(reflections, merged)
+
+
+def test_integrateImages_missing(fake_precognition, experiment):
+    with pytest.raises(KeyError):
+        experiment.integrateImages(["missing.mccd"])
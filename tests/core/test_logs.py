@@ -24,3 +24,26 @@ def test_import_log_custom():
         Experiment.fromLogs([path_700])
 
     Experiment.fromLogs([path_700], acq_num="7.0.0")
+
+
+def test_import_log_dtypes(tmp_path):
+    """
+    Test that logs are imported with compact dtypes and that delays are
+    categorical with a numeric companion column in ns
+    """
+    log = tmp_path / "delays.log"
+    with open("tests/data/acq628.log", "r") as f:
+        lines = f.readlines()
+    for i in range(3, len(lines), 2):
+        fields = lines[i].split("\t")
+        fields[4] = "1e-06" if i % 4 == 3 else "1e-07"
+        lines[i] = "\t".join(fields)
+    log.write_text("".join(lines))
+
+    images = Experiment.fromLogs([str(log)]).images
+    assert images["phi"].dtype == "float64"
+    assert images["bunch_current"].dtype == "float32"
+    assert images["time"].dtype.kind == "M"
+    assert list(images["delay"].cat.categories) == ["off", "100ns", "1000ns"]
+    assert images.loc[images["delay"] == "off", "delay_ns"].isna().all()
+    assert (images.loc[images["delay"] == "100ns", "delay_ns"] == 100.0).all()
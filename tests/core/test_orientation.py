@@ -0,0 +1,75 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog.core.orientation import cluster_orientations, misorientation
+from cog.core.symmetry import pointgroup_operators, rotational_pointgroup
+
+
+@pytest.mark.parametrize(
+    "spacegroup,pointgroup,order",
+    [(1, "1", 1), (4, "2", 2), (19, "222", 4), (96, "422", 8), (149, "312", 6)]
+    + [(152, "321", 6), (173, "6", 6), (178, "622", 12), (211, "432", 24)],
+)
+def test_pointgroup_operators(spacegroup, pointgroup, order):
+    """Test rotational point groups of space groups"""
+    assert rotational_pointgroup(spacegroup) == pointgroup
+    ops = pointgroup_operators(spacegroup)
+    assert len(ops) == order
+    assert np.allclose(np.linalg.det(ops), 1.0)
+    assert np.array_equal(ops[0], np.eye(3))
+
+
+def rotation(axis, degrees):
+    """Rotation matrix about axis"""
+    u = np.asarray(axis, dtype=float) / np.linalg.norm(axis)
+    t = np.deg2rad(degrees)
+    K = np.cross(u, -np.eye(3))
+    return np.cos(t) * np.eye(3) + np.sin(t) * K + (1 - np.cos(t)) * np.outer(u, u)
+
+
+def test_misorientation():
+    """Test misorientation angles over symmetry operators"""
+    R = np.stack([rotation([0, 0, 1], 3.0), rotation([1, 0, 0], 92.0)])
+    identity = np.eye(3)[None]
+    fourfold = np.stack([rotation([1, 0, 0], a) for a in (0, 90, 180, 270)])
+    assert np.allclose(misorientation(R, identity), [3.0, 92.0])
+    assert np.allclose(misorientation(R, fourfold), [3.0, 2.0])
+
+    labels = cluster_orientations(np.concatenate([R, R, R[:1]]), identity)
+    assert list(labels) == [0, 1, 0, 1, 0]
+
+
+def test_findOrientationOutliers():
+    """Test flagging of frames whose orientation disagrees with goniometer"""
+    reference = FrameGeometry("tests/data/example.mccd.inp")
+    U = reference.get_missetting_matrix()
+    B = np.linalg.inv(reference.get_orthogonalization_matrix())
+    fourfold = pointgroup_operators(96)[1]
+
+    phis = np.arange(0.0, 100.0, 5.0)
+    geometries = []
+    for i, phi in enumerate(phis):
+        g = copy.deepcopy(reference)
+        g.goniometer = ["0", "0", f"{phi}"]
+        if i == 3:
+            Ui = rotation([1, 1, 0], 5.0) @ U  # slipped crystal
+        elif i == 4:
+            Ui = U @ B @ fourfold @ np.linalg.inv(B)  # equivalent setting
+        else:
+            Ui = rotation([0, 1, 1], 0.01 * i) @ U
+        g.matrix = [f"{v:.8f}" for v in Ui.ravel()]
+        geometries.append(g)
+
+    names = [f"frame_{i:03d}.mccd" for i in range(len(phis))]
+    images = pd.DataFrame({"phi": phis, "geometry": geometries}, index=names)
+    experiment = Experiment(images, "./", spacegroup=96)
+
+    outliers = experiment.findOrientationOutliers(names[0])
+    assert list(outliers) == [names[3]]
+    assert experiment.images.loc[names[3], "misorientation"] == pytest.approx(5.0)
+    assert experiment.images.loc[names[4], "misorientation"] < 1e-4
+    assert experiment.images["orientation_cluster"].tolist().count(0) == len(phis) - 1
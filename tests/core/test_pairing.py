@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog.core.pairing import pair_frames, phi_groups
+
+EXAMPLE = "tests/data/example.mccd.inp"
+
+
+@pytest.fixture
+def images():
+    """Sweep of off/on pairs at 4 phi angles, with a repeat at 0/360"""
+    phi = [0.0, 0.0, 4.0, 4.0, 8.0, 8.001, 12.0, 12.0, 359.999]
+    delay = ["off", "100ns", "off", "1us", "off", "100ns", "off", "1us", "100ns"]
+    time = pd.date_range("2022-06-22 19:00", periods=9, freq="2s", tz="UTC")
+    index = [f"frame_{i}.mccd" for i in range(9)]
+    return pd.DataFrame({"phi": phi, "delay": delay, "time": time}, index=index)
+
+
+def test_pair_frames(images):
+    """On frames are paired with the off frame at the same phi"""
+    pairs = pair_frames(images)
+    assert list(pairs.index) == [f"frame_{i}.mccd" for i in (1, 3, 5, 7, 8)]
+    expected = [f"frame_{i}.mccd" for i in (0, 2, 4, 6, 0)]
+    assert list(pairs["off"]) == expected
+    assert np.allclose(pairs["dphi"], [0.0, 0.0, 0.001, 0.0, -0.001])
+    assert np.allclose(pairs["dt"].iloc[:4], 2.0)
+
+
+def test_pair_frames_nearest_in_time(images):
+    """Repeat off frames at the same phi are paired by collection time"""
+    images.loc["frame_9.mccd"] = [4.0, "off", images["time"].iloc[-1]]
+    pairs = pair_frames(images)
+    assert pairs.loc["frame_3.mccd", "off"] == "frame_2.mccd"
+
+    images.loc["frame_10.mccd"] = [4.0, "1us", images["time"].iloc[-1]]
+    pairs = pair_frames(images)
+    assert pairs.loc["frame_10.mccd", "off"] == "frame_9.mccd"
+
+
+def test_pair_frames_unpaired(images):
+    images.loc["frame_9.mccd"] = [90.0, "1us", images["time"].iloc[-1]]
+    pairs = pair_frames(images)
+    assert pd.isna(pairs.loc["frame_9.mccd", "off"])
+
+
+def test_propagateGeometry(images, tmp_path):
+    """Geometries are propagated from off frames to paired on frames"""
+    exp = Experiment(images, str(tmp_path))
+    exp.images["geometry"] = None
+    geometry = FrameGeometry(EXAMPLE)
+    for frame in ["frame_0.mccd", "frame_2.mccd", "frame_4.mccd"]:
+        exp.images.at[frame, "geometry"] = geometry
+
+    frames = exp.propagateGeometry()
+    assert set(frames) == {
+        "frame_1.mccd",
+        "frame_3.mccd",
+        "frame_5.mccd",
+        "frame_8.mccd",
+    }
+    assert exp.images.loc["frame_3.mccd", "geometry_source"] == "frame_2.mccd"
+    assert exp.images.loc["frame_3.mccd", "off_reference"] == "frame_2.mccd"
+    propagated = exp.images.loc["frame_3.mccd", "geometry"]
+    assert propagated.matrix == geometry.matrix
+    assert propagated.matrix is not geometry.matrix
+    assert propagated.image == ["0", "frame_3.mccd"]
+    assert propagated.goniometer == ["0.000", "0.000", "4.000"]
+    assert geometry.image == ["0", "example.mccd"]
+    assert exp.images.loc["frame_7.mccd", "geometry"] is None
+
+
+def test_phi_groups():
+    """Chains of close angles are grouped, including across 0/360"""
+    phi = [10.0, 0.0, 10.004, 359.996, 20.0, 10.008, 380.0]
+    assert list(phi_groups(phi, tolerance=0.005)) == [1, 0, 1, 0, 2, 1, 2]
+    assert len(phi_groups([])) == 0
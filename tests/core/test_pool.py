@@ -0,0 +1,185 @@
+import os
+import sys
+from os.path import dirname, abspath, join
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog.core import precognition, timing
+from cog.core.pool import PrecognitionPool
+
+EXAMPLE = join(abspath(dirname(__file__)), "../data/example.mccd.inp")
+
+FAKE_PRECOGNITION = """
+import shutil, sys
+lines = [l.split() for l in open(sys.argv[1])]
+geometry = [l[0][1:] for l in lines if l and l[0].startswith("@")][0]
+image = [l[4] for l in lines if len(l) == 5 and l[0] == "Goniometer"][0]
+if "fail" in image:
+    print(f"Processing stops at {image}")
+    sys.exit()
+shutil.copyfile(geometry, f"{image}.inp")
+print("R.M.S.D. in pixel & matched spots:     0.52 508")
+"""
+
+
+@pytest.fixture
+def fake_precognition(tmp_path, monkeypatch):
+    """Fake Precognition binary that echoes the initial geometry (and fails
+    for images with "fail" in their name)"""
+    script = tmp_path / "fake_precognition.py"
+    script.write_text(FAKE_PRECOGNITION)
+    monkeypatch.setenv("COG_PRECOGNITION", f"{sys.executable} {script}")
+    monkeypatch.setattr(precognition, "_environment", None)
+    return script
+
+
+def test_refineImages(fake_precognition, tmp_path, monkeypatch):
+    """refineImages() runs refinements in isolated workers"""
+    images = [f"image_{i:03d}.mccd" for i in range(6)]
+    imagedir = tmp_path / "images"
+    imagedir.mkdir()
+    for image in images:
+        (imagedir / image).touch()
+    df = pd.DataFrame({"phi": range(6)}, index=images)
+    exp = Experiment(df, str(imagedir))
+    exp.images["geometry"] = [FrameGeometry(EXAMPLE)] * 6
+
+    scratch = tmp_path / "scratch"
+    monkeypatch.chdir(tmp_path)
+    timing.reset()
+    with PrecognitionPool(2, scratch=str(scratch), max_load=1e6) as pool:
+        exp.refineImages(pool=pool)
+        workdirs = os.listdir(scratch)
+        report = pool.report()
+
+    assert len(workdirs) == 2
+    assert (exp.images["rmsd"] == 0.52).all()
+    assert exp.images["refine_seconds"].notna().all()
+    assert all(isinstance(g, FrameGeometry) for g in exp.images["geometry"])
+    assert report["frames"] == 6
+    stages = timing.timings()["stage"].value_counts()
+    assert stages["precognition"] == 6
+    assert stages["parse_log"] == 6
+    assert report["throughput"] > 0
+    assert not any(p.suffix == ".inp" for p in tmp_path.iterdir())
+
+
+def test_refineImages_missing(fake_precognition, tmp_path):
+    """refineImages() raises KeyError for missing images"""
+    exp = Experiment(pd.DataFrame({"phi": [0.0]}, index=["a.mccd"]), str(tmp_path))
+    with PrecognitionPool(1, scratch=str(tmp_path / "scratch")) as pool:
+        with pytest.raises(KeyError):
+            exp.refineImages(["b.mccd"], pool=pool)
+
+
+def test_refineImages_staged(fake_precognition, tmp_path, monkeypatch):
+    """refineImages() reads images from the stager"""
+    from cog.core.staging import ImageStager
+
+    images = [f"image_{i:03d}.mccd" for i in range(4)]
+    imagedir = tmp_path / "images"
+    imagedir.mkdir()
+    for image in images:
+        (imagedir / image).write_bytes(bytes(100))
+    exp = Experiment(pd.DataFrame({"phi": range(4)}, index=images), str(imagedir))
+    exp.images["geometry"] = [FrameGeometry(EXAMPLE)] * 4
+
+    scratch = tmp_path / "staged"
+    with PrecognitionPool(2, scratch=str(tmp_path / "scratch")) as pool:
+        with ImageStager(str(imagedir), str(scratch), max_bytes=200) as stager:
+            exp.refineImages(pool=pool, stager=stager)
+            assert stager.stagedBytes <= 200
+
+    assert (exp.images["rmsd"] == 0.52).all()
+
+
+def test_refineImages_staged_missing(fake_precognition, tmp_path):
+    """refineImages() raises KeyError for missing images before staging"""
+    from cog.core.staging import ImageStager
+
+    exp = Experiment(pd.DataFrame({"phi": [0.0]}, index=["a.mccd"]), str(tmp_path))
+    with PrecognitionPool(1, scratch=str(tmp_path / "scratch")) as pool:
+        with ImageStager(str(tmp_path), str(tmp_path / "staged")) as stager:
+            with pytest.raises(KeyError):
+                exp.refineImages(["b.mccd"], pool=pool, stager=stager)
+            assert stager.stagedBytes == 0
+
+
+@pytest.mark.parametrize("reuse", [True, False])
+def test_refinePhiGroups(fake_precognition, tmp_path, reuse):
+    """refinePhiGroups() refines one representative per phi"""
+    images = [f"image_{i:03d}.mccd" for i in range(6)]
+    imagedir = tmp_path / "images"
+    imagedir.mkdir()
+    for image in images:
+        (imagedir / image).touch()
+    df = pd.DataFrame(
+        {
+            "phi": [0.0, 0.0, 0.0, 5.0, 5.001, 359.995],
+            "delay": ["100ns", "off", "1us", "off", "100ns", "1us"],
+        },
+        index=images,
+    )
+    exp = Experiment(df, str(imagedir))
+    exp.images["geometry"] = [FrameGeometry(EXAMPLE)] * 6
+
+    with PrecognitionPool(1, scratch=str(tmp_path / "scratch")) as pool:
+        report = exp.refinePhiGroups(pool=pool, reuse=reuse)
+
+    assert list(exp.images["phi_group"]) == [0, 0, 0, 1, 1, 0]
+    assert report["frames"] == 6
+    assert report["groups"] == 2
+    assert all(isinstance(g, FrameGeometry) for g in exp.images["geometry"])
+    if reuse:
+        assert report["runs"] == 2
+        assert report["runs_saved"] == 4
+        assert exp.images["rmsd"].notna().sum() == 2
+        source = exp.images["geometry_source"]
+        assert source["image_000.mccd"] == "image_001.mccd"
+        assert source["image_005.mccd"] == "image_001.mccd"
+        assert source["image_004.mccd"] == "image_003.mccd"
+    else:
+        assert report["runs"] == 6
+        assert report["runs_saved"] == 0
+        assert (exp.images["rmsd"] == 0.52).all()
+
+
+@pytest.mark.parametrize("initial_geometry", [None, "image_003.mccd"])
+def test_refinePhiGroups_failed(fake_precognition, tmp_path, initial_geometry):
+    """Frames whose representative failed start from initial_geometry"""
+    images = ["fail_000.mccd", "image_001.mccd", "image_002.mccd", "image_003.mccd"]
+    imagedir = tmp_path / "images"
+    imagedir.mkdir()
+    for image in images:
+        (imagedir / image).touch()
+    df = pd.DataFrame(
+        {"phi": [0.0, 0.0, 0.0, 5.0], "delay": ["off", "1us", "100ns", "off"]},
+        index=images,
+    )
+    exp = Experiment(df, str(imagedir))
+    geometry = FrameGeometry(EXAMPLE)
+    exp.images["geometry"] = [geometry, None, geometry, geometry]
+
+    with PrecognitionPool(1, scratch=str(tmp_path / "scratch")) as pool:
+        report = exp.refinePhiGroups(pool=pool, initial_geometry=initial_geometry)
+
+    assert exp.images.loc["fail_000.mccd", "geometry"] is None
+    assert exp.images.loc["image_003.mccd", "rmsd"] == 0.52
+    assert exp.images.loc["image_002.mccd", "rmsd"] == 0.52
+    if initial_geometry is None:
+        assert report == {
+            "frames": 4,
+            "groups": 2,
+            "runs": 3,
+            "runs_saved": 0,
+            "skipped": 1,
+        }
+        assert exp.images.loc["image_001.mccd", "geometry"] is None
+        assert exp.images.loc["image_001.mccd", "rmsd"] == np.inf
+    else:
+        assert report["runs"] == 4
+        assert report["skipped"] == 0
+        assert exp.images.loc["image_001.mccd", "rmsd"] == 0.52
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from cog import FrameGeometry
+from cog.core.prediction import BEAM, enumerate_hkl, predict_spots
+
+
+@pytest.fixture
+def geometry():
+    return FrameGeometry("tests/data/example.mccd.inp")
+
+
+def test_enumerate_hkl():
+    """Test enumeration of Miller indices within resolution limits"""
+    cell = (10.0, 10.0, 10.0, 90.0, 90.0, 90.0)
+    hkl = enumerate_hkl(cell, 5.0)
+    assert len(hkl) == 6 + 12 + 8 + 6  # {100}, {110}, {111}, and {200}
+    assert not (hkl == 0).all(axis=1).any()
+
+
+def test_predict_spots(geometry):
+    """
+    Test that predicted spots satisfy the Laue condition by back-projecting
+    them from the (untilted) detector to scattering vectors
+    """
+    geometry.tilt = ["0.0", "0.0"]
+    spots = geometry.predict_spots()
+    assert len(spots) > 0
+    assert spots["d"].min() >= 2.0
+    assert spots["wavelength"].between(1.02, 1.18).all()
+
+    center = np.array(geometry.center, dtype=float)
+    pixel = np.array(geometry.pixel, dtype=float)
+    xy = (spots[["x", "y"]].to_numpy() - center) * pixel
+    points = np.column_stack([xy, np.full(len(xy), -float(geometry.distance[0]))])
+    s1 = points / np.linalg.norm(points, axis=1, keepdims=True)
+    q = (s1 - BEAM) / spots["wavelength"].to_numpy()[:, None]
+
+    hkl = spots[["H", "K", "L"]].to_numpy()
+    expected = hkl @ geometry.get_reciprocal_Amatrix().T
+    assert np.allclose(q, expected)
+
+
+def test_predict_spots_batch(geometry):
+    """Test that batched prediction matches per-frame prediction"""
+    single = geometry.predict_spots()
+    batch = predict_spots([geometry] * 3, labels=["a", "b", "c"], chunksize=1)
+    assert len(batch) == 3 * len(single)
+    frame = batch[batch["frame"] == "b"].drop(columns="frame")
+    assert np.allclose(frame.to_numpy(float), single.to_numpy(float))
+
+
+def rotation(axis, degrees):
+    """Rotation matrix about a lab axis from the Rodrigues formula"""
+    u = np.eye(3)[axis]
+    t = np.deg2rad(degrees)
+    K = np.cross(np.eye(3), u)
+    return np.eye(3) + np.sin(t) * K + (1 - np.cos(t)) * K @ K
+
+
+def test_predict_spots_swing_tilt(geometry):
+    """
+    Test projection onto a swung and tilted detector by back-projecting
+    pixels through an independently constructed detector frame
+    """
+    geometry.swing = ["4.0", "-3.0"]
+    geometry.tilt = ["1.5", "-2.0"]
+    spots = geometry.predict_spots()
+    assert len(spots) > 0
+
+    Rswing = rotation(1, 4.0) @ rotation(0, -3.0)
+    Rdet = Rswing @ rotation(1, 1.5) @ rotation(0, -2.0)
+    center = np.array(geometry.center, dtype=float)
+    pixel = np.array(geometry.pixel, dtype=float)
+    distance = float(geometry.distance[0])
+
+    # Beam center lies on the swung beam axis
+    xy = (spots[["x", "y"]].to_numpy() - center) * pixel
+    local = np.column_stack([xy, np.zeros(len(xy))])
+    points = Rswing @ [0.0, 0.0, -distance] + local @ Rdet.T
+    s1 = points / np.linalg.norm(points, axis=1, keepdims=True)
+    q = (s1 - BEAM) / spots["wavelength"].to_numpy()[:, None]
+
+    hkl = spots[["H", "K", "L"]].to_numpy()
+    expected = hkl @ geometry.get_reciprocal_Amatrix().T
+    assert np.allclose(q, expected)
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from cog.core import scheduling
+from cog.core.scheduling import assign_cpus, numa_nodes, parse_cpulist
+
+
+@pytest.mark.parametrize(
+    "cpulist,expected",
+    [("0", [0]), ("0-3", [0, 1, 2, 3]), ("0-1,8,10-11\n", [0, 1, 8, 10, 11])],
+)
+def test_parse_cpulist(cpulist, expected):
+    """Test parsing of Linux cpulists"""
+    assert parse_cpulist(cpulist) == expected
+
+
+def test_numa_nodes(tmp_path, monkeypatch):
+    """numa_nodes() reads sysfs and restricts to available CPUs"""
+    monkeypatch.setattr(scheduling, "available_cpus", lambda: [0, 1, 2, 4, 5])
+    for node, cpulist in [(0, "0-2"), (1, "3-5"), (2, "6-7")]:
+        (tmp_path / f"node{node}").mkdir()
+        (tmp_path / f"node{node}" / "cpulist").write_text(cpulist + "\n")
+
+    assert numa_nodes(str(tmp_path)) == {0: [0, 1, 2], 1: [4, 5]}
+    assert numa_nodes(str(tmp_path / "missing")) == {0: [0, 1, 2, 4, 5]}
+
+
+@pytest.mark.parametrize(
+    "placement,expected",
+    [
+        ("compact", [{0}, {1}, {2}, {3}, {0}]),
+        ("spread", [{0}, {2}, {1}, {3}, {0}]),
+        ("node", [{0, 1}, {2, 3}, {0, 1}, {2, 3}, {0, 1}]),
+        (None, [None] * 5),
+    ],
+)
+def test_assign_cpus(placement, expected):
+    """Test placement policies, including oversubscription"""
+    assert assign_cpus(5, placement, {0: [0, 1], 1: [2, 3]}) == expected
+
+
+def test_assign_cpus_invalid():
+    with pytest.raises(ValueError):
+        assign_cpus(2, "random")
+
+
+def test_wait_for_load(monkeypatch):
+    """wait_for_load() polls until the load average drops"""
+    loads = iter([8.0, 6.0, 2.0])
+    monkeypatch.setattr(os, "getloadavg", lambda: (next(loads), 0.0, 0.0))
+    scheduling.wait_for_load(4.0, interval=0.0)
+    with pytest.raises(StopIteration):
+        next(loads)
+
+
+def test_numa_nodes_cpus(tmp_path):
+    """numa_nodes() keeps the topology when restricted to given CPUs"""
+    for node, cpulist in [(0, "0-3"), (1, "4-7")]:
+        (tmp_path / f"node{node}").mkdir()
+        (tmp_path / f"node{node}" / "cpulist").write_text(cpulist)
+
+    nodes = numa_nodes(str(tmp_path), cpus=[1, 2, 5, 6])
+    assert nodes == {0: [1, 2], 1: [5, 6]}
+    assert assign_cpus(2, "spread", nodes) == [{1}, {5}]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from cog import Experiment
+from cog.core.screening import frame_statistics
+
+
+def make_frame(nspots=0, saturated=0, shape=(256, 256), seed=0):
+    """Synthetic frame with Poisson background and square spots"""
+    rng = np.random.default_rng(seed)
+    data = rng.poisson(10, size=shape)
+    for y, x in rng.integers(8, shape[0] - 8, size=(nspots, 2)):
+        data[y : y + 3, x : x + 3] += 2000
+    data.ravel()[:saturated] = 65535
+    return data
+
+
+def test_frame_statistics(tmp_path, write_mccd):
+    """Test per-frame statistics on blank and spotty frames"""
+    blank = frame_statistics(str(write_mccd(tmp_path / "blank.mccd", make_frame())))
+    assert blank["spots"] == 0
+    assert blank["saturated_fraction"] == 0.0
+
+    spotty = frame_statistics(
+        str(write_mccd(tmp_path / "spots.mccd", make_frame(nspots=30)))
+    )
+    assert 20 <= spotty["spots"] <= 30
+    assert spotty["total_counts"] > blank["total_counts"]
+
+
+def test_screenImages(tmp_path, write_mccd):
+    """Test that blank and overloaded frames are flagged to be skipped"""
+    frames = {
+        "good.mccd": make_frame(nspots=30),
+        "blank.mccd": make_frame(),
+        "overloaded.mccd": make_frame(nspots=30, saturated=1000),
+    }
+    for name, data in frames.items():
+        write_mccd(tmp_path / name, data)
+    experiment = Experiment(pd.DataFrame(index=list(frames)), str(tmp_path))
+
+    viable = experiment.screenImages(nthreads=2)
+    assert list(viable) == ["good.mccd"]
+    assert experiment.images["skip"].tolist() == [False, True, True]
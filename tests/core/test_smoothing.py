@@ -0,0 +1,88 @@
+from os.path import abspath, dirname, join
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog.core.smoothing import COLUMNS, apply_parameters, fit_parameters, geometry_table
+
+EXAMPLE = join(abspath(dirname(__file__)), "../data/example.mccd.inp")
+
+
+@pytest.fixture
+def experiment(tmp_path):
+    """Sweep with a linear drift in distance and center_x with phi"""
+    phi = np.arange(10, dtype=float)
+    images = [f"image_{i:03d}.mccd" for i in range(10)]
+    exp = Experiment(pd.DataFrame({"phi": phi}, index=images), str(tmp_path))
+    template = FrameGeometry(EXAMPLE)
+    values = geometry_table([template]).to_numpy()[0]
+    geometries = []
+    for p, image in zip(phi, images):
+        row = values.copy()
+        row[COLUMNS.index("distance")] += 0.1 * p
+        row[COLUMNS.index("center_x")] += 0.5 * p
+        geometries.append(apply_parameters(template, row, phi=p, image=image))
+    exp.images["geometry"] = geometries
+    exp.images["rmsd"] = 0.5
+    return exp
+
+
+def test_geometry_table():
+    table = geometry_table([FrameGeometry(EXAMPLE)] * 2, index=["a", "b"])
+    assert list(table.columns) == COLUMNS
+    assert table.loc["a", "distance"] == 200.12
+    assert table.loc["b", "tilt_y"] == -0.08
+    assert table.loc["a", "matrix_00"] == 0.697244
+
+
+def test_fit_parameters_rotation():
+    """Fitted missetting matrices are rotations"""
+    table = geometry_table([FrameGeometry(EXAMPLE)] * 3)
+    rng = np.random.default_rng(0)
+    table += rng.normal(scale=1e-3, size=table.shape)
+    fitted = fit_parameters([0.0, 1.0, 2.0], table, degree=1, at=[0.5, 4.0])
+    matrices = fitted[:, -9:].reshape(-1, 3, 3)
+    identity = np.broadcast_to(np.eye(3), matrices.shape)
+    assert np.allclose(matrices @ matrices.transpose(0, 2, 1), identity)
+    assert fitted.shape == (2, len(COLUMNS))
+
+
+def test_smoothGeometry_interpolates(experiment):
+    """Frames without a geometry are interpolated from the fits"""
+    failed = ["image_004.mccd", "image_009.mccd"]
+    experiment.images.loc[failed, "geometry"] = None
+    experiment.images.loc["image_002.mccd", "rmsd"] = 5.0
+
+    fitted = experiment.smoothGeometry(degree=1, max_rmsd=1.0)
+
+    assert list(fitted.index) == ["image_002.mccd"] + failed
+    geometry = experiment.images.loc["image_004.mccd", "geometry"]
+    assert float(geometry.distance[0]) == pytest.approx(200.52)
+    assert float(geometry.center[0]) == pytest.approx(1987.4)
+    assert geometry.goniometer[2] == "4.000"
+    assert geometry.image[1] == "image_004.mccd"
+    source = experiment.images["geometry_source"]
+    assert (source[fitted.index] == "fit").all()
+    assert source.drop(fitted.index).isna().all()
+
+
+def test_smoothGeometry_replace(experiment):
+    fitted = experiment.smoothGeometry(by="phi", degree=0, replace=True)
+    assert len(fitted) == 10
+    assert np.allclose(fitted["distance"], 200.12 + 0.45)
+
+
+def test_smoothGeometry_invalid(experiment):
+    with pytest.raises(ValueError):
+        experiment.smoothGeometry(by="delay")
+
+
+def test_writeINPFiles(experiment, tmp_path):
+    experiment.images.loc["image_004.mccd", "geometry"] = None
+    experiment.smoothGeometry(degree=1)
+    inpfiles = experiment.writeINPFiles(str(tmp_path / "inp"))
+    assert len(inpfiles) == 10
+    geometry = FrameGeometry(str(tmp_path / "inp" / "image_004.mccd.inp"))
+    assert float(geometry.distance[0]) == pytest.approx(200.52)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog.core.spots import compare_spots, match_spots, match_statistics
+
+
+def test_match_spots():
+    """Test nearest-neighbor matching of observed and predicted spots"""
+    rng = np.random.default_rng(0)
+    predicted = rng.uniform(0, 4000, size=(500, 2))
+    observed = predicted[:100] + rng.normal(0, 0.5, size=(100, 2))
+    observed = np.vstack([observed, [[-100.0, -100.0]]])
+
+    iobs, ipred, distance = match_spots(observed, predicted, max_distance=5.0)
+    assert np.array_equal(iobs, np.arange(100))
+    assert np.array_equal(ipred, np.arange(100))
+
+    stats = match_statistics(observed, predicted, max_distance=5.0)
+    assert stats["matched"] == 100
+    assert stats["rmsd"] == pytest.approx(np.sqrt(np.mean(distance**2)))
+
+
+def test_compare_spots():
+    """Test spot-matching statistics across frames"""
+    predicted = pd.DataFrame(
+        {"frame": ["a", "a", "b"], "x": [0.0, 10.0, 0.0], "y": [0.0, 10.0, 0.0]}
+    )
+    observed = {"a": np.array([[0.0, 1.0], [10.0, 10.0]]), "c": np.ones((1, 2))}
+    stats = compare_spots(observed, predicted)
+    assert stats.loc["a", "matched"] == 2
+    assert stats.loc["a", "rmsd"] == pytest.approx(np.sqrt(0.5))
+    assert stats.loc["c", "matched"] == 0
@@ -0,0 +1,68 @@
+import os
+import threading
+
+import pytest
+
+from cog.core.staging import ImageStager
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Directory with ten 100-byte images"""
+    source = tmp_path / "images"
+    source.mkdir()
+    for i in range(10):
+        (source / f"image_{i:03d}.mccd").write_bytes(bytes([i]) * 100)
+    return source
+
+
+def test_stager_roundtrip(source, tmp_path):
+    """Staged copies match source images"""
+    with ImageStager(str(source), str(tmp_path / "scratch"), nthreads=2) as stager:
+        images = sorted(os.listdir(source))
+        stager.prefetch(images)
+        for image in images:
+            path = stager.path(image)
+            assert os.path.dirname(path) == stager.directory
+            with open(path, "rb") as f:
+                assert f.read() == (source / image).read_bytes()
+            stager.release(image)
+
+
+def test_stager_bounded(source, tmp_path):
+    """Stager never holds more than max_bytes, evicting released images"""
+    scratch = tmp_path / "scratch"
+    images = sorted(os.listdir(source))
+    with ImageStager(str(source), str(scratch), max_bytes=300) as stager:
+        stager.prefetch(images)
+        for image in images:
+            stager.path(image)
+            assert stager.stagedBytes <= 300
+            assert len(os.listdir(scratch)) <= 3
+            stager.release(image)
+
+        # Staged images are reused
+        last = images[-1]
+        mtime = os.stat(stager.path(last)).st_mtime_ns
+        assert os.stat(stager.path(last)).st_mtime_ns == mtime
+
+
+def test_stager_waits_for_release(source, tmp_path):
+    """Copies wait for space until acquired images are released"""
+    images = sorted(os.listdir(source))
+    with ImageStager(str(source), str(tmp_path / "scratch"), max_bytes=200) as stager:
+        stager.path(images[0])
+        stager.path(images[1])
+
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(path=stager.path(images[2]))
+        )
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+
+        stager.release(images[0])
+        thread.join(5.0)
+        assert "path" in result
+        assert not os.path.exists(os.path.join(stager.directory, images[0]))
@@ -0,0 +1,50 @@
+from cog.core import timing
+
+
+def test_timer_records():
+    """Test that Timer records elapsed time per stage"""
+    timing.reset()
+    for _ in range(3):
+        with timing.Timer("stage", "image.mccd") as t:
+            pass
+    assert t.elapsed >= 0.0
+
+    df = timing.timings()
+    assert len(df) == 3
+    assert (df["stage"] == "stage").all()
+
+    summary = timing.summary()
+    assert summary.loc["stage", "count"] == 3
+    assert "p95" in summary.columns
+    timing.reset()
+    assert len(timing.timings()) == 0
+
+
+def test_profile(tmp_path):
+    """Test that profile writes cProfile statistics to file"""
+    outfile = tmp_path / "cog.prof"
+    with timing.profile(str(outfile)):
+        sum(range(1000))
+    assert outfile.exists()
+
+
+def test_max_records():
+    """Test that only the most recent records are kept"""
+    timing.reset()
+    timing.set_max_records(2)
+    try:
+        for stage in ["a", "b", "c"]:
+            with timing.Timer(stage):
+                pass
+        assert list(timing.timings()["stage"]) == ["b", "c"]
+    finally:
+        timing.set_max_records(1_000_000)
+        timing.reset()
+
+
+def test_merge():
+    """Test merging of timings recorded elsewhere"""
+    timing.reset()
+    timing.merge([("precognition", "image.mccd", 1.5)])
+    assert timing.records() == [("precognition", "image.mccd", 1.5)]
+    timing.reset()
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cog import Experiment
+from cog.core.views import ImageView
+
+
+def test_imageview(tmp_path):
+    """ImageView links only the selected images"""
+    for name in ["a.mccd", "b.mccd", "c.mccd"]:
+        (tmp_path / name).write_bytes(name.encode())
+
+    with ImageView(["a.mccd", "c.mccd"], str(tmp_path)) as view:
+        assert sorted(os.listdir(view.directory)) == ["a.mccd", "c.mccd"]
+        with open(os.path.join(view.directory, "c.mccd"), "rb") as f:
+            assert f.read() == b"c.mccd"
+    assert not os.path.exists(view.directory)
+    assert (tmp_path / "a.mccd").exists()
+
+
+def test_imageFiles_cached(tmp_path, monkeypatch):
+    """Experiment lists pathToImages once"""
+    (tmp_path / "a.mccd").touch()
+    exp = Experiment(pd.DataFrame({"phi": [0.0]}, index=["a.mccd"]), str(tmp_path))
+
+    calls = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda p: calls.append(p) or listdir(p))
+    for _ in range(3):
+        with exp._imageView("a.mccd") as view:
+            assert os.listdir(view.directory) == ["a.mccd"]
+    assert calls.count(str(tmp_path)) == 1
+
+    (tmp_path / "b.mccd").touch()
+    with pytest.raises(ValueError):
+        exp._imageView("b.mccd")
+    exp.refreshImageFiles()
+    assert "b.mccd" in exp.imageFiles
@@ -0,0 +1,65 @@
+import os
+import tarfile
+from os.path import abspath, dirname, join
+
+import pandas as pd
+import pytest
+
+from cog import FrameGeometry
+from cog.io import export_geometries
+from cog.io.inp import format_inp, inp_table
+
+EXAMPLE = join(abspath(dirname(__file__)), "../data/example.mccd.inp")
+
+
+@pytest.fixture
+def geometries():
+    """Geometries with and without goniometer settings"""
+    geometries = []
+    for i in range(4):
+        g = FrameGeometry(EXAMPLE)
+        g.goniometer = ["0.000", "0.000", f"{i:.3f}"]
+        g.image = ["0", f"image_{i}.mccd"]
+        geometries.append(g)
+    geometries[-1].goniometer = None
+    index = [f"image_{i}.mccd" for i in range(4)]
+    return pd.Series(geometries, index=index, dtype=object)
+
+
+def test_format_inp(geometries, tmp_path):
+    """Formatted files are identical to FrameGeometry.writeINPFile()"""
+    texts = format_inp(inp_table(geometries.to_numpy()))
+    for g, text in zip(geometries, texts):
+        g.writeINPFile(str(tmp_path / "expected.inp"))
+        assert text == (tmp_path / "expected.inp").read_text()
+
+
+def test_export_geometries(geometries, tmp_path):
+    """Only missing or changed files are rewritten"""
+    output = str(tmp_path / "inp")
+    geometries["missing.mccd"] = None
+    stats = export_geometries(geometries, output)
+    assert stats["written"] == 4
+    assert stats["files"] == [f"image_{i}.mccd.inp" for i in range(4)]
+    g = FrameGeometry(join(output, "image_2.mccd.inp"))
+    assert g.goniometer[2] == "2.000"
+
+    assert export_geometries(geometries, output)["unchanged"] == 4
+
+    geometries["image_1.mccd"].distance = ["201.000", "0.000"]
+    os.remove(join(output, "image_3.mccd.inp"))
+    stats = export_geometries(geometries, output)
+    assert stats["written"] == 2
+    assert FrameGeometry(join(output, "image_1.mccd.inp")).distance[0] == "201.000"
+
+    assert export_geometries(geometries, output, force=True)["written"] == 4
+
+
+def test_export_geometries_archive(geometries, tmp_path):
+    archive = str(tmp_path / "inp.tar.gz")
+    assert export_geometries(geometries, archive)["written"] == 4
+    with tarfile.open(archive) as tar:
+        assert tar.getnames() == [f"image_{i}.mccd.inp" for i in range(4)]
+        text = tar.extractfile("image_0.mccd.inp").read().decode()
+    assert text.startswith("Input\n") and text.endswith("Quit\n")
+    assert export_geometries(geometries, archive)["unchanged"] == 4
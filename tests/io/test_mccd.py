@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment
+from cog.io import MCCDImage
+
+
+def test_MCCDImage(tmp_path, write_mccd):
+    """Test reading header and memory-mapped pixels of MarCCD image"""
+    data = np.arange(48 * 64, dtype=np.uint16).reshape(48, 64)
+    path = write_mccd(tmp_path / "image.mccd", data)
+
+    image = MCCDImage(str(path))
+    assert image.shape == (48, 64)
+    assert image.saturation == 65535
+    assert image.header["distance"] == pytest.approx(200.0)
+    assert image.header["beam_x"] == pytest.approx(1985.4)
+    assert image.header["phi"] == pytest.approx(36.0)
+    assert image.header["pixelsize_x"] == pytest.approx(0.08854)
+    assert image.header["wavelength"] == pytest.approx(1.03)
+    assert isinstance(image.data, np.memmap)
+    assert np.array_equal(image.data, data)
+
+
+def test_MCCDImage_invalid(tmp_path):
+    """Test that files which are not MarCCD images raise ValueError"""
+    path = tmp_path / "image.mccd"
+    path.write_bytes(b"not an image")
+    with pytest.raises(ValueError):
+        MCCDImage(str(path))
+    with pytest.raises(ValueError):
+        MCCDImage(str(tmp_path / "missing.mccd"))
+
+
+def test_loadImage(tmp_path, write_mccd):
+    """Test lazy access of images by filename from Experiment"""
+    write_mccd(tmp_path / "image.mccd", np.ones((8, 8)))
+    experiment = Experiment(pd.DataFrame(index=["image.mccd"]), str(tmp_path))
+
+    image = experiment.loadImage("image.mccd")
+    assert image.data.sum() == 64
+    with pytest.raises(KeyError):
+        experiment.loadImage("missing.mccd")
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog.io import read_ii, read_reflections
+
+ROWS = [
+    "  1  2  3  1  100.0  200.0  2.5  1.05  1000.0  30.0\n",
+    " -1  0  4  2  150.0  250.0  3.1  1.10   500.0  20.0\n",
+    "  0  0  6  1  300.5  120.0  1.9  1.15   250.0  15.0\n",
+]
+
+
+@pytest.fixture
+def iifiles(tmp_path):
+    """.ii files of four frames with 2, 0, 3, and 1 reflections"""
+    contents = [ROWS[:2], [], ROWS, ROWS[2:]]
+    iifiles = {}
+    for i, rows in enumerate(contents):
+        path = tmp_path / f"frame_{i}.mccd.ii"
+        path.write_text("".join(rows))
+        iifiles[f"frame_{i}.mccd"] = str(path)
+    return iifiles
+
+
+def test_read_ii(iifiles):
+    table = read_ii(iifiles["frame_0.mccd"])
+    assert table.shape == (2, 10)
+    assert table["H"].dtype == np.int16
+    assert table["I"].dtype == np.float32
+    assert list(table["L"]) == [3, 4]
+    assert len(read_ii(iifiles["frame_1.mccd"])) == 0
+    with pytest.raises(ValueError):
+        read_ii("missing.ii")
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 1000])
+def test_read_reflections(iifiles, chunksize):
+    """Reflections are concatenated and joined with frame metadata"""
+    images = pd.DataFrame(
+        {"phi": [0.0, 1.0, 2.0, 3.0], "delay": ["off", "1us", "off", "1us"]},
+        index=list(iifiles),
+    )
+    iifiles["frame_4.mccd"] = None
+    table = read_reflections(iifiles, images, chunksize=chunksize)
+
+    assert len(table) == 6
+    expected = ["frame_0.mccd"] * 2 + ["frame_2.mccd"] * 3 + ["frame_3.mccd"]
+    assert list(table["image"]) == expected
+    assert list(table["phi"]) == [0.0, 0.0, 2.0, 2.0, 2.0, 3.0]
+    assert list(table["delay"]) == ["off"] * 5 + ["1us"]
+    assert table["phi"].dtype == np.float32
+    assert isinstance(table["delay"].dtype, pd.CategoricalDtype)
+    assert table["SigI"].sum() == pytest.approx(130.0)
+
+
+def test_read_reflections_blank_lines(iifiles):
+    """Files with blank lines are parsed individually"""
+    with open(iifiles["frame_0.mccd"], "a") as f:
+        f.write("\n\n" + ROWS[2])
+    table = read_reflections(iifiles)
+    assert (table["image"] == "frame_0.mccd").sum() == 3
+    assert len(table) == 7
+
+
+@pytest.mark.parametrize("chunksize", [1, 1000])
+def test_read_reflections_comments(iifiles, chunksize):
+    """Comment and header lines are not counted as reflections"""
+    path = iifiles["frame_2.mccd"]
+    with open(path) as f:
+        rows = f.read()
+    with open(path, "w") as f:
+        f.write("# Integrated reflections\n" + rows + "   # end of frame")
+    assert len(read_ii(path)) == 3
+    table = read_reflections(iifiles, chunksize=chunksize)
+    assert (table["image"] == "frame_2.mccd").sum() == 3
+    assert len(table) == 6
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from cog.io import read_spt
+
+
+def test_read_spt(tmp_path):
+    """Test reading spot list with header lines"""
+    sptfile = tmp_path / "spots.spt"
+    sptfile.write_text(
+        "Spot list\n"
+        "   x        y        intensity\n"
+        "  101.25   202.50   1000.0\n"
+        "  -3.0     .5       20.0\n"
+    )
+    spots = read_spt(str(sptfile))
+    assert spots.shape == (2, 3)
+    assert np.allclose(spots[:, :2], [[101.25, 202.5], [-3.0, 0.5]])
+
+
+def test_read_spt_empty(tmp_path):
+    """Test reading spot list without spots"""
+    sptfile = tmp_path / "spots.spt"
+    sptfile.write_text("Spot list\n")
+    assert read_spt(str(sptfile)).shape == (0, 2)
+    with pytest.raises(ValueError):
+        read_spt(str(tmp_path / "missing.spt"))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import Experiment, FrameGeometry
+from cog import facet
+
+EXAMPLE = "tests/data/example.mccd.inp"
+
+
+def test_facet_angles():
+    """Batched kernel matches per-facet computation"""
+    Astar = FrameGeometry(EXAMPLE).get_reciprocal_Amatrix()
+    facets = np.array([[1, 0, 0], [0, 1, 1], [-1, 2, 0]])
+    angles = facet.facet_angles(np.stack([Astar, Astar]), facets)
+    for j, hkl in enumerate(facets):
+        normal = facet.get_normal_vector(hkl, Astar)
+        expected = np.rad2deg(facet.angle(normal, facet.EF))
+        assert np.allclose(angles[:, j], expected)
+
+
+@pytest.fixture
+def pklfile(tmp_path):
+    """Experiment with geometries for 6 frames at two delays"""
+    exp = Experiment.fromLogs(["tests/data/acq628.log"])
+    exp.images["geometry"] = None
+    for image in exp.images.index[:6]:
+        exp.images.at[image, "geometry"] = FrameGeometry(EXAMPLE)
+    pkl = str(tmp_path / "experiment.pkl")
+    exp.toPickle(pkl)
+    return pkl, exp.images.iloc[:6]
+
+
+@pytest.mark.parametrize("nproc", [1, 2])
+def test_analyze_groupby(pklfile, tmp_path, nproc):
+    """Experiment files are grouped by delay and streamed to CSV"""
+    pkl, images = pklfile
+    output = str(tmp_path / "angles.csv")
+    results = facet.analyze(
+        [pkl, EXAMPLE], groupby="delay", nproc=nproc, chunksize=4, output=output
+    )
+
+    counts = results[("Angle", "count")].groupby(level="Group").first()
+    expected = images["delay"].astype(str).value_counts()
+    assert counts["-"] == 1
+    for delay, count in expected.items():
+        assert counts[delay] == count
+
+    angles = pd.read_csv(output)
+    assert len(angles) == 7 * 26
+    assert set(angles["Group"].astype(str)) == set(counts.index)
+
+    # Statistics merged across chunks match those of all angles
+    angles["Group"] = angles["Group"].astype(str)
+    expected = angles.groupby(["Group", "Facet"])["Angle"].agg(["mean", "std"])
+    merged = results["Angle"].copy()
+    merged.index = merged.index.set_levels(
+        merged.index.levels[1].map(str), level="Facet"
+    )
+    merged = merged.loc[expected.index]
+    assert np.allclose(merged["mean"], expected["mean"])
+    assert np.allclose(merged["std"], expected["std"], equal_nan=True)
+
+
+def test_analyze_single_group():
+    """Without grouping, statistics are reported per facet"""
+    results = facet.analyze([EXAMPLE] * 3, hmax=1, chunksize=2)
+    assert results.index.name == "Facet"
+    assert len(results) == 26
+    assert (results[("Angle", "count")] == 3).all()
+    assert (results[("Angle", "std")] == 0.0).all()
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def imported(statement):
+    """Modules imported by statement in a fresh interpreter"""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return set(output.split())
+
+
+@pytest.mark.parametrize("module", ["cog", "cog.up", "cog.load", "cog.facet"])
+def test_lazy_imports(module):
+    """Importing cog and its entry points does not import heavy dependencies"""
+    modules = imported(f"import {module}")
+    for heavy in ["pandas", "matplotlib", "IPython", "scipy"]:
+        assert heavy not in modules
+
+
+def test_lazy_attributes():
+    """Lazy attributes resolve to the core classes"""
+    import cog
+    from cog.core.experiment import Experiment
+    from cog.core.framegeometry import FrameGeometry
+
+    assert cog.Experiment is Experiment
+    assert cog.core.FrameGeometry is FrameGeometry
+    assert "Experiment" in dir(cog)
+    with pytest.raises(AttributeError):
+        cog.Nonexistent
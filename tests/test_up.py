@@ -0,0 +1,38 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cog import FrameGeometry
+from cog import up
+
+EXAMPLE = "tests/data/example.mccd.inp"
+
+
+def test_orientation_table():
+    """Vectorized angles match the per-file computation"""
+    df = up.orientation_table([EXAMPLE] * 3)
+    assert len(df) == 3
+
+    a, b, c = FrameGeometry(EXAMPLE).get_realspace_Amatrix()
+    for axis, vec in zip("abc", [a, b, c]):
+        expected = np.rad2deg(up.angle(vec, up.EF))
+        assert np.allclose(df[f"theta_{axis}"], expected)
+    assert np.allclose(df[["a_x", "a_y", "a_z"]].to_numpy(), a)
+
+
+def test_main_headless(tmp_path, monkeypatch):
+    """cog.up writes a table without plotting"""
+    outfile = tmp_path / "angles.csv"
+    monkeypatch.setattr(sys, "argv", ["cog.up", EXAMPLE, EXAMPLE, "-o", str(outfile)])
+    up.main()
+
+    df = pd.read_csv(outfile, index_col="file")
+    assert len(df) == 2
+    assert list(df.columns[-3:]) == ["theta_a", "theta_b", "theta_c"]
+
+
+def test_writeTable_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        up.writeTable(pd.DataFrame(), str(tmp_path / "angles.txt"))